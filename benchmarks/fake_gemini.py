@@ -0,0 +1,87 @@
+import asyncio
+import itertools
+import json
+from types import SimpleNamespace
+from google.genai import types
+
+
+# A deterministic stand-in for google.genai.Client, for benchmarking /ask
+# without calling Gemini.
+#
+# Each prompt maps to the tool calls the "model" makes for it. The first turn
+# requests those calls (all at once, like parallel function calling), the
+# next turn streams a short answer built from the tool responses. Every turn
+# is delayed by a fixed latency and reports token usage derived from the
+# request size, so throughput and token metrics behave like the real thing.
+
+CHUNK_CHARS = 40
+
+
+def _tokens(value) -> int:
+    # same rule of thumb the routing uses: one token per four characters of JSON
+    return len(json.dumps(value, default=str)) // 4
+
+
+class FakeModels:
+    def __init__(self, plans: dict[str, list[tuple[str, dict]]], latency: float):
+        self.plans = plans
+        self.latency = latency
+
+    async def generate_content_stream(self, model: str, contents: list, config=None):
+        await asyncio.sleep(self.latency)
+        prompt = contents[0].parts[0].text
+        last = contents[-1]
+        responses = [part.function_response for part in last.parts or [] if part.function_response is not None]
+        prompt_tokens = _tokens([content.model_dump(mode="json", exclude_none=True) for content in contents])
+        if config is not None and config.tools:
+            prompt_tokens += _tokens([tool.model_dump(mode="json", exclude_none=True) for tool in config.tools])
+
+        if responses:
+            text = " ".join(
+                f"{response.name}: {json.dumps(response.response, default=str)[:160]}" for response in responses
+            )
+            parts = [types.Part(text=text[i:i + CHUNK_CHARS]) for i in range(0, len(text), CHUNK_CHARS)]
+        else:
+            parts = [
+                types.Part(function_call=types.FunctionCall(name=name, args=args))
+                for name, args in self.plans.get(prompt, [])
+            ] or [types.Part(text="Nothing to look up.")]
+
+        usage = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            cached_content_token_count=0,
+            candidates_token_count=sum(_tokens(part.model_dump(mode="json", exclude_none=True)) for part in parts),
+        )
+
+        async def stream():
+            for part in parts:
+                yield types.GenerateContentResponse(
+                    candidates=[types.Candidate(content=types.Content(role="model", parts=[part]))],
+                    usage_metadata=usage,
+                )
+
+        return stream()
+
+
+class FakeCaches:
+    def __init__(self):
+        self._names = (f"cachedContents/bench-{i}" for i in itertools.count())
+
+    async def create(self, model: str, config=None):
+        return SimpleNamespace(name=next(self._names))
+
+    async def delete(self, name: str):
+        return None
+
+
+class FakeGemini:
+    """
+    Drop-in for the genai.Client used by LLM_client.
+
+    Args:
+        plans (dict): Prompt -> [(tool name, args), ...] the model calls for it.
+        latency (float): Seconds each model turn takes before its first chunk.
+    """
+
+    def __init__(self, plans: dict[str, list[tuple[str, dict]]], latency: float = 0.3):
+        self.aio = SimpleNamespace(models=FakeModels(plans, latency), caches=FakeCaches())
@@ -0,0 +1,402 @@
+import argparse
+import asyncio
+import bisect
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from fastapi import FastAPI, Request, Response
+
+
+# A stand-in for the GitHub REST API, serving synthetic repositories of a
+# configurable size for the benchmarks.
+#
+# Every repository has the same deterministic content: commits spread over the
+# last year (newest first), issues and pull requests numbered in creation
+# order, branches and review comments. Listings honour the filters, sorting
+# and pagination (Link headers) the tools use, responses carry ETags and
+# rate-limit headers, and each response is delayed by a fixed latency to
+# stand in for the network. Writes are answered but not stored, so repeated
+# runs see the same data.
+#
+# Run it on its own with: python benchmarks/fake_github.py --port 8765
+
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+SPAN = timedelta(days=365)
+LOGIN = "bench"
+
+
+def _iso(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _parse(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _stable_id(value) -> int:
+    # hash() is salted per process; ids must be the same in every run
+    return int.from_bytes(hashlib.sha1(str(value).encode()).digest()[:4], "big")
+
+
+def _author(seed: int, contributors: int) -> str:
+    return f"dev{_stable_id(seed) % contributors}"
+
+
+class Dataset:
+    """
+    The synthetic content shared by every repository.
+    """
+
+    def __init__(self, repos: int, commits: int, prs: int, issues: int, branches: int, comments: int, contributors: int):
+        self.repos = repos
+        self.commits = commits
+        self.prs = prs
+        self.issues = issues
+        self.branches = branches
+        self.comments = comments
+        self.contributors = contributors
+        self.items = prs + issues
+        self.commit_step = SPAN / max(commits, 1)
+        self.item_step = SPAN / max(self.items, 1)
+        # item numbers (1-based, in creation order) that are pull requests
+        self.pr_numbers = [n for n in range(1, self.items + 1) if -(-n * prs // self.items) > -(-(n - 1) * prs // self.items)]
+        self.is_pr = set(self.pr_numbers)
+        self.open_items = sum(1 for n in range(1, self.items + 1) if self.state(n) == "open")
+
+    # --------------------------------------------------------------- commits
+
+    def commit_date(self, index: int) -> datetime:
+        # index 0 is the newest commit
+        return NOW - index * self.commit_step
+
+    def commit_range(self, since: datetime | None, until: datetime | None) -> range:
+        first = 0 if until is None else max(0, -int(-(NOW - until) // self.commit_step))
+        last = self.commits if since is None else min(self.commits, int((NOW - since) // self.commit_step) + 1)
+        return range(first, max(first, last))
+
+    def commit(self, base: str, full_name: str, index: int) -> dict:
+        sha = hashlib.sha1(f"{full_name}:{index}".encode()).hexdigest()
+        login = _author(index, self.contributors)
+        date = _iso(self.commit_date(index))
+        return {
+            "sha": sha,
+            "url": f"{base}/repos/{full_name}/commits/{sha}",
+            "html_url": f"https://github.com/{full_name}/commit/{sha}",
+            "author": self.user(base, login),
+            "committer": self.user(base, login),
+            "commit": {
+                "message": f"Change {index}",
+                "author": {"name": login, "email": f"{login}@example.com", "date": date},
+                "committer": {"name": login, "email": f"{login}@example.com", "date": date},
+            },
+        }
+
+    # ----------------------------------------------------- issues and pulls
+
+    def created(self, number: int) -> datetime:
+        return NOW - SPAN + number * self.item_step
+
+    def state(self, number: int) -> str:
+        return "closed" if number % 3 == 0 else "open"
+
+    def matching(self, numbers: list[int], state: str, since: datetime | None, descending: bool) -> list[int]:
+        if state != "all":
+            numbers = [n for n in numbers if self.state(n) == state]
+        if since is not None:
+            # updated_at grows with the number, so since is a lower bound on it
+            numbers = numbers[bisect.bisect_left(numbers, since, key=lambda n: self.created(n) + timedelta(hours=1)):]
+        return numbers[::-1] if descending else numbers
+
+    def user(self, base: str, login: str) -> dict:
+        return {"login": login, "id": _stable_id(login), "type": "User", "url": f"{base}/users/{login}"}
+
+    def issue(self, base: str, full_name: str, number: int) -> dict:
+        created = self.created(number)
+        closed = created + timedelta(days=2) if self.state(number) == "closed" else None
+        issue = {
+            "number": number,
+            "title": f"{'Pull request' if number in self.is_pr else 'Issue'} {number}",
+            "state": self.state(number),
+            "body": f"Synthetic body of #{number}. " * 8,
+            "user": self.user(base, _author(-number, self.contributors)),
+            "labels": [{"name": "bug" if number % 2 else "enhancement"}],
+            "comments": self.comments,
+            "created_at": _iso(created),
+            "updated_at": _iso(created + timedelta(hours=1)),
+            "closed_at": _iso(closed) if closed else None,
+            "url": f"{base}/repos/{full_name}/issues/{number}",
+            "html_url": f"https://github.com/{full_name}/issues/{number}",
+        }
+        if number in self.is_pr:
+            merged = _iso(closed) if closed and number % 2 == 0 else None
+            # like GitHub, a pull request listed as an issue links to its PR page
+            issue["html_url"] = f"https://github.com/{full_name}/pull/{number}"
+            issue["pull_request"] = {
+                "url": f"{base}/repos/{full_name}/pulls/{number}",
+                "html_url": f"https://github.com/{full_name}/pull/{number}",
+                "merged_at": merged,
+            }
+        return issue
+
+    def pull(self, base: str, full_name: str, number: int) -> dict:
+        issue = self.issue(base, full_name, number)
+        merged_at = issue.pop("pull_request")["merged_at"]
+        return {
+            **issue,
+            "url": f"{base}/repos/{full_name}/pulls/{number}",
+            "html_url": f"https://github.com/{full_name}/pull/{number}",
+            "merged": merged_at is not None,
+            "merged_at": merged_at,
+            "mergeable_state": "clean",
+            "base": {"ref": "main", "sha": "0" * 40},
+            "head": {"ref": f"feature-{number % max(self.branches, 1)}", "sha": "1" * 40},
+        }
+
+    # ---------------------------------------------------------------- repos
+
+    def repo(self, base: str, owner: str, name: str) -> dict:
+        full_name = f"{owner}/{name}"
+        return {
+            "id": _stable_id(full_name),
+            "name": name,
+            "full_name": full_name,
+            "owner": self.user(base, owner),
+            "private": False,
+            "description": f"Synthetic repository {name}",
+            "url": f"{base}/repos/{full_name}",
+            "html_url": f"https://github.com/{full_name}",
+            "stargazers_count": _stable_id(full_name) % 5000,
+            "forks_count": _stable_id(full_name) % 400,
+            "watchers_count": _stable_id(full_name) % 5000,
+            "subscribers_count": 40,
+            "open_issues_count": self.open_items,
+            "size": 20480,
+            "language": "Python",
+            "default_branch": "main",
+            "fork": False,
+            "archived": False,
+            "created_at": _iso(NOW - SPAN),
+            "updated_at": _iso(NOW),
+            "pushed_at": _iso(NOW),
+        }
+
+    def branch_names(self) -> list[str]:
+        return ["main"] + [f"feature-{i}" for i in range(1, self.branches)]
+
+
+def create_app(dataset: Dataset, latency: float = 0.0, rate_limit: int = 5000) -> FastAPI:
+    """
+    The fake API as an ASGI app.
+
+    Args:
+        dataset (Dataset): Content every repository serves.
+        latency (float): Seconds each response is delayed by.
+        rate_limit (int): Hourly limit reported in the rate-limit headers.
+    """
+    app = FastAPI()
+    counters = {"requests": 0, "started": time.time()}
+
+    def base_of(request: Request) -> str:
+        return str(request.base_url).rstrip("/")
+
+    def headers() -> dict:
+        counters["requests"] += 1
+        reset = int(counters["started"]) + 3600
+        return {
+            "X-RateLimit-Limit": str(rate_limit),
+            "X-RateLimit-Remaining": str(max(rate_limit - counters["requests"], 0)),
+            "X-RateLimit-Reset": str(reset),
+            "X-RateLimit-Resource": "core",
+        }
+
+    async def reply(request: Request, body, status: int = 200, extra: dict | None = None) -> Response:
+        if latency:
+            await asyncio.sleep(latency)
+        payload = json.dumps(body).encode()
+        etag = f'"{hashlib.md5(payload).hexdigest()}"'
+        response_headers = {**headers(), "ETag": etag, **(extra or {})}
+        if request.method == "GET" and request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=response_headers)
+        return Response(payload, status_code=status, media_type="application/json", headers=response_headers)
+
+    async def page(request: Request, total: int, render) -> Response:
+        # render(start, stop) returns the items of that slice of the listing
+        per_page = min(int(request.query_params.get("per_page", 30)), 100)
+        number = max(int(request.query_params.get("page", 1)), 1)
+        start = (number - 1) * per_page
+        items = render(start, min(start + per_page, total)) if start < total else []
+        last = max(-(-total // per_page), 1)
+        links = []
+        if number < last:
+            links.append(f'<{request.url.include_query_params(page=number + 1)}>; rel="next"')
+            links.append(f'<{request.url.include_query_params(page=last)}>; rel="last"')
+        if number > 1:
+            links.append(f'<{request.url.include_query_params(page=1)}>; rel="first"')
+            links.append(f'<{request.url.include_query_params(page=number - 1)}>; rel="prev"')
+        return await reply(request, items, extra={"Link": ", ".join(links)} if links else None)
+
+    def since(request: Request, name: str = "since") -> datetime | None:
+        value = request.query_params.get(name)
+        return _parse(value) if value else None
+
+    def descending(request: Request) -> bool:
+        sort = request.query_params.get("sort", "created")
+        default = "desc" if sort == "created" else "asc"
+        return request.query_params.get("direction", default) == "desc"
+
+    @app.get("/user")
+    async def get_user(request: Request):
+        return await reply(request, {**dataset.user(base_of(request), LOGIN), "name": "Benchmark User"})
+
+    @app.get("/user/repos")
+    async def list_repos(request: Request):
+        base = base_of(request)
+        return await page(
+            request, dataset.repos,
+            lambda start, stop: [dataset.repo(base, LOGIN, f"repo-{i}") for i in range(start, stop)],
+        )
+
+    @app.post("/user/repos")
+    async def create_repo(request: Request):
+        body = await request.json()
+        return await reply(request, dataset.repo(base_of(request), LOGIN, body["name"]), status=201)
+
+    @app.get("/repos/{owner}/{name}")
+    async def get_repo(request: Request, owner: str, name: str):
+        return await reply(request, dataset.repo(base_of(request), owner, name))
+
+    @app.delete("/repos/{owner}/{name}")
+    async def delete_repo(request: Request, owner: str, name: str):
+        if latency:
+            await asyncio.sleep(latency)
+        return Response(status_code=204, headers=headers())
+
+    @app.get("/repos/{owner}/{name}/commits")
+    async def list_commits(request: Request, owner: str, name: str):
+        base, full_name = base_of(request), f"{owner}/{name}"
+        indexes = dataset.commit_range(since(request), since(request, "until"))
+        return await page(
+            request, len(indexes),
+            lambda start, stop: [dataset.commit(base, full_name, i) for i in indexes[start:stop]],
+        )
+
+    @app.get("/repos/{owner}/{name}/issues")
+    async def list_issues(request: Request, owner: str, name: str):
+        base, full_name = base_of(request), f"{owner}/{name}"
+        numbers = dataset.matching(
+            list(range(1, dataset.items + 1)),
+            request.query_params.get("state", "open"),
+            since(request),
+            descending(request),
+        )
+        return await page(
+            request, len(numbers),
+            lambda start, stop: [dataset.issue(base, full_name, n) for n in numbers[start:stop]],
+        )
+
+    @app.post("/repos/{owner}/{name}/issues")
+    async def create_issue(request: Request, owner: str, name: str):
+        body = await request.json()
+        issue = dataset.issue(base_of(request), f"{owner}/{name}", dataset.items + 1)
+        return await reply(request, {**issue, "title": body.get("title", issue["title"])}, status=201)
+
+    @app.get("/repos/{owner}/{name}/issues/{number}")
+    async def get_issue(request: Request, owner: str, name: str, number: int):
+        return await reply(request, dataset.issue(base_of(request), f"{owner}/{name}", number))
+
+    @app.patch("/repos/{owner}/{name}/issues/{number}")
+    async def edit_issue(request: Request, owner: str, name: str, number: int):
+        body = await request.json()
+        return await reply(request, {**dataset.issue(base_of(request), f"{owner}/{name}", number), **body})
+
+    @app.get("/repos/{owner}/{name}/pulls")
+    async def list_pulls(request: Request, owner: str, name: str):
+        base, full_name = base_of(request), f"{owner}/{name}"
+        numbers = dataset.matching(
+            dataset.pr_numbers, request.query_params.get("state", "open"), None, descending(request)
+        )
+        return await page(
+            request, len(numbers),
+            lambda start, stop: [dataset.pull(base, full_name, n) for n in numbers[start:stop]],
+        )
+
+    @app.post("/repos/{owner}/{name}/pulls")
+    async def create_pull(request: Request, owner: str, name: str):
+        body = await request.json()
+        pull = dataset.pull(base_of(request), f"{owner}/{name}", dataset.pr_numbers[-1])
+        return await reply(request, {**pull, "title": body.get("title", pull["title"]), "state": "open"}, status=201)
+
+    @app.get("/repos/{owner}/{name}/pulls/{number}")
+    async def get_pull(request: Request, owner: str, name: str, number: int):
+        if number not in dataset.is_pr:
+            return await reply(request, {"message": "Not Found"}, status=404)
+        return await reply(request, dataset.pull(base_of(request), f"{owner}/{name}", number))
+
+    @app.patch("/repos/{owner}/{name}/pulls/{number}")
+    async def edit_pull(request: Request, owner: str, name: str, number: int):
+        body = await request.json()
+        return await reply(request, {**dataset.pull(base_of(request), f"{owner}/{name}", number), **body})
+
+    @app.get("/repos/{owner}/{name}/pulls/{number}/comments")
+    async def list_comments(request: Request, owner: str, name: str, number: int):
+        base = base_of(request)
+        return await page(
+            request, dataset.comments,
+            lambda start, stop: [
+                {
+                    "id": number * 1000 + i,
+                    "body": f"Review comment {i} on #{number}",
+                    "user": dataset.user(base, _author(number + i, dataset.contributors)),
+                }
+                for i in range(start, stop)
+            ],
+        )
+
+    @app.get("/repos/{owner}/{name}/branches")
+    async def list_branches(request: Request, owner: str, name: str):
+        names = dataset.branch_names()
+        return await page(
+            request, len(names),
+            lambda start, stop: [{"name": branch, "protected": branch == "main"} for branch in names[start:stop]],
+        )
+
+    @app.get("/repos/{owner}/{name}/branches/{branch}")
+    async def get_branch(request: Request, owner: str, name: str, branch: str):
+        full_name = f"{owner}/{name}"
+        commit = dataset.commit(base_of(request), full_name, 0)
+        return await reply(request, {"name": branch, "commit": commit, "protected": branch == "main"})
+
+    @app.get("/__stats")
+    async def stats():
+        return {"requests": counters["requests"]}
+
+    return app
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--repos", type=int, default=50, help="repositories of the user")
+    parser.add_argument("--commits", type=int, default=10000, help="commits per repository")
+    parser.add_argument("--prs", type=int, default=5000, help="pull requests per repository")
+    parser.add_argument("--issues", type=int, default=5000, help="issues per repository")
+    parser.add_argument("--branches", type=int, default=200, help="branches per repository")
+    parser.add_argument("--comments", type=int, default=30, help="review comments per pull request")
+    parser.add_argument("--contributors", type=int, default=50, help="distinct authors")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="delay of every response")
+    parser.add_argument("--rate-limit", type=int, default=5000, help="hourly rate limit reported to the client")
+
+
+def dataset_from(args: argparse.Namespace) -> Dataset:
+    return Dataset(args.repos, args.commits, args.prs, args.issues, args.branches, args.comments, args.contributors)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake GitHub REST API for the benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args()
+    app = create_app(dataset_from(args), args.latency_ms / 1000, args.rate_limit)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
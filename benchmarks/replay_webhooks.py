@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import glob
+import hashlib
+import hmac
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+import httpx
+
+
+# Replays recorded GitHub webhook deliveries against the tool server.
+#
+# Each fixture (benchmarks/webhook_fixtures/*.json by default) holds one
+# delivery: {"event": ..., "delivery": ..., "payload": {...}}. Fixtures are sent
+# in file name order, signed with the webhook secret exactly as GitHub signs
+# them, and the server's answer is printed for each.
+#
+# By default they go to a running tool server (--url). With --in-process the
+# tool server app is loaded here instead, with throwaway caches, and the
+# activity index it ended up with is printed, so payload handling can be
+# checked offline without GitHub or a running server.
+#
+#   GITHUB_WEBHOOK_SECRET=... python benchmarks/replay_webhooks.py
+#   python benchmarks/replay_webhooks.py --in-process
+#   python benchmarks/replay_webhooks.py --in-process path/to/recorded/*.json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "webhook_fixtures")
+
+
+def load_fixtures(paths: list[str]) -> list[tuple[str, dict]]:
+    files = []
+    for path in paths or [FIXTURES]:
+        files.extend(sorted(glob.glob(os.path.join(path, "*.json"))) if os.path.isdir(path) else [path])
+    fixtures = []
+    for file in files:
+        with open(file) as f:
+            fixtures.append((os.path.basename(file), json.load(f)))
+    return fixtures
+
+
+async def replay(fixtures: list[tuple[str, dict]], client: httpx.AsyncClient, url: str, secret: str) -> int:
+    failures = 0
+    for name, fixture in fixtures:
+        body = json.dumps(fixture["payload"]).encode()
+        headers = {
+            "Content-Type": "application/json",
+            "X-GitHub-Event": fixture["event"],
+            "X-Hub-Signature-256": "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest(),
+        }
+        if fixture.get("delivery"):
+            headers["X-GitHub-Delivery"] = fixture["delivery"]
+        response = await client.post(url, content=body, headers=headers)
+        failures += response.status_code != 200
+        print(f"  {name:<36} {response.status_code}  {response.text}")
+    return failures
+
+
+async def run(args: argparse.Namespace) -> int:
+    fixtures = load_fixtures(args.fixtures)
+
+    if not args.in_process:
+        async with httpx.AsyncClient(timeout=30) as client:
+            return await replay(fixtures, client, args.url, args.secret)
+
+    sys.path[:0] = [SRC]
+    import main
+    from github_tools.activity_index import activity_index
+
+    transport = httpx.ASGITransport(app=main.main_mcp.http_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://tool-server") as client:
+        failures = await replay(fixtures, client, "/webhooks/github", args.secret)
+
+    if activity_index is not None:
+        print("\nActivity index:")
+        print(json.dumps(activity_index.stats(), indent=2))
+        repos = dict.fromkeys(fixture["payload"]["repository"]["full_name"] for _, fixture in fixtures)
+        for repo in repos:
+            print(f"  {repo}:", activity_index.summary(repo, datetime.min.replace(tzinfo=timezone.utc), datetime.max.replace(tzinfo=timezone.utc)))
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded GitHub webhook deliveries")
+    parser.add_argument("fixtures", nargs="*", help="fixture files or directories (default benchmarks/webhook_fixtures)")
+    parser.add_argument("--url", default="http://localhost:9000/webhooks/github", help="webhook endpoint of a running tool server")
+    parser.add_argument("--secret", default=os.getenv("GITHUB_WEBHOOK_SECRET", ""), help="webhook secret (default $GITHUB_WEBHOOK_SECRET)")
+    parser.add_argument("--in-process", action="store_true", help="load the tool server here, with throwaway caches")
+    args = parser.parse_args()
+
+    if args.in_process:
+        # read at import by the tool server modules
+        args.secret = args.secret or "replay"
+        os.environ.update({
+            "GITHUB_WEBHOOK_SECRET": args.secret,
+            "GITHUB_MCP_CACHE_DIR": tempfile.mkdtemp(prefix="github-mcp-replay-"),
+        })
+        os.environ.setdefault("GITHUB_TOKEN", "replay")
+    elif not args.secret:
+        parser.error("set GITHUB_WEBHOOK_SECRET or pass --secret")
+
+    sys.exit(1 if asyncio.run(run(args)) else 0)
+
+
+if __name__ == "__main__":
+    main()
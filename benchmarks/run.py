@@ -0,0 +1,357 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+from datetime import datetime, timezone
+
+import fake_github
+
+
+# Offline benchmark of the tool server and the LLM client.
+#
+# Starts the fake GitHub API (fake_github.py) in a subprocess with synthetic
+# repositories of the requested size and points the shared GitHub client at
+# it through GITHUB_BASE_URL. Then:
+#
+#   tools  every tool of main_mcp is called --iterations times through an MCP
+#          client: latency of the first (cold) call and of the warm ones,
+#          GitHub requests and listing pages per call (from the tool server's
+#          instrumentation), response size, and the peak memory of one call
+#   ask    /ask is driven at --concurrency with a deterministic fake Gemini
+#          (fake_gemini.py): throughput, latency percentiles and errors
+#
+# The report is written as JSON (default benchmarks/results/<timestamp>.json);
+# --compare prints the change against an earlier report.
+#
+#   python benchmarks/run.py --commits 10000 --prs 5000 --issues 5000
+#   python benchmarks/run.py --compare benchmarks/results/20250101-120000.json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+REPO = "bench/repo-0"
+WINDOW = {"start_date": "2024-10-01T00:00:00", "end_date": "2024-12-31T23:59:59"}
+
+# arguments each tool is benchmarked with; writes go to the fake API, which doesn't store them
+TOOL_CASES = {
+    "list_github_repos": {},
+    "create_github_repo": {"name": "bench-scratch"},
+    "delete_github_repo": {"repo_name": "bench-scratch"},
+    "create_issue": {"repo_name": REPO, "issue_title": "Benchmark issue"},
+    "get_issue_from_repo": {"repo_name": REPO, "issue_number": 2},
+    "get_issues_from_repo": {"repo_name": REPO, "first": 1, "last": 20},
+    "close_issue": {"repo_name": REPO, "issue_number": 2},
+    "close_all_open_issues": {"repo_name": REPO, "dry_run": True},
+    "create_pull_request": {"repo_name": REPO, "base_branch": "main", "head_branch": "feature-1", "pr_title": "Benchmark PR"},
+    "get_pull_request_details": {"repo_name": REPO, "pr_number": 1},
+    "get_pull_requests_details": {"repo_name": REPO, "first": 1, "last": 20},
+    "list_open_pull_requests": {"repo_name": REPO},
+    "list_recently_updated_prs": {"repo_name": REPO, "limit": 20},
+    "list_pr_comments": {"repo_name": REPO, "pr_number": 1},
+    "close_all_pull_request": {"repo_name": REPO, "dry_run": True},
+    "list_branches_in_repo": {"repo_name": REPO},
+    "get_default_branch": {"repo_name": REPO},
+    "get_repo_key_metrics": {"repo_name": REPO},
+    "compare_repos_key_metrics": {"sort_by": "open_issues", "top": 5},
+    "top_contributors": {"repo_name": REPO, **WINDOW},
+    "activity_summary": {"repo_name": REPO, **WINDOW},
+    # job_id is filled in by run() with a job it starts
+    "get_job_status": {},
+    "get_job_result": {},
+}
+
+# prompts /ask is driven with, and the tool calls the fake model makes for each
+ASK_PLANS = {
+    "What are the key metrics of bench/repo-0?": [("get_repo_key_metrics", {"repo_name": REPO})],
+    "Which of my repos have the most stars?": [("compare_repos_key_metrics", {"sort_by": "stars", "top": 5})],
+    "Show me pull request 1 in bench/repo-0": [("get_pull_request_details", {"repo_name": REPO, "pr_number": 1})],
+    "Summarize pull requests 1-20 of bench/repo-0": [
+        ("get_pull_requests_details", {"repo_name": REPO, "first": 1, "last": 20}),
+    ],
+    "Which PRs are open in bench/repo-0?": [("list_open_pull_requests", {"repo_name": REPO, "limit": 20})],
+    "Compare the default branch and issue 2 of bench/repo-0": [
+        ("get_default_branch", {"repo_name": REPO}),
+        ("get_issue_from_repo", {"repo_name": REPO, "issue_number": 2}),
+    ],
+    "Summarize the activity of bench/repo-0 last quarter": [("activity_summary", {"repo_name": REPO, **WINDOW})],
+}
+
+
+def percentiles(values: list[float]) -> dict:
+    """
+    p50/p90/p95/p99/max of a list of milliseconds (nearest rank).
+    """
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+
+    return {
+        "p50": round(rank(50), 1),
+        "p90": round(rank(90), 1),
+        "p95": round(rank(95), 1),
+        "p99": round(rank(99), 1),
+        "max": round(ordered[-1], 1),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args[1]} exited with code {process.returncode}")
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout:g}s")
+
+
+def start_fake_github(args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    port = free_port()
+    command = [sys.executable, os.path.join(ROOT, "benchmarks", "fake_github.py"), "--port", str(port)]
+    for name in ("repos", "commits", "prs", "issues", "branches", "comments", "contributors", "latency_ms", "rate_limit"):
+        command += [f"--{name.replace('_', '-')}", str(getattr(args, name))]
+    process = subprocess.Popen(command)
+    base_url = f"http://127.0.0.1:{port}"
+    wait_for(f"{base_url}/__stats", process)
+    return process, base_url
+
+
+def start_tool_server(port: int) -> subprocess.Popen:
+    # the tool server as deployed: main_mcp over HTTP in its own process
+    code = f"import main; main.main_mcp.run(transport='http', host='127.0.0.1', port={port}, log_level='warning')"
+    process = subprocess.Popen([sys.executable, "-c", code], cwd=SRC, env=os.environ.copy())
+    wait_for(f"http://127.0.0.1:{port}/metrics", process)
+    return process
+
+
+async def bench_tools(main_mcp, recent_calls, call_tool, iterations: int) -> dict:
+    from fastmcp import Client
+
+    names = sorted(await main_mcp.get_tools())
+    missing = [name for name in names if name not in TOOL_CASES]
+    if missing:
+        print(f"warning: no benchmark case for {', '.join(missing)}", file=sys.stderr)
+
+    results = {}
+    async with Client(main_mcp) as client:
+        for name in names:
+            if name not in TOOL_CASES:
+                continue
+            runs = []
+            for iteration in range(iterations):
+                request_id = f"bench-{name}-{iteration}"
+                started = time.perf_counter()
+                response = await call_tool(client, name, TOOL_CASES[name], 600, request_id)
+                elapsed = (time.perf_counter() - started) * 1000
+                record = next((call for call in reversed(recent_calls) if call["request_id"] == request_id), {})
+                runs.append({"ms": elapsed, "ok": "error" not in response, **record})
+
+            # one more call with allocation tracing, which is too slow to time
+            tracemalloc.start()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            await call_tool(client, name, TOOL_CASES[name], 600)
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+            tracemalloc.stop()
+
+            cold, warm = runs[0], runs[1:] or runs
+            results[name] = {
+                "ok": all(run["ok"] for run in runs),
+                "cold_ms": round(cold["ms"], 1),
+                "warm_ms": percentiles([run["ms"] for run in warm]),
+                "cold_github_requests": cold.get("github_requests"),
+                "warm_github_requests": warm[-1].get("github_requests"),
+                "cold_github_pages": cold.get("github_pages"),
+                "response_bytes": warm[-1].get("response_bytes"),
+                "peak_memory_kb": round(peak / 1024, 1),
+            }
+            print(f"  {name:28} cold {results[name]['cold_ms']:>9.1f} ms   warm p50 "
+                  f"{results[name]['warm_ms']['p50']:>8.1f} ms   {results[name]['cold_github_requests']} requests")
+    return results
+
+
+async def bench_ask(llm_client, args: argparse.Namespace) -> dict:
+    import httpx
+    from fake_gemini import FakeGemini
+
+    llm_client.gemini_client = FakeGemini(ASK_PLANS, args.model_latency_ms / 1000)
+    await llm_client.startup_event()
+    prompts = list(ASK_PLANS)
+    latencies, statuses, stopped = [], {}, {}
+    counter = iter(range(args.requests))
+
+    transport = httpx.ASGITransport(app=llm_client.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        # warm up every path once (sessions, tool routing, context caches, activity index)
+        for prompt in prompts:
+            await http.post("/ask", json={"prompt": prompt})
+
+        async def worker():
+            for index in counter:
+                started = time.perf_counter()
+                response = await http.post("/ask", json={"prompt": prompts[index % len(prompts)]})
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                if response.status_code == 200:
+                    reason = response.json().get("stopped") or "ok"
+                    stopped[reason] = stopped.get(reason, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        wall = time.perf_counter() - started
+
+    await llm_client.shutdown_event()
+    return {
+        "requests": len(latencies),
+        "concurrency": args.concurrency,
+        "throughput_rps": round(len(latencies) / wall, 2),
+        "latency_ms": percentiles(latencies),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "stopped": stopped,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: dict, baseline: dict) -> None:
+    """
+    Print how the main numbers moved against an earlier report.
+    """
+
+    def change(new, old):
+        if not isinstance(new, (int, float)) or not isinstance(old, (int, float)):
+            return "n/a"
+        return f"{new - old:+.1f} ({(new - old) / old * 100:+.0f}%)" if old else f"{new - old:+.1f}"
+
+    print(f"\nCompared with {baseline.get('git_commit') or 'baseline'} ({baseline.get('started_at')}):")
+    for name, result in report.get("tools", {}).items():
+        old = baseline.get("tools", {}).get(name)
+        if old:
+            print(f"  {name:28} warm p50 {change(result['warm_ms'].get('p50'), old['warm_ms'].get('p50'))} ms   "
+                  f"cold {change(result['cold_ms'], old['cold_ms'])} ms   "
+                  f"requests {change(result['cold_github_requests'], old['cold_github_requests'])}")
+    new_ask, old_ask = report.get("ask"), baseline.get("ask")
+    if new_ask and old_ask:
+        print(f"  /ask throughput {change(new_ask['throughput_rps'], old_ask['throughput_rps'])} rps   "
+              f"p50 {change(new_ask['latency_ms'].get('p50'), old_ask['latency_ms'].get('p50'))} ms   "
+              f"p95 {change(new_ask['latency_ms'].get('p95'), old_ask['latency_ms'].get('p95'))} ms")
+
+
+async def run(args: argparse.Namespace, report: dict) -> None:
+    sys.path[:0] = [SRC, ROOT]
+    import main
+    from github_tools.instrumentation import recent_calls
+    from src.llm.orchestrator import call_tool
+
+    if "tools" in args.only:
+        # a finished job for the job tools to look up
+        from github_tools.jobs import jobs
+        job = jobs.start("activity_summary", {"repo_name": REPO, **WINDOW}, lambda: {"name": REPO})
+        TOOL_CASES["get_job_status"]["job_id"] = TOOL_CASES["get_job_result"]["job_id"] = job["job_id"]
+        print("Tools:")
+        report["tools"] = await bench_tools(main.main_mcp, recent_calls, call_tool, args.iterations)
+
+    if "ask" in args.only:
+        # the LLM client picks its transport from the environment when it is imported
+        tool_server = None
+        os.environ.update(LLM_MCP_TRANSPORT=args.transport, LLM_MCP_POOL_SIZE=str(args.pool_size))
+        if args.transport == "http":
+            port = free_port()
+            tool_server = start_tool_server(port)
+            os.environ["MCP_SERVER_URL"] = f"http://127.0.0.1:{port}/mcp/"
+        try:
+            import src.LLM_client as llm_client
+
+            print(f"/ask ({args.transport} transport, concurrency {args.concurrency}):")
+            report["ask"] = await bench_ask(llm_client, args)
+            report["ask"]["transport"] = args.transport
+            print(f"  {report['ask']['throughput_rps']} requests/s, latency {report['ask']['latency_ms']}")
+        finally:
+            if tool_server is not None:
+                tool_server.terminate()
+                tool_server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline benchmark of the GitHub tools and /ask")
+    fake_github.add_arguments(parser)
+    parser.add_argument("--iterations", type=int, default=5, help="calls per tool (the first one is cold)")
+    parser.add_argument("--only", nargs="+", choices=["tools", "ask"], default=["tools", "ask"])
+    parser.add_argument("--requests", type=int, default=200, help="/ask requests to send")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent /ask requests")
+    parser.add_argument("--model-latency-ms", type=float, default=300.0, help="delay of each fake model turn")
+    parser.add_argument("--transport", choices=["memory", "http"], default="memory",
+                        help="how the LLM client reaches the tool server")
+    parser.add_argument("--pool-size", type=int, default=8, help="MCP sessions of the LLM client")
+    parser.add_argument("--output", help="report path (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier report to compare with")
+    args = parser.parse_args()
+
+    fake, base_url = start_fake_github(args)
+    cache_dir = tempfile.mkdtemp(prefix="github-mcp-bench-")
+    os.environ.update({
+        "GITHUB_BASE_URL": base_url,
+        "GITHUB_TOKEN": "bench",
+        "GITHUB_MCP_CACHE_DIR": cache_dir,
+        "GOOGLE_API_KEY": os.getenv("GOOGLE_API_KEY", "bench"),
+        # every /ask should reach the model and the tools
+        "LLM_PROMPT_CACHE_TTL": "0",
+        "LLM_ASK_TIMEOUT": "300",
+        "LLM_TOOL_TIMEOUT": "300",
+    })
+
+    started_at = datetime.now(timezone.utc)
+    report = {
+        "schema": 1,
+        "started_at": started_at.isoformat(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+    }
+    try:
+        asyncio.run(run(args, report))
+        with urllib.request.urlopen(f"{base_url}/__stats") as response:
+            report["fake_github_requests"] = json.load(response)["requests"]
+    finally:
+        fake.terminate()
+        fake.wait()
+
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"{started_at:%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import fake_github
+from run import SRC, start_fake_github
+
+
+# Startup benchmark of the tool server: how soon a new replica can answer.
+#
+# Each run starts a fresh interpreter, like a new replica with an empty cache
+# directory, that imports main.py and lists the tools through an in-memory MCP
+# client. The shared GitHub client is pointed at the fake GitHub API
+# (fake_github.py) and GITHUB_TOKEN is left unset, so the run also checks that
+# startup sends nothing to GitHub, needs no token and doesn't load PyGithub.
+#
+#   import   `import main`: every sub-server mounted, tool schemas built
+#   ready    import plus the first tools/list
+#   process  the whole child process, interpreter start included
+#
+# The run fails (exit code 1) when the median time to ready exceeds
+# --budget-ms, or when startup reached GitHub or loaded PyGithub.
+# --importtime prints the slowest imports of one more run (python -X importtime).
+#
+#   python benchmarks/startup.py
+#   python benchmarks/startup.py --runs 10 --budget-ms 800 --importtime
+
+# modules startup must not load: they belong to the first tool call
+DEFERRED = ("github", "requests")
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+import asyncio
+from fastmcp import Client
+
+async def list_tools():
+    async with Client(main.main_mcp) as client:
+        return await client.list_tools()
+
+tools = asyncio.run(list_tools())
+ready = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "ready_ms": (ready - started) * 1000,
+    "tools": len(tools),
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (DEFERRED,)
+
+
+def github_requests(base_url: str) -> int:
+    with urllib.request.urlopen(f"{base_url}/__stats") as response:
+        return json.load(response)["requests"]
+
+
+def child_env(base_url: str, cache_dir: str) -> dict:
+    env = {key: value for key, value in os.environ.items() if key != "GITHUB_TOKEN"}
+    env.update(GITHUB_BASE_URL=base_url, GITHUB_MCP_CACHE_DIR=cache_dir, PYTHONWARNINGS="ignore")
+    return env
+
+
+def start_once(base_url: str, flags: tuple[str, ...] = ()) -> tuple[dict, str]:
+    cache_dir = tempfile.mkdtemp(prefix="github-mcp-startup-")
+    try:
+        started = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, *flags, "-c", CHILD], cwd=SRC, env=child_env(base_url, cache_dir),
+            capture_output=True, text=True,
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"tool server failed to start:\n{process.stderr}")
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    result["process_ms"] = elapsed
+    return result, process.stderr
+
+
+def print_importtime(stderr: str, top: int) -> None:
+    # lines look like "import time:  self [us] | cumulative | <indent>package"
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # only what main.py and the github_tools modules import directly
+        if len(name) - len(name.lstrip()) <= 3:
+            rows.append((int(cumulative), name.strip()))
+    print(f"\nSlowest imports (cumulative, top {top}):")
+    for cumulative, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Startup time of the tool server")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to start")
+    parser.add_argument("--budget-ms", type=float, default=1500, help="most the median time to ready may take")
+    parser.add_argument("--importtime", action="store_true", help="also print the slowest imports of one run")
+    parser.add_argument("--top", type=int, default=15, help="imports listed by --importtime")
+    fake_github.add_arguments(parser)
+    # startup reads nothing, so the fake GitHub only has to answer
+    parser.set_defaults(repos=1, commits=1, prs=1, issues=1, branches=1, comments=1, contributors=1, latency_ms=0)
+    args = parser.parse_args()
+
+    fake, base_url = start_fake_github(args)
+    try:
+        before = github_requests(base_url)
+        runs = [start_once(base_url)[0] for _ in range(args.runs)]
+        sent = github_requests(base_url) - before
+        if args.importtime:
+            print_importtime(start_once(base_url, ("-X", "importtime"))[1], args.top)
+    finally:
+        fake.terminate()
+        fake.wait()
+
+    print(f"\nTool server startup, {args.runs} runs ({runs[0]['tools']} tools):")
+    for key in ("import_ms", "ready_ms", "process_ms"):
+        values = [run[key] for run in runs]
+        print(f"  {key[:-3]:<8} median {statistics.median(values):7.1f} ms   max {max(values):7.1f} ms")
+    loaded = sorted({name for run in runs for name in run["loaded"]})
+    print(f"  GitHub requests during startup: {sent}")
+    print(f"  deferred modules loaded: {', '.join(loaded) or 'none'}")
+
+    ready = statistics.median(run["ready_ms"] for run in runs)
+    failures = []
+    if ready > args.budget_ms:
+        failures.append(f"median time to ready {ready:.0f} ms is over the {args.budget_ms:g} ms budget")
+    if sent:
+        failures.append(f"startup sent {sent} requests to GitHub")
+    if loaded:
+        failures.append(f"startup loaded {', '.join(loaded)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
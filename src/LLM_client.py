@@ -1,43 +1,357 @@
 # fastapi_server.py
 
 import asyncio
-from fastmcp import Client, FastMCP
+import hashlib
+import json
+import os
+import sys
+import time
+import uuid
+from typing import Optional
 from google import genai
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 
+# main.py and github_tools import each other as top-level modules. The LLM
+# client (and the llm package) imports them the same way, so with
+# LLM_MCP_TRANSPORT=memory each tool module is loaded once, not a second time
+# as src.github_tools.
+SRC = os.path.dirname(os.path.abspath(__file__))
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+from .llm.session_pool import SERVER_URL, MCPSessionPool
+from .llm.prompt_cache import prompt_cache
+from .llm.routing import CATEGORIES_RESOURCE, router
+from .llm.context_cache import context_cache
+from .llm.orchestrator import MODEL, answer, gemini_tools, recent_timelines, stream_answer
+from .llm import metrics
+from github_tools.metrics import CONTENT_TYPE
+
+# how often the tool catalog is re-read to notice added or changed tools
+TOOLS_REFRESH_INTERVAL = float(os.getenv("LLM_TOOLS_REFRESH_INTERVAL", "60"))
+# overall time limit of one /ask request
+ASK_TIMEOUT = float(os.getenv("LLM_ASK_TIMEOUT", "10"))
+# extra time an /ask request gets after its deadline to return partial results
+DEADLINE_GRACE = 2.0
+# "http" talks to the tool server at MCP_SERVER_URL; "memory" hosts main_mcp in
+# this process and calls it without the HTTP round-trip
+MCP_TRANSPORT = os.getenv("LLM_MCP_TRANSPORT", "http")
+
 class PromptPayload(BaseModel):
     prompt: str
+    # tool category ("repos", "issues", "pull_requests", "branches", "analysis", "jobs");
+    # classified from the prompt when omitted
+    category: Optional[str] = None
+
+def tool_server():
+    """
+    What the MCP sessions connect to: the HTTP endpoint of a separate tool
+    server, or main_mcp itself through FastMCP's in-memory transport.
+
+    Returns:
+        str or FastMCP: MCP_SERVER_URL, or the main_mcp server object.
+    """
+    if MCP_TRANSPORT == "http":
+        return SERVER_URL
+    if MCP_TRANSPORT != "memory":
+        raise ValueError(f"LLM_MCP_TRANSPORT must be 'http' or 'memory', not {MCP_TRANSPORT!r}")
+    from main import main_mcp
+    return main_mcp
 
 app = FastAPI()
-mcp_client = Client("http://localhost:9000/mcp/")
-gemini_client = genai.Client()
+mcp_pool = MCPSessionPool(tool_server())
+# built on first use, so importing this module needs neither GOOGLE_API_KEY
+# nor the time to set the client up; the benchmarks swap in a fake here
+gemini_client = None
+
+def gemini() -> genai.Client:
+    """The Gemini client, created on the first call."""
+    global gemini_client
+    if gemini_client is None:
+        gemini_client = genai.Client()
+    return gemini_client
+
+@metrics.registry.collector
+def _session_pool():
+    stats = mcp_pool.stats()
+    yield "llm_mcp_sessions_in_use", "gauge", "MCP sessions currently leased", [({}, stats["in_use"])]
+    yield "llm_mcp_session_connects_total", "counter", "MCP session (re)connects", [({}, stats["connects"])]
+    yield "llm_mcp_session_wait_seconds_total", "counter", "Time requests waited for an MCP session", [({}, stats["wait_seconds"])]
+
+async def load_tools():
+    """
+    Read the tool catalog from the MCP server and, when it changed, rebuild
+    everything derived from it.
+    """
+    async with mcp_pool.lease() as mcp_client:
+        tools = await mcp_client.list_tools()
+        try:
+            contents = await mcp_client.read_resource(CATEGORIES_RESOURCE)
+            categories = json.loads(contents[0].text)
+        except Exception:
+            # older tool server: offer every tool with every prompt
+            categories = {}
+
+    fingerprint = hashlib.sha256(
+        json.dumps([[tool.model_dump(mode="json") for tool in tools], categories], sort_keys=True).encode()
+    ).hexdigest()
+    if fingerprint == getattr(app.state, "tools_fingerprint", None):
+        return
+    app.state.tools_fingerprint = fingerprint
+    prompt_cache.set_tools(tools)
+    router.set_tools(gemini_tools(tools), categories)
+    await context_cache.reset(gemini())
+
+async def watch_tools():
+    while True:
+        await asyncio.sleep(TOOLS_REFRESH_INTERVAL)
+        try:
+            await load_tools()
+        except Exception:
+            # tool server briefly unavailable; the next round tries again
+            pass
 
 @app.on_event("startup")
 async def startup_event():
-    await mcp_client.__aenter__()
+    await mcp_pool.start()
+    await load_tools()
+    app.state.tools_watcher = asyncio.create_task(watch_tools())
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    await mcp_client.__aexit__()
+    app.state.tools_watcher.cancel()
+    await mcp_pool.close()
+
+async def route(payload: PromptPayload):
+    """
+    Tools to offer for a prompt, the routing report and the context cache holding the tools.
+    """
+    try:
+        tools, routing = router.select(payload.prompt, payload.category)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    cached_content = await context_cache.lookup(gemini(), MODEL, tools, routing["tool_tokens"])
+    routing["context_cached"] = cached_content is not None
+    return tools, routing, cached_content
+
+def request_deadline(timeout: Optional[float], limit: Optional[float] = None) -> Optional[float]:
+    """
+    time.monotonic() deadline from the caller's X-Request-Timeout (seconds it
+    is willing to wait) and the server's own limit, whichever is shorter.
+    """
+    budgets = [budget for budget in (timeout, limit) if budget is not None]
+    return time.monotonic() + min(budgets) if budgets else None
+
+def outcome(stopped: Optional[str]) -> str:
+    return stopped or "ok"
+
+def cacheable(result: dict) -> bool:
+    """
+    Whether a finished run's answer may be replayed from the prompt cache: it
+    is not empty, no tool call failed, and it is not partial (stopped by the
+    deadline or turn budget, or built on a truncated tool result).
+    """
+    return bool(result["response"]) and not result["failed"] and not result["stopped"] and not result["partial"]
 
 @app.post("/ask")
-async def ask(payload: PromptPayload):
+async def ask(
+    payload: PromptPayload,
+    response: Response,
+    x_request_timeout: Optional[float] = Header(None),
+    x_request_id: Optional[str] = Header(None),
+):
+    deadline = request_deadline(x_request_timeout, ASK_TIMEOUT)
+    # echoed back and sent with every tool call, see /debug/timelines and the
+    # tool server's /debug/tool-calls
+    request_id = x_request_id or uuid.uuid4().hex
+    response.headers["X-Request-ID"] = request_id
+    scope = payload.category or ""
+    cached = prompt_cache.get(payload.prompt, scope)
+    if cached is not None:
+        metrics.ask_requests.inc(endpoint="/ask", outcome="cached")
+        return {"response": cached, "cached": True}
+
+    tools, routing, cached_content = await route(payload)
+    started = time.perf_counter()
     try:
-        response = await asyncio.wait_for(
-            gemini_client.aio.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=payload.prompt,
-                config=genai.types.GenerateContentConfig(
-                    temperature=0,
-                    tools=[mcp_client.session],
+        async with mcp_pool.lease() as mcp_client:
+            # the orchestrator stops by itself at the deadline; the grace
+            # period only catches a model call that hangs past it
+            result = await asyncio.wait_for(
+                answer(
+                    gemini(), mcp_client, tools, payload.prompt,
+                    cached_content=cached_content, deadline=deadline, request_id=request_id,
                 ),
-            ),
-            
-            timeout=10.0
+                timeout=max(deadline - time.monotonic(), 0) + DEADLINE_GRACE
+            )
+        metrics.ask_requests.inc(endpoint="/ask", outcome=outcome(result["stopped"]))
+        prompt_cache.record(
+            payload.prompt,
+            result["calls"],
+            result["response"],
+            cacheable=cacheable(result),
+            scope=scope,
         )
-        return {"response": response.text}
+        return {
+            "response": result["response"],
+            "cached": False,
+            "routing": routing,
+            "usage": result["usage"],
+            "stopped": result["stopped"],
+            "partial": result["partial"],
+            "timeline": result["timeline"],
+        }
     except asyncio.TimeoutError:
-        raise HTTPException(status_code=504, detail="Request to Gemini timed out")
+        # the run may have mutated something before it was cut off
+        prompt_cache.clear()
+        metrics.ask_requests.inc(endpoint="/ask", outcome="timeout")
+        raise HTTPException(status_code=504, detail="Request to Gemini timed out", headers={"X-Request-ID": request_id})
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        prompt_cache.clear()
+        metrics.ask_requests.inc(endpoint="/ask", outcome="error")
+        raise HTTPException(status_code=500, detail=str(e), headers={"X-Request-ID": request_id})
+    finally:
+        metrics.ask_latency.observe(time.perf_counter() - started, endpoint="/ask")
+
+
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/ask/stream")
+async def ask_stream(
+    payload: PromptPayload,
+    x_request_timeout: Optional[float] = Header(None),
+    x_request_id: Optional[str] = Header(None),
+):
+    """
+    Server-sent events version of /ask: a "routing" event reports which tools
+    are offered to the model, "token" events carry model output as it is
+    generated, "tool_start"/"tool_end" events report tool calls and their
+    latency, and a final "done" (or "error") event closes the stream.
+    """
+    deadline = request_deadline(x_request_timeout)
+    request_id = x_request_id or uuid.uuid4().hex
+    scope = payload.category or ""
+    cached = prompt_cache.get(payload.prompt, scope)
+    tools, routing, cached_content = (None, None, None) if cached is not None else await route(payload)
+
+    async def events():
+        if cached is not None:
+            metrics.ask_requests.inc(endpoint="/ask/stream", outcome="cached")
+            yield sse("token", {"text": cached})
+            yield sse("done", {"response": cached, "cached": True})
+            return
+
+        yield sse("routing", routing)
+        completed = False
+        result = "error"
+        started = time.perf_counter()
+        try:
+            async with mcp_pool.lease() as mcp_client:
+                async for event in stream_answer(
+                    gemini(), mcp_client, tools, payload.prompt, cached_content=cached_content,
+                    deadline=deadline, request_id=request_id,
+                ):
+                    kind = event.pop("event")
+                    if kind == "done":
+                        completed = True
+                        result = outcome(event["stopped"])
+                        prompt_cache.record(
+                            payload.prompt,
+                            event["calls"],
+                            event["response"],
+                            cacheable=cacheable(event),
+                            scope=scope,
+                        )
+                        yield sse("done", {
+                            "response": event["response"],
+                            "cached": False,
+                            "usage": event["usage"],
+                            "stopped": event["stopped"],
+                            "partial": event["partial"],
+                            "timeline": event["timeline"],
+                        })
+                    else:
+                        yield sse(kind, event)
+        except Exception as e:
+            yield sse("error", {"detail": str(e)})
+        finally:
+            if not completed:
+                # the run may have mutated something before it stopped,
+                # including when the client went away mid-stream
+                prompt_cache.clear()
+            metrics.ask_requests.inc(endpoint="/ask/stream", outcome=result)
+            metrics.ask_latency.observe(time.perf_counter() - started, endpoint="/ask/stream")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Request-ID": request_id},
+    )
+
+
+async def job_tool(name: str, job_id: str) -> dict:
+    # straight to the tool server: polling a job needs no model turn
+    async with mcp_pool.lease() as mcp_client:
+        result = await mcp_client.call_tool(name, {"job_id": job_id}, raise_on_error=False)
+    if result.is_error:
+        raise HTTPException(status_code=404, detail=result.content[0].text if result.content else "Unknown job")
+    return result.structured_content
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """
+    Status and progress of a background job started by a tool call.
+    """
+    return await job_tool("get_job_status", job_id)
+
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    """
+    Result of a background job, or its status while it is still running.
+    """
+    return await job_tool("get_job_result", job_id)
+
+
+@app.get("/debug/timelines")
+async def timelines(limit: int = 10, request_id: Optional[str] = None):
+    """
+    Step timelines of the most recent requests (newest first), including ones
+    that failed or timed out.
+    """
+    return [
+        timeline for timeline in reversed(recent_timelines)
+        if request_id is None or timeline["request_id"] == request_id
+    ][:limit]
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """
+    Prometheus metrics of the LLM client, and of the tool server when it runs in this process.
+    """
+    body = metrics.registry.render()
+    if MCP_TRANSPORT == "memory":
+        from github_tools.metrics import registry as tool_metrics
+        body += tool_metrics.render()
+    return PlainTextResponse(body, media_type=CONTENT_TYPE)
+
+
+@app.get("/debug/tool-calls")
+async def tool_calls(limit: int = 20, request_id: Optional[str] = None):
+    """
+    Most recent tool calls (newest first) when the tool server runs in this
+    process; a separate tool server serves them itself.
+    """
+    if MCP_TRANSPORT != "memory":
+        raise HTTPException(status_code=404, detail="The tool server runs separately; ask its /debug/tool-calls")
+    from github_tools.instrumentation import recent_calls
+    return [
+        call for call in reversed(recent_calls)
+        if request_id is None or call["request_id"] == request_id
+    ][:limit]
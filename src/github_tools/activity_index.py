@@ -0,0 +1,412 @@
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Executor
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+from github_tools.client import CACHE_DIR
+from github_tools.deadline import Cutoff
+from github_tools.execution import submit
+from github_tools.jobs import progress
+
+if TYPE_CHECKING:
+    from github.Repository import Repository
+
+
+# Local SQLite index of commits, pull requests and issues per repository.
+# Each repo is synced incrementally from saved cursors (last commit date and
+# last issue/PR update), so analytics tools query local tables instead of
+# paging the full history from GitHub on every call. Webhook deliveries (see
+# webhooks.py) are applied to the same tables as they arrive. Commits and
+# issues/PRs are kept fresh separately: a stream that receives deliveries
+# (push events for commits, issues and pull_request events for issues/PRs) is
+# only polled every GITHUB_INDEX_PUSHED_SYNC_INTERVAL, as a safety net for
+# missed deliveries, while the other one is still polled every
+# GITHUB_INDEX_SYNC_INTERVAL.
+#
+# A commit can reach the default branch with a committer date older than the
+# commit cursor (a merged branch, a rebase that kept dates, a cherry-pick), so
+# every commit sync looks back GITHUB_INDEX_COMMIT_OVERLAP behind the cursor;
+# commits already stored are simply replaced.
+#
+#   GITHUB_ACTIVITY_INDEX                set to "0" to disable the index
+#   GITHUB_INDEX_SYNC_INTERVAL           seconds a stream is considered fresh after a sync
+#   GITHUB_INDEX_PUSHED_SYNC_INTERVAL    the same for streams kept current by webhooks
+#   GITHUB_INDEX_COMMIT_OVERLAP          seconds behind the commit cursor re-read on every sync
+
+ENABLED = os.getenv("GITHUB_ACTIVITY_INDEX", "1") != "0"
+SYNC_INTERVAL = float(os.getenv("GITHUB_INDEX_SYNC_INTERVAL", "60"))
+PUSHED_SYNC_INTERVAL = float(os.getenv("GITHUB_INDEX_PUSHED_SYNC_INTERVAL", "3600"))
+COMMIT_OVERLAP = float(os.getenv("GITHUB_INDEX_COMMIT_OVERLAP", "604800"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS commits (
+    repo TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    author TEXT NOT NULL,
+    committed_at TEXT NOT NULL,
+    PRIMARY KEY (repo, sha)
+);
+CREATE INDEX IF NOT EXISTS commits_by_date ON commits (repo, committed_at);
+
+CREATE TABLE IF NOT EXISTS items (
+    repo TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    author TEXT NOT NULL,
+    state TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    closed_at TEXT,
+    merged_at TEXT,
+    PRIMARY KEY (repo, number)
+);
+CREATE INDEX IF NOT EXISTS items_by_created ON items (repo, kind, created_at);
+CREATE INDEX IF NOT EXISTS items_by_closed ON items (repo, kind, closed_at);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    repo TEXT PRIMARY KEY,
+    covered_from TEXT NOT NULL,
+    commits_cursor TEXT NOT NULL,
+    items_cursor TEXT NOT NULL,
+    commits_synced_at REAL NOT NULL,
+    items_synced_at REAL NOT NULL
+);
+"""
+
+
+def _iso(value: datetime | None) -> str | None:
+    # one fixed UTC format keeps string comparison in SQLite chronological
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def _login(user) -> str:
+    return user.login if user else "Unknown"
+
+
+class ActivityIndex:
+    """
+    Incrementally synced store of repository activity.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.syncs = 0
+        self.synced_commits = 0
+        self.synced_items = 0
+        self.pushed_commits = 0
+        self.pushed_items = 0
+        self._lock = threading.Lock()
+        self._repo_locks: dict[str, threading.Lock] = {}
+        # repos whose commits / issues and PRs received webhook events since
+        # the server started
+        self._pushed_commits: set[str] = set()
+        self._pushed_items: set[str] = set()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+
+    def _migrate(self) -> None:
+        # indexes written before commits and items were synced separately
+        # have a single synced_at
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(sync_state)")]
+        if "synced_at" in columns:
+            self._db.execute("ALTER TABLE sync_state RENAME COLUMN synced_at TO commits_synced_at")
+            self._db.execute("ALTER TABLE sync_state ADD COLUMN items_synced_at REAL NOT NULL DEFAULT 0")
+
+    @staticmethod
+    def key(repo_name: str) -> str:
+        return repo_name.lower()
+
+    def _repo_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._repo_locks.setdefault(key, threading.Lock())
+
+    def _state(self, key: str) -> tuple | None:
+        with self._lock:
+            return self._db.execute(
+                "SELECT covered_from, commits_cursor, items_cursor, commits_synced_at, items_synced_at "
+                "FROM sync_state WHERE repo = ?",
+                (key,),
+            ).fetchone()
+
+    def _stale(self, synced_at: float, pushed: set[str], key: str) -> bool:
+        return time.time() - synced_at >= (PUSHED_SYNC_INTERVAL if key in pushed else SYNC_INTERVAL)
+
+    # ------------------------------------------------------------------ sync
+
+    def sync(self, repo: "Repository", since: datetime, executor: Executor | None = None) -> bool:
+        """
+        Bring the index for a repository up to date and make sure it covers
+        everything from `since` onwards.
+
+        The first sync downloads activity from `since`; later syncs only fetch
+        commits and issues/PRs newer than the saved cursors (commits from
+        COMMIT_OVERLAP before theirs), and only for the streams that are no
+        longer fresh. Asking for an earlier `since` than is covered backfills
+        the missing range once.
+
+        Returns False if the caller's deadline stopped the sync early. What was
+        fetched is kept, but the cursors only advance over complete ranges, so
+        the next sync continues where this one left off.
+        """
+        key = self.key(repo.full_name)
+        since_iso = _iso(since)
+
+        with self._repo_lock(key):
+            state = self._state(key)
+            fetch_commits = fetch_items = True
+            if state is None:
+                covered_from = commits_since = items_since = since_iso
+            else:
+                covered_from, commits_since, items_since, commits_synced_at, items_synced_at = state
+                if since_iso < covered_from:
+                    # backfill: everything from the new start; rows already
+                    # stored are simply replaced
+                    covered_from = commits_since = items_since = since_iso
+                else:
+                    fetch_commits = self._stale(commits_synced_at, self._pushed_commits, key)
+                    fetch_items = self._stale(items_synced_at, self._pushed_items, key)
+                    if not (fetch_commits or fetch_items):
+                        return True
+
+            # re-read the overlap window for commits that landed backdated
+            overlap_from = _iso(datetime.fromisoformat(commits_since) - timedelta(seconds=COMMIT_OVERLAP))
+            commits_from = max(covered_from, overlap_from)
+
+            commits_cutoff, items_cutoff = Cutoff(), Cutoff()
+            commits, items = [], []
+            streams = [name for name, fetch in (("commits", fetch_commits), ("issues/PRs", fetch_items)) if fetch]
+            progress(message=f"fetching {' and '.join(streams)} of {repo.full_name} into the activity index")
+            if executor is not None and fetch_commits and fetch_items:
+                commits_future = submit(executor, self._fetch_commits, repo, commits_from, commits_cutoff)
+                items = self._fetch_items(repo, items_since, items_cutoff)
+                commits = commits_future.result()
+            else:
+                if fetch_commits:
+                    commits = self._fetch_commits(repo, commits_from, commits_cutoff)
+                if fetch_items:
+                    items = self._fetch_items(repo, items_since, items_cutoff)
+
+            if commits_cutoff.truncated:
+                # commits arrive newest first, so a partial fetch leaves a gap
+                # after the cursor: fetch the whole range again next time
+                commits_cursor = commits_since
+            else:
+                commits_cursor = max([c[3] for c in commits] + [state[1] if state else since_iso])
+            if items_cutoff.truncated:
+                # oldest update first, so everything up to the last item is complete
+                items_cursor = max([i[6] for i in items] + [items_since])
+            else:
+                items_cursor = max([i[6] for i in items] + [state[2] if state else since_iso])
+
+            complete = not (commits_cutoff.truncated or items_cutoff.truncated)
+            if not complete:
+                # a backfill only counts once it finished; synced_at = 0 keeps
+                # the repo from being considered fresh
+                covered_from = state[0] if state and since_iso < state[0] else covered_from
+            now = time.time() if complete else 0.0
+            commits_synced_at = now if fetch_commits else state[3]
+            items_synced_at = now if fetch_items else state[4]
+
+            with self._lock:
+                self._db.executemany("INSERT OR REPLACE INTO commits VALUES (?, ?, ?, ?)", commits)
+                self._db.executemany("INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", items)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, covered_from, commits_cursor, items_cursor, commits_synced_at, items_synced_at),
+                )
+                self._db.commit()
+                self.syncs += 1
+                self.synced_commits += len(commits)
+                self.synced_items += len(items)
+            return complete
+
+    def _fetch_commits(self, repo: "Repository", since: str, cutoff: Cutoff) -> list[tuple]:
+        key = self.key(repo.full_name)
+        commits = []
+        for commit in cutoff(repo.get_commits(since=datetime.fromisoformat(since))):
+            commits.append((key, commit.sha, _login(commit.author), _iso(commit.commit.committer.date)))
+            progress(advance=1)
+        return commits
+
+    def _fetch_items(self, repo: "Repository", since: str, cutoff: Cutoff) -> list[tuple]:
+        # the issues API returns PRs as well, so one stream fills both kinds
+        key = self.key(repo.full_name)
+        items = []
+        issues = repo.get_issues(state="all", since=datetime.fromisoformat(since), sort="updated", direction="asc")
+        for issue in cutoff(issues):
+            # plain issues have no "pull_request" key; reading the attribute would
+            # fetch each of them again, so only PRs (by their URL) read it
+            pull_request = issue.pull_request if "/pull/" in issue.html_url else None
+            items.append((
+                key,
+                issue.number,
+                "pull_request" if pull_request else "issue",
+                _login(issue.user),
+                issue.state,
+                _iso(issue.created_at),
+                _iso(issue.updated_at),
+                _iso(issue.closed_at),
+                _iso(pull_request.merged_at) if pull_request else None,
+            ))
+            progress(advance=1)
+        return items
+
+    # -------------------------------------------------------------- webhooks
+
+    def apply_item(
+        self,
+        repo_name: str,
+        number: int,
+        kind: str,
+        author: str,
+        state: str,
+        created_at: datetime,
+        updated_at: datetime,
+        closed_at: datetime | None = None,
+        merged_at: datetime | None = None,
+    ) -> None:
+        """
+        Store an issue or pull request from a webhook payload. A delivery that
+        arrives after a newer update of the same item is ignored.
+        """
+        key = self.key(repo_name)
+        row = (key, number, kind, author, state, _iso(created_at), _iso(updated_at), _iso(closed_at), _iso(merged_at))
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (repo, number) DO UPDATE SET kind = excluded.kind, author = excluded.author, "
+                "state = excluded.state, created_at = excluded.created_at, updated_at = excluded.updated_at, "
+                "closed_at = excluded.closed_at, merged_at = excluded.merged_at "
+                "WHERE excluded.updated_at >= items.updated_at",
+                row,
+            )
+            self._db.commit()
+            self.pushed_items += 1
+            self._pushed_items.add(key)
+
+    def delete_item(self, repo_name: str, number: int) -> None:
+        key = self.key(repo_name)
+        with self._lock:
+            self._db.execute("DELETE FROM items WHERE repo = ? AND number = ?", (key, number))
+            self._db.commit()
+            self._pushed_items.add(key)
+
+    def apply_commits(self, repo_name: str, commits: list[tuple[str, str, datetime]]) -> None:
+        """
+        Store (sha, author, committed_at) commits pushed to the default branch.
+        """
+        key = self.key(repo_name)
+        rows = [(key, sha, author, _iso(committed_at)) for sha, author, committed_at in commits]
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO commits VALUES (?, ?, ?, ?)", rows)
+            self._db.commit()
+            self.pushed_commits += len(rows)
+            self._pushed_commits.add(key)
+
+    def drop_repo(self, repo_name: str) -> None:
+        """
+        Forget everything stored for a repository, e.g. after it was deleted or renamed.
+        """
+        key = self.key(repo_name)
+        with self._lock:
+            for table in ("commits", "items", "sync_state"):
+                self._db.execute(f"DELETE FROM {table} WHERE repo = ?", (key,))
+            self._db.commit()
+            self._pushed_commits.discard(key)
+            self._pushed_items.discard(key)
+
+    # --------------------------------------------------------------- queries
+
+    def contributors(self, repo_name: str, start: datetime, end: datetime) -> dict:
+        """
+        Per-user counts of commits, pull requests and issues created in a window.
+        """
+        key, start_iso, end_iso = self.key(repo_name), _iso(start), _iso(end)
+        contributors = {}
+
+        def add(author, field, count):
+            entry = contributors.setdefault(author, {"commits": 0, "pull_requests": 0, "issues": 0})
+            entry[field] += count
+
+        with self._lock:
+            commit_rows = self._db.execute(
+                "SELECT author, COUNT(*) FROM commits WHERE repo = ? AND committed_at BETWEEN ? AND ? GROUP BY author",
+                (key, start_iso, end_iso),
+            ).fetchall()
+            item_rows = self._db.execute(
+                "SELECT kind, author, COUNT(*) FROM items WHERE repo = ? AND created_at BETWEEN ? AND ? GROUP BY kind, author",
+                (key, start_iso, end_iso),
+            ).fetchall()
+
+        for author, count in commit_rows:
+            add(author, "commits", count)
+        for kind, author, count in item_rows:
+            add(author, "pull_requests" if kind == "pull_request" else "issues", count)
+        return contributors
+
+    def summary(self, repo_name: str, start: datetime, end: datetime) -> dict:
+        """
+        Activity totals for a time window.
+        """
+        key, start_iso, end_iso = self.key(repo_name), _iso(start), _iso(end)
+        with self._lock:
+            commits, commit_authors = self._db.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT author) FROM commits WHERE repo = ? AND committed_at BETWEEN ? AND ?",
+                (key, start_iso, end_iso),
+            ).fetchone()
+            opened = dict(self._db.execute(
+                "SELECT kind, COUNT(*) FROM items WHERE repo = ? AND created_at BETWEEN ? AND ? GROUP BY kind",
+                (key, start_iso, end_iso),
+            ).fetchall())
+            closed = dict(self._db.execute(
+                "SELECT kind, COUNT(*) FROM items WHERE repo = ? AND closed_at BETWEEN ? AND ? GROUP BY kind",
+                (key, start_iso, end_iso),
+            ).fetchall())
+            merged = self._db.execute(
+                "SELECT COUNT(*) FROM items WHERE repo = ? AND merged_at BETWEEN ? AND ?",
+                (key, start_iso, end_iso),
+            ).fetchone()[0]
+            contributors = self._db.execute(
+                "SELECT COUNT(*) FROM ("
+                "SELECT author FROM commits WHERE repo = ? AND committed_at BETWEEN ? AND ? "
+                "UNION SELECT author FROM items WHERE repo = ? AND created_at BETWEEN ? AND ?)",
+                (key, start_iso, end_iso, key, start_iso, end_iso),
+            ).fetchone()[0]
+
+        return {
+            "commits": commits,
+            "commit_authors": commit_authors,
+            "pull_requests_opened": opened.get("pull_request", 0),
+            "pull_requests_closed": closed.get("pull_request", 0),
+            "pull_requests_merged": merged,
+            "issues_opened": opened.get("issue", 0),
+            "issues_closed": closed.get("issue", 0),
+            "active_contributors": contributors,
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            repos = self._db.execute("SELECT COUNT(*) FROM sync_state").fetchone()[0]
+            return {
+                "repos": repos,
+                "syncs": self.syncs,
+                "synced_commits": self.synced_commits,
+                "synced_items": self.synced_items,
+                "pushed_commits": self.pushed_commits,
+                "pushed_items": self.pushed_items,
+                "path": self.path,
+            }
+
+
+activity_index = ActivityIndex(os.path.join(CACHE_DIR, "activity_index.sqlite3")) if ENABLED else None
@@ -0,0 +1,97 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Optional
+from github_tools.deadline import DeadlineExceeded, expired
+from github_tools.execution import submit
+
+
+# Concurrent lookups used by the batch get_* tools.
+#
+# A batch asks for many issues or pull requests by number in one tool call, so
+# "summarize PRs 101-140" costs one model turn instead of forty. The numbers are
+# fetched on a small shared pool, one GET each. Results come back in the order
+# they were asked for, and a failed lookup (e.g. a 404 for a missing number) is
+# reported next to the others instead of failing the whole batch. Lookups not
+# started before the caller's deadline are reported as not attempted, and items
+# cut to fit the response budget (see projection.fit) as omitted_numbers.
+#
+#   GITHUB_BATCH_CONCURRENCY  concurrent lookups across all batch calls
+#   GITHUB_BATCH_MAX_ITEMS    most numbers one batch call may ask for
+
+CONCURRENCY = int(os.getenv("GITHUB_BATCH_CONCURRENCY", "8"))
+MAX_ITEMS = int(os.getenv("GITHUB_BATCH_MAX_ITEMS", "100"))
+
+batch_pool = ThreadPoolExecutor(max_workers=CONCURRENCY, thread_name_prefix="github-batch")
+
+
+def batch_numbers(numbers: Optional[Iterable[int]], first: Optional[int], last: Optional[int]) -> list[int]:
+    """
+    The numbers a batch call asks for: an explicit list, an inclusive range, or both.
+
+    Args:
+        numbers (Iterable[int], optional): Individual numbers, e.g. [12, 15, 31].
+        first (int, optional): First number of a range.
+        last (int, optional): Last number of the range (inclusive).
+
+    Returns:
+        list[int]: The numbers in the order given, without duplicates.
+    """
+    wanted = list(numbers or [])
+    if first is not None or last is not None:
+        if first is None or last is None:
+            raise ValueError("first and last must be given together")
+        if last < first:
+            raise ValueError(f"Empty range: {first}-{last}")
+        if last - first + 1 > MAX_ITEMS:
+            raise ValueError(f"At most {MAX_ITEMS} numbers per call, the range {first}-{last} has {last - first + 1}")
+        wanted.extend(range(first, last + 1))
+
+    wanted = list(dict.fromkeys(wanted))
+    if not wanted:
+        raise ValueError("Give the numbers to look up, as a list or as a first/last range")
+    if len(wanted) > MAX_ITEMS:
+        raise ValueError(f"At most {MAX_ITEMS} numbers per call, got {len(wanted)}")
+    return wanted
+
+
+def batch_fields(fields: Optional[list[str]]) -> Optional[list[str]]:
+    """
+    The keys to keep of each batch item: the caller's selection plus "number",
+    so that items left out of an over-budget response can still be named.
+    """
+    return list(dict.fromkeys(["number", *fields])) if fields else fields
+
+
+def _lookup(number: int, fetch: Callable):
+    if expired():
+        raise DeadlineExceeded("not attempted before the caller's deadline")
+    return fetch(number)
+
+
+def fetch_many(numbers: list[int], fetch: Callable) -> dict:
+    """
+    Fetch several items concurrently and collect results and errors per item.
+
+    Args:
+        numbers (list[int]): Issue or pull request numbers, see batch_numbers.
+        fetch (Callable): Looks up one number and returns its result dict.
+
+    Returns:
+        dict: "items" in the requested order and "errors" with the number and error of
+              each failed lookup; if the caller's deadline stopped the batch, also
+              "truncated": True and the "not_attempted" numbers.
+    """
+    futures = [submit(batch_pool, _lookup, number, fetch) for number in numbers]
+    items, errors, not_attempted = [], [], []
+    for number, future in zip(numbers, futures):
+        try:
+            items.append(future.result())
+        except DeadlineExceeded:
+            not_attempted.append(number)
+        except Exception as error:
+            errors.append({"number": number, "error": str(error)})
+
+    result = {"items": items, "errors": errors}
+    if not_attempted:
+        result.update(truncated=True, not_attempted=not_attempted)
+    return result
@@ -1,7 +1,7 @@
 from fastmcp import FastMCP
-import os
-from github import Github, Repository, Issue, AuthenticatedUser, Label, Milestone, Issue
-from github.GithubObject import NotSet
+from github_tools.execution import offloaded
+from github_tools.pagination import paginate
+from github_tools.repo_cache import get_repo
 from typing import Optional
 
 
@@ -11,35 +11,43 @@ mcp_branch= FastMCP(
         This server is to help you perform actions on github 
     """,
 )
- 
-token = os.getenv("GITHUB_TOKEN")
-if not token:
-    raise ValueError("GITHUB_TOKEN environment variable not set.")
 
-g = Github(token)
-user = g.get_user()
-
-@mcp_branch.tool
-def list_branches_in_repo(repo_name: str):
+@mcp_branch.tool(annotations={"readOnlyHint": True})
+@offloaded()
+def list_branches_in_repo(
+    repo_name: str,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    per_page: int = 100
+) -> dict:
 
     """
-    List all branches in a given GitHub repository.
+    List the branches in a given GitHub repository, one slice at a time.
 
     Args:
         repo_name (str): The name of the repository (e.g., "PyGithub/PyGithub").
+        limit (int): Maximum number of branches to return (default 100).
+        cursor (str, optional): The next_cursor from a previous call, to continue the listing.
+        per_page (int): How many branches to fetch from GitHub per request (max 100).
 
     Returns:
-        list: A list of branch names available in the repository.
+        dict: "items" with the branch names, and "next_cursor" to fetch more (None when done).
     """
-    repo = user.get_repo(repo_name)
-    branches = repo.get_branches()
-    return [branch.name for branch in branches]
+    repo = get_repo(repo_name)
+    return paginate(
+        f"{repo.url}/branches",
+        lambda branch: branch["name"],
+        limit=limit,
+        cursor=cursor,
+        per_page=per_page,
+    )
 
     
 #---------------------------------------------------------------------------------------------------
 
 
-@mcp_branch.tool
+@mcp_branch.tool(annotations={"readOnlyHint": True})
+@offloaded()
 def get_default_branch(repo_name: str):
     """
     Get the default branch of a GitHub repository.
@@ -51,7 +59,7 @@ def get_default_branch(repo_name: str):
         dict: A dictionary containing the default branch name and a short SHA of its latest commit.
     """
 
-    repo = user.get_repo(repo_name)
+    repo = get_repo(repo_name)
     default_branch_name = repo.default_branch
     branch = repo.get_branch(default_branch_name)
 
@@ -0,0 +1,177 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Callable, Iterable
+from github_tools.deadline import Cutoff, DeadlineExceeded, expired
+from github_tools.execution import submit
+from github_tools.jobs import progress
+
+if TYPE_CHECKING:
+    from github.GithubException import GithubException
+
+
+# Bulk mutation engine used by the close_all_* tools.
+#
+# Items are mutated on a small shared pool. All workers share one pacer, so
+# write requests start at least WRITE_INTERVAL seconds apart, as GitHub asks
+# for mutating requests. When GitHub answers with a rate limit anyway, every
+# worker waits for Retry-After and the pacer slows down for the rest of the run.
+# Once the caller's deadline passes, listing stops and items that haven't been
+# sent yet are left alone and reported as not attempted.
+#
+#   GITHUB_BULK_CONCURRENCY     concurrent mutations across all bulk runs
+#   GITHUB_BULK_WRITE_INTERVAL  minimum seconds between two write requests
+#   GITHUB_BULK_ATTEMPTS        attempts per item before it is reported as failed
+
+CONCURRENCY = int(os.getenv("GITHUB_BULK_CONCURRENCY", "4"))
+WRITE_INTERVAL = float(os.getenv("GITHUB_BULK_WRITE_INTERVAL", "0.5"))
+MAX_ATTEMPTS = int(os.getenv("GITHUB_BULK_ATTEMPTS", "3"))
+MAX_WRITE_INTERVAL = 10.0
+DEFAULT_RETRY_AFTER = 60.0
+
+class WritePacer:
+    """
+    Spaces out write requests from all workers and backs off on rate limits.
+    """
+
+    def __init__(self, interval: float):
+        self.base_interval = interval
+        self.interval = interval
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def rate_limited(self, retry_after: float) -> None:
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + retry_after)
+            self.interval = min(max(self.interval * 2, 0.1), MAX_WRITE_INTERVAL)
+
+    def succeeded(self) -> None:
+        # drift back to the configured pace once writes go through again
+        with self._lock:
+            self.interval = max(self.base_interval, self.interval * 0.9)
+
+
+bulk_pool = ThreadPoolExecutor(max_workers=CONCURRENCY, thread_name_prefix="github-bulk")
+pacer = WritePacer(WRITE_INTERVAL)
+
+
+def _retry_after(error: "GithubException") -> float | None:
+    """
+    Seconds to wait if the error is a (primary or secondary) rate limit, else None.
+    """
+    from github.GithubException import RateLimitExceededException
+
+    headers = {k.lower(): v for k, v in (error.headers or {}).items()}
+    limited = isinstance(error, RateLimitExceededException) or error.status == 429
+    if not limited and not (error.status == 403 and "retry-after" in headers):
+        return None
+    if "retry-after" in headers:
+        return float(headers["retry-after"])
+    if headers.get("x-ratelimit-remaining") == "0" and "x-ratelimit-reset" in headers:
+        return max(float(headers["x-ratelimit-reset"]) - time.time(), 1.0)
+    return DEFAULT_RETRY_AFTER
+
+
+def _apply(item, action: Callable) -> None:
+    # imported here, like the client itself, so startup doesn't load PyGithub
+    from github.GithubException import GithubException
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        pacer.wait()
+        if attempt == 1 and expired():
+            raise DeadlineExceeded("not attempted before the caller's deadline")
+        try:
+            action(item)
+            pacer.succeeded()
+            return
+        except GithubException as error:
+            retry_after = _retry_after(error)
+            if retry_after is None and error.status < 500:
+                # client errors (404, 422, ...) won't succeed on a retry
+                raise
+            if attempt == MAX_ATTEMPTS or expired():
+                raise
+            if retry_after is not None:
+                pacer.rate_limited(retry_after)
+            else:
+                time.sleep(2 ** (attempt - 1))
+
+
+def run_bulk(
+    items: Iterable,
+    action: Callable,
+    key: Callable = lambda item: item.number,
+    skip: Callable | None = None,
+    dry_run: bool = False,
+    outcome: str = "processed",
+) -> dict:
+    """
+    Apply a mutation to every item with bounded concurrency.
+
+    The items are listed completely before anything is mutated: closing items
+    while paging through a filtered list (e.g. state=open) shifts the later
+    pages and silently skips items.
+
+    Args:
+        items (Iterable): Objects to mutate, e.g. a PaginatedList of issues.
+        action (Callable): Mutation applied to one item.
+        key (Callable): Identifier reported for an item in the summary.
+        skip (Callable, optional): Predicate for items to leave untouched.
+        dry_run (bool): Only count what would be changed.
+        outcome (str): Summary key for the successfully mutated count, e.g. "closed".
+
+    Returns:
+        dict: mutated count, failed items with their errors, skipped count and elapsed
+              seconds; if the caller's deadline stopped the run, also "truncated": True
+              and the number of listed items that were "not_attempted".
+    """
+    started = time.monotonic()
+    targets, skipped = [], 0
+    cutoff = Cutoff()
+    progress(message="listing items")
+    for item in cutoff(items):
+        if skip is not None and skip(item):
+            skipped += 1
+        else:
+            targets.append(item)
+
+    if dry_run:
+        summary = {
+            "dry_run": True,
+            f"would_be_{outcome}": len(targets),
+            "skipped": skipped,
+            "elapsed_seconds": round(time.monotonic() - started, 3),
+        }
+        return {**summary, "truncated": True} if cutoff.truncated else summary
+
+    futures = {submit(bulk_pool, _apply, item, action): item for item in targets}
+    processed, failed, not_attempted = 0, [], 0
+    progress(done=0, total=len(targets), message=f"{len(targets)} items to be {outcome}")
+    for future in as_completed(futures):
+        progress(advance=1)
+        try:
+            future.result()
+            processed += 1
+        except DeadlineExceeded:
+            not_attempted += 1
+        except Exception as error:
+            failed.append({"id": key(futures[future]), "error": str(error)})
+
+    summary = {
+        outcome: processed,
+        "failed": sorted(failed, key=lambda entry: entry["id"]),
+        "skipped": skipped,
+        "elapsed_seconds": round(time.monotonic() - started, 3),
+    }
+    if cutoff.truncated or not_attempted:
+        summary.update(truncated=True, not_attempted=not_attempted)
+    return summary
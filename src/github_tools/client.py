@@ -0,0 +1,104 @@
+import os
+import threading
+from typing import TYPE_CHECKING, Any
+from github_tools.http_cache import HttpCache
+
+if TYPE_CHECKING:
+    from github import Github
+    from github.AuthenticatedUser import AuthenticatedUser
+
+
+# Shared GitHub client used by every github_tools sub-server.
+# main.py mounts all of them into one process, so they share a single
+# keep-alive connection pool instead of opening one per module.
+#
+# The client is built on first use, not at import: starting the tool server
+# loads neither PyGithub nor requests, sends nothing to GitHub and doesn't
+# need GITHUB_TOKEN, so a new replica answers tools/list right away. A missing
+# token is reported by the first tool that needs GitHub.
+#
+# PyGithub's own request spacing (0.25 s between requests, 1 s between writes
+# by default) is off: with one client for the whole process it would serialize
+# every tool call behind the previous one. Pacing is left to the rate-limit
+# governor (rate_limit.py) and the bulk write pacer (bulk.py).
+#
+#   GITHUB_SECONDS_BETWEEN_REQUESTS  minimum spacing of all requests (0 = none)
+#   GITHUB_SECONDS_BETWEEN_WRITES    minimum spacing of write requests (0 = none)
+
+POOL_SIZE = int(os.getenv("GITHUB_POOL_SIZE", "32"))
+MAX_RETRIES = int(os.getenv("GITHUB_MAX_RETRIES", "3"))
+BACKOFF_FACTOR = float(os.getenv("GITHUB_BACKOFF_FACTOR", "0.5"))
+TIMEOUT = int(os.getenv("GITHUB_TIMEOUT", "15"))
+PER_PAGE = int(os.getenv("GITHUB_PER_PAGE", "100"))
+CACHE_DIR = os.path.expanduser(os.getenv("GITHUB_MCP_CACHE_DIR", "~/.cache/github-mcp"))
+HTTP_CACHE_ENABLED = os.getenv("GITHUB_HTTP_CACHE", "1") != "0"
+# GitHub Enterprise, or a local stand-in like the benchmarks' fake server
+BASE_URL = os.getenv("GITHUB_BASE_URL", "https://api.github.com")
+SECONDS_BETWEEN_REQUESTS = float(os.getenv("GITHUB_SECONDS_BETWEEN_REQUESTS", "0"))
+SECONDS_BETWEEN_WRITES = float(os.getenv("GITHUB_SECONDS_BETWEEN_WRITES", "0"))
+
+http_cache = HttpCache(os.path.join(CACHE_DIR, "http_cache.sqlite3")) if HTTP_CACHE_ENABLED else None
+
+_lock = threading.Lock()
+_github = None
+_user = None
+
+
+def _connect() -> "Github":
+    token = os.getenv("GITHUB_TOKEN")
+    if not token:
+        raise ValueError("GITHUB_TOKEN environment variable not set.")
+
+    from github import Auth, Github
+    # installs the pooled connection classes into PyGithub
+    from github_tools.connection import retry
+
+    return Github(
+        base_url=BASE_URL,
+        auth=Auth.Token(token),
+        timeout=TIMEOUT,
+        retry=retry,
+        pool_size=POOL_SIZE,
+        per_page=PER_PAGE,
+        # None turns PyGithub's spacing off
+        seconds_between_requests=SECONDS_BETWEEN_REQUESTS or None,
+        seconds_between_writes=SECONDS_BETWEEN_WRITES or None,
+    )
+
+
+def github() -> "Github":
+    """
+    The shared PyGithub client, built on the first call.
+
+    Raises:
+        ValueError: If GITHUB_TOKEN is not set.
+    """
+    global _github
+    if _github is None:
+        with _lock:
+            if _github is None:
+                _github = _connect()
+    return _github
+
+
+def authenticated_user() -> "AuthenticatedUser":
+    """
+    The user GITHUB_TOKEN belongs to. Lazy like PyGithub's own: the login is
+    fetched (once) when it is first read.
+    """
+    global _user
+    if _user is None:
+        client = github()
+        with _lock:
+            if _user is None:
+                _user = client.get_user()
+    return _user
+
+
+def or_not_set(value: Any) -> Any:
+    """
+    PyGithub's NotSet for an omitted (None) tool argument, so GitHub applies its own default.
+    """
+    from github.GithubObject import NotSet
+
+    return NotSet if value is None else value
@@ -0,0 +1,94 @@
+import time
+import requests
+from github.GithubRetry import GithubRetry
+from github.Requester import Requester, HTTPSRequestsConnectionClass
+from github_tools.client import BACKOFF_FACTOR, MAX_RETRIES, POOL_SIZE, http_cache
+from github_tools.metrics import record_api_request
+from github_tools.rate_limit import governor, resource_for
+
+
+# PyGithub's side of the shared client: one keep-alive session for every
+# request, with the rate-limit governor, metrics and the HTTP cache in front
+# of it. client.py imports this on the first GitHub call, so the tool server
+# starts without loading PyGithub or requests.
+
+retry = GithubRetry(total=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR)
+
+session = requests.Session()
+session.auth = Requester.noopAuth
+adapter = requests.adapters.HTTPAdapter(
+    max_retries=retry,
+    pool_connections=POOL_SIZE,
+    pool_maxsize=POOL_SIZE,
+)
+session.mount("https://", adapter)
+session.mount("http://", adapter)
+
+
+class PooledHTTPSConnection(HTTPSRequestsConnectionClass):
+    """
+    PyGithub connection that sends every request through the shared session.
+
+    PyGithub builds (and closes) a connection object for each request, which
+    by default means a fresh requests.Session and a fresh TLS handshake every
+    time. This class keeps the per-request bookkeeping but reuses the pooled
+    session, so concurrent tool calls pick up warm connections.
+    """
+
+    def __init__(self, host, port=None, strict=False, timeout=None, retry=None, pool_size=None, **kwargs):
+        self.port = port if port else 443
+        self.host = host
+        self.protocol = "https"
+        self.timeout = timeout
+        self.verify = kwargs.get("verify", True)
+        self.session = session
+
+    def send(self):
+        # every request goes through the rate-limit governor
+        resource = resource_for(self.url)
+        started = time.perf_counter()
+        governor.acquire(resource)
+        waited = time.perf_counter() - started
+        response = super().getresponse()
+        governor.update(resource, response.status, response.headers)
+        # a Link header means the response is one page of a listing
+        paginated = any(name.lower() == "link" for name in response.headers)
+        record_api_request(resource, response.status, time.perf_counter() - started, paginated, waited)
+        return response
+
+    def getresponse(self):
+        if http_cache is None or self.verb != "GET" or self.stream:
+            return self.send()
+
+        url = f"{self.protocol}://{self.host}:{self.port}{self.url}"
+        key = http_cache.key(url, self.headers)
+        cached = http_cache.lookup(key)
+        if cached is not None:
+            self.headers = {**self.headers, **cached.validators()}
+
+        response = self.send()
+        if response.status == 304 and cached is not None:
+            http_cache.record_hit(cached)
+            return cached.refreshed(response.headers)
+
+        http_cache.record_miss()
+        if response.status == 200:
+            http_cache.store(key, url, response.status, response.headers, response.read())
+        return response
+
+    def close(self):
+        # the session outlives any single request, so there is nothing to close here
+        pass
+
+
+class PooledHTTPConnection(PooledHTTPSConnection):
+    """
+    Plain-HTTP variant, used when GITHUB_BASE_URL is an http:// URL.
+    """
+
+    def __init__(self, host, port=None, strict=False, timeout=None, retry=None, pool_size=None, **kwargs):
+        super().__init__(host, port if port else 80, strict, timeout, retry, pool_size, **kwargs)
+        self.protocol = "http"
+
+
+Requester.injectConnectionClasses(PooledHTTPConnection, PooledHTTPSConnection)
@@ -0,0 +1,69 @@
+import contextvars
+import time
+from typing import Iterable, Iterator
+
+
+# Request deadlines for tool calls.
+#
+# A caller can send the seconds it is still willing to wait as "timeout" in
+# the _meta of a tools/call request. @offloaded() turns that into a deadline
+# for the call, and submit() carries it into worker threads. Long loops over
+# GitHub listings check it and stop cooperatively, so a tool whose caller has
+# given up returns what it has (marked "truncated") instead of continuing to
+# spend rate limit and worker time.
+
+META_KEY = "timeout"
+
+# time.monotonic() value after which the current tool call should stop, or None
+deadline = contextvars.ContextVar("github_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when a tool call runs out of time where it can't return partial results.
+    """
+
+
+def remaining() -> float | None:
+    """
+    Seconds left for the current tool call, or None without a deadline.
+    """
+    current = deadline.get()
+    return None if current is None else current - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+class Cutoff:
+    """
+    Stops iterations at the deadline and remembers whether it did.
+
+    Usage:
+        cutoff = Cutoff()
+        for item in cutoff(repo.get_issues()):
+            ...
+        if cutoff.truncated:
+            ...
+    """
+
+    def __init__(self):
+        self.truncated = False
+
+    def __call__(self, items: Iterable) -> Iterator:
+        iterator = iter(items)
+        while True:
+            if expired():
+                self.truncated = True
+                return
+            try:
+                # fetching the next page may itself give up waiting for the deadline
+                item = next(iterator)
+            except StopIteration:
+                return
+            except DeadlineExceeded:
+                self.truncated = True
+                return
+            yield item
@@ -0,0 +1,209 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from fastmcp.server.dependencies import get_context
+from github_tools.deadline import META_KEY, DeadlineExceeded, deadline, expired
+from github_tools.jobs import jobs, progress
+from github_tools.projection import fit
+from github_tools.rate_limit import INTERACTIVE, priority as rate_priority
+from github_tools.settings import overrides
+
+
+# PyGithub is blocking, but main_mcp serves every mounted tool from a single
+# asyncio event loop. Tools decorated with @offloaded() run their body on a
+# bounded worker pool instead, with a per-tool concurrency limit so one heavy
+# tool can't take every worker away from cheap lookups. Results are passed
+# through projection.fit() on the worker, so every tool honours the response budgets.
+# A "timeout" in the request's _meta becomes the call's deadline (see deadline.py).
+# Tools with a `background` parameter are started as a job when it is true and
+# answer with the job's ID instead (see jobs.py). A job takes one of the tool's
+# slots like a direct call, so e.g. two close_all_open_issues jobs can't work
+# through the same issues at the same time.
+#
+#   GITHUB_TOOL_EXECUTION  "thread" (default) or "inline" to run on the event loop
+#   GITHUB_TOOL_WORKERS    size of the shared worker pool
+#   GITHUB_TOOL_LIMITS     per-tool overrides, e.g. "top_contributors=1,list_github_repos=4"
+
+EXECUTION_MODE = os.getenv("GITHUB_TOOL_EXECUTION", "thread")
+MAX_WORKERS = int(os.getenv("GITHUB_TOOL_WORKERS", "16"))
+DEFAULT_LIMIT = int(os.getenv("GITHUB_TOOL_CONCURRENCY", "8"))
+LIMIT_OVERRIDES = overrides("GITHUB_TOOL_LIMITS", int)
+
+executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="github-tool")
+
+
+class ToolStats:
+    """
+    Queue-depth counters for one tool.
+
+    waiting: calls blocked on the tool's concurrency limit
+    queued:  calls handed to the worker pool but not yet started
+    running: calls currently executing on a worker
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.waiting = 0
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_waiting = 0
+        self._lock = threading.Lock()
+
+    def update(self, **deltas: int) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "waiting": self.waiting,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "max_waiting": self.max_waiting,
+            }
+
+
+tool_stats: dict[str, ToolStats] = {}
+
+
+def submit(pool: Executor, fn, *args, **kwargs) -> Future:
+    """
+    Submit work to a thread pool with the caller's context variables, so
+    request-scoped state (like the rate-limit priority) follows it.
+    """
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def _request_deadline() -> float | None:
+    """
+    Deadline of the current MCP tool call from the "timeout" (seconds) in its
+    _meta, or the deadline already in effect for calls made in-process.
+    """
+    current = deadline.get()
+    try:
+        meta = get_context().request_context.meta
+    except (RuntimeError, LookupError, AttributeError):
+        # not called through an MCP request
+        return current
+    timeout = (meta.model_extra or {}).get(META_KEY) if meta is not None else None
+    if timeout is None:
+        return current
+    requested = time.monotonic() + float(timeout)
+    return requested if current is None else min(current, requested)
+
+
+def offloaded(limit: int | None = None, priority: str = INTERACTIVE):
+    """
+    Run a blocking tool function on the shared worker pool.
+
+    Args:
+        limit (int, optional): Maximum concurrent calls of this tool. Defaults to
+            GITHUB_TOOL_CONCURRENCY; GITHUB_TOOL_LIMITS overrides it per tool.
+        priority (str): Rate-limit priority of the tool's GitHub requests
+            ("interactive", "analytics" or "bulk").
+    """
+
+    def decorator(fn):
+        name = fn.__name__
+        counters = tool_stats[name] = ToolStats(LIMIT_OVERRIDES.get(name, limit or DEFAULT_LIMIT))
+        semaphore = asyncio.Semaphore(counters.limit)
+
+        def run(*args, **kwargs):
+            counters.update(queued=-1, running=1)
+            rate_priority.set(priority)
+            try:
+                if expired():
+                    raise DeadlineExceeded(f"{name} was still queued when the caller's deadline passed")
+                return fit(name, fn(*args, **kwargs))
+            finally:
+                counters.update(running=-1)
+
+        def inline(*args, **kwargs):
+            rate_priority.set(priority)
+            return fit(name, fn(*args, **kwargs))
+
+        def run_job(loop: asyncio.AbstractEventLoop, *args, **kwargs):
+            # the semaphore belongs to the server's event loop
+            progress(message=f"waiting for a free {name} slot")
+            counters.update(waiting=1)
+            try:
+                asyncio.run_coroutine_threadsafe(semaphore.acquire(), loop).result()
+            finally:
+                counters.update(waiting=-1)
+            try:
+                rate_priority.set(priority)
+                counters.update(running=1)
+                return fit(name, fn(*args, **kwargs))
+            finally:
+                counters.update(running=-1)
+                loop.call_soon_threadsafe(semaphore.release)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            if kwargs.get("background"):
+                kwargs["background"] = False
+                return jobs.start(name, {k: v for k, v in kwargs.items() if k != "background"},
+                                  functools.partial(run_job, asyncio.get_running_loop(), *args, **kwargs))
+            token = deadline.set(_request_deadline())
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                deadline.reset(token)
+
+        async def call(*args, **kwargs):
+            if EXECUTION_MODE == "inline":
+                return contextvars.copy_context().run(inline, *args, **kwargs)
+
+            counters.update(waiting=1)
+            try:
+                await semaphore.acquire()
+            finally:
+                counters.update(waiting=-1)
+
+            try:
+                if expired():
+                    raise DeadlineExceeded(f"{name} was still waiting for a slot when the caller's deadline passed")
+                counters.update(queued=1)
+                future = submit(executor, run, *args, **kwargs)
+                try:
+                    result = await asyncio.wrap_future(future)
+                except BaseException:
+                    if future.cancelled():
+                        # cancelled before a worker picked it up, so run() never started
+                        counters.update(queued=-1)
+                    counters.update(failed=1)
+                    raise
+                counters.update(completed=1)
+                return result
+            finally:
+                semaphore.release()
+
+        return wrapper
+
+    return decorator
+
+
+def stats() -> dict:
+    """
+    Worker pool and per-tool queue-depth metrics.
+    """
+    tools = {name: s.snapshot() for name, s in tool_stats.items()}
+    return {
+        "mode": EXECUTION_MODE,
+        "workers": MAX_WORKERS,
+        "waiting": sum(t["waiting"] for t in tools.values()),
+        "queued": sum(t["queued"] for t in tools.values()),
+        "running": sum(t["running"] for t in tools.values()),
+        "tools": tools,
+    }
@@ -1,10 +1,17 @@
 from fastmcp import FastMCP
-import os
-from github import Github, Repository, Issue, AuthenticatedUser, Label, Milestone, Issue
-from github.GithubObject import NotSet
+from github_tools.activity_index import activity_index
+from github_tools.deadline import Cutoff
+from github_tools.execution import offloaded, submit
+from github_tools.jobs import progress
+from github_tools.pagination import MAX_LIMIT, paginate
+from github_tools.projection import select_fields
+from github_tools.rate_limit import ANALYTICS
+from github_tools.repo_cache import get_repo
 from typing import Optional
-from datetime import datetime
-from collections import defaultdict
+from datetime import datetime, timezone
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import os
 
 
 mcp_analysis= FastMCP(
@@ -13,28 +20,29 @@ mcp_analysis= FastMCP(
         This server is to help you perform actions on github 
     """,
 )
- 
-token = os.getenv("GITHUB_TOKEN")
-if not token:
-    raise ValueError("GITHUB_TOKEN environment variable not set.")
 
-g = Github(token)
-user = g.get_user()
+# commit, PR and issue streams are read in parallel on this pool
+stream_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("GITHUB_ANALYSIS_WORKERS", "6")),
+    thread_name_prefix="github-analysis",
+)
 
-@mcp_analysis.tool
-def get_repo_key_metrics(repo_name: str) -> dict:
+@mcp_analysis.tool(annotations={"readOnlyHint": True})
+@offloaded()
+def get_repo_key_metrics(repo_name: str, fields: Optional[list[str]] = None) -> dict:
     """
     Retrieve key metrics for a GitHub repository.
 
     Args:
         repo_name (str): name of the repository
+        fields (list[str], optional): Only return these keys (e.g. ["stars", "forks"]); all keys by default.
 
     Returns:
         dict: Key metrics including stars, forks, watchers, open issues, etc.
     """
-    repo = user.get_repo(repo_name)
+    repo = get_repo(repo_name)
     
-    return {
+    return select_fields({
         "name": repo.full_name,
         "description": repo.description,
         "stars": repo.stargazers_count,
@@ -47,15 +55,160 @@ def get_repo_key_metrics(repo_name: str) -> dict:
         "created_at": repo.created_at.isoformat(),
         "updated_at": repo.updated_at.isoformat(),
         "default_branch": repo.default_branch,
+    }, fields)
+
+
+#-------------------------------------------------------------------------------------------------
+
+
+# keys compare_repos_key_metrics can sort on
+REPO_SORT_KEYS = ("stars", "forks", "watchers", "open_issues", "size_kb", "created_at", "updated_at", "pushed_at", "name")
+
+
+def _listed_repo_metrics(raw: dict) -> dict:
+    # the /user/repos listing carries the counts already, so no per-repo request is needed
+    return {
+        "name": raw["full_name"],
+        "description": raw.get("description"),
+        "stars": raw.get("stargazers_count", 0),
+        "forks": raw.get("forks_count", 0),
+        "watchers": raw.get("watchers_count", 0),
+        "open_issues": raw.get("open_issues_count", 0),
+        "size_kb": raw.get("size", 0),
+        "language": raw.get("language"),
+        "created_at": raw.get("created_at"),
+        "updated_at": raw.get("updated_at"),
+        "pushed_at": raw.get("pushed_at"),
+        "default_branch": raw.get("default_branch"),
+        "private": raw.get("private", False),
+        "fork": raw.get("fork", False),
+        "archived": raw.get("archived", False),
     }
 
 
+@mcp_analysis.tool(annotations={"readOnlyHint": True})
+@offloaded()
+def compare_repos_key_metrics(
+    sort_by: str = "stars",
+    descending: bool = True,
+    top: int = 10,
+    language: Optional[str] = None,
+    name_contains: Optional[str] = None,
+    visibility: str = "all",
+    owned_only: bool = False,
+    include_forks: bool = True,
+    include_archived: bool = False,
+    fields: Optional[list[str]] = None
+) -> dict:
+    """
+    Compare key metrics across the user's repositories in one call, e.g.
+    "which of my repos have the most open issues?".
+
+    Args:
+        sort_by (str): Metric to rank by: stars, forks, watchers, open_issues, size_kb,
+                       created_at, updated_at, pushed_at or name.
+        descending (bool): Highest first (default); False for lowest first.
+        top (int): Number of repositories to return (default 10).
+        language (str, optional): Only repositories whose main language is this one.
+        name_contains (str, optional): Only repositories whose name contains this text.
+        visibility (str): "all", "public" or "private".
+        owned_only (bool): Only repositories the user owns, not ones they collaborate on.
+        include_forks (bool): Include forked repositories.
+        include_archived (bool): Include archived repositories.
+        fields (list[str], optional): Only return these keys of each repository (e.g. ["name", "open_issues"]).
+
+    Returns:
+        dict: "items" with the metrics of the top repositories (as in get_repo_key_metrics,
+              without subscribers), "matched" and "total" repository counts, plus
+              "truncated": True if not every repository could be listed.
+    """
+    if sort_by not in REPO_SORT_KEYS:
+        raise ValueError(f"sort_by must be one of {', '.join(REPO_SORT_KEYS)}")
+    if visibility not in ("all", "public", "private"):
+        raise ValueError('visibility must be "all", "public" or "private"')
+
+    params = {"visibility": visibility}
+    if owned_only:
+        params["affiliation"] = "owner"
+    listing = paginate("/user/repos", _listed_repo_metrics, params=params, limit=MAX_LIMIT)
+    repos = listing["items"]
+
+    matched = [
+        repo for repo in repos
+        if (language is None or (repo["language"] or "").lower() == language.lower())
+        and (name_contains is None or name_contains.lower() in repo["name"].lower())
+        and (include_forks or not repo["fork"])
+        and (include_archived or not repo["archived"])
+    ]
+    # repositories without a value (e.g. never pushed) rank last either way
+    ranked = sorted(
+        (repo for repo in matched if repo[sort_by] is not None),
+        key=lambda repo: repo[sort_by].lower() if sort_by == "name" else repo[sort_by],
+        reverse=descending,
+    ) + [repo for repo in matched if repo[sort_by] is None]
+
+    result = select_fields({
+        "items": ranked[:max(top, 1)],
+        "sort_by": sort_by,
+        "matched": len(matched),
+        "total": len(repos),
+    }, fields)
+    if listing.get("truncated") or listing["next_cursor"] is not None:
+        result["truncated"] = True
+    return result
+
+
 #-------------------------------------------------------------------------------------------------
 
 
 
-@mcp_analysis.tool
-def top_contributors(repo_name: str, start_date: str, end_date: str) -> dict:
+def _parse_date(value: str) -> datetime:
+    # GitHub timestamps are timezone-aware UTC, so naive input is treated as UTC
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _count_commits(repo, start_dt: datetime, end_dt: datetime, cutoff: Cutoff) -> Counter:
+    # the commits API filters on the server with since/until
+    counts = Counter()
+    for commit in cutoff(repo.get_commits(since=start_dt, until=end_dt)):
+        counts[commit.author.login if commit.author else "Unknown"] += 1
+        progress(advance=1)
+    return counts
+
+
+def _count_pull_requests(repo, start_dt: datetime, end_dt: datetime, cutoff: Cutoff) -> Counter:
+    # newest first, so paging stops as soon as PRs are older than the window
+    counts = Counter()
+    for pr in cutoff(repo.get_pulls(state="all", sort="created", direction="desc")):
+        if pr.created_at < start_dt:
+            break
+        if pr.created_at <= end_dt:
+            counts[pr.user.login if pr.user else "Unknown"] += 1
+        progress(advance=1)
+    return counts
+
+
+def _count_issues(repo, start_dt: datetime, end_dt: datetime, cutoff: Cutoff) -> Counter:
+    # since filters on update time, which is always >= creation time, so it
+    # only narrows the scan; creation order gives the real stopping point
+    counts = Counter()
+    for issue in cutoff(repo.get_issues(state="all", since=start_dt, sort="created", direction="desc")):
+        if issue.created_at < start_dt:
+            break
+        # the issues API includes PRs, which are counted separately. Told apart by
+        # URL: reading issue.pull_request would fetch every plain issue again
+        if issue.created_at <= end_dt and "/pull/" not in issue.html_url:
+            counts[issue.user.login if issue.user else "Unknown"] += 1
+        progress(advance=1)
+    return counts
+
+
+@mcp_analysis.tool(annotations={"readOnlyHint": True})
+@offloaded(limit=2, priority=ANALYTICS)
+def top_contributors(repo_name: str, start_date: str, end_date: str, background: bool = False) -> dict:
 
     """
     Calculate top contributors by commits, pull requests, and issues within a timeframe.
@@ -64,35 +217,87 @@ def top_contributors(repo_name: str, start_date: str, end_date: str) -> dict:
         repo_name (str): the repo name 
         start_date (str): Start date in ISO format (e.g. "2024-01-01T00:00:00").
         end_date (str): End date in ISO format (e.g. "2024-12-31T23:59:59").
+        background (bool): Start a background job and return its job_id right away instead of
+                           waiting (for timeframes of months or more); follow it with
+                           get_job_status and get_job_result.
 
     Returns:
-        dict: Mapping of usernames to their counts of commits, PRs, and issues.
+        dict: Mapping of usernames to their counts of commits, PRs, and issues,
+              plus "truncated": True if the caller's deadline cut the scan short;
+              or the started job with background=True.
     """
 
-    repo = user.get_repo(repo_name)
-    start_dt = datetime.fromisoformat(start_date)
-    end_dt = datetime.fromisoformat(end_date)
+    repo = get_repo(repo_name)
+    start_dt = _parse_date(start_date)
+    end_dt = _parse_date(end_date)
+
+    if activity_index is not None:
+        complete = activity_index.sync(repo, start_dt, executor=stream_pool)
+        contributors = activity_index.contributors(repo.full_name, start_dt, end_dt)
+        return contributors if complete else {**contributors, "truncated": True}
+
+    streams = {
+        "commits": _count_commits,
+        "pull_requests": _count_pull_requests,
+        "issues": _count_issues,
+    }
+    cutoff = Cutoff()
+    futures = {field: submit(stream_pool, count, repo, start_dt, end_dt, cutoff) for field, count in streams.items()}
 
     contributors = defaultdict(lambda: {"commits": 0, "pull_requests": 0, "issues": 0})
+    for field, future in futures.items():
+        for author, count in future.result().items():
+            contributors[author][field] += count
 
-    # Count commits per author in timeframe
-    for commit in repo.get_commits(since=start_dt, until=end_dt):
-        author = commit.author.login if commit.author else "Unknown"
-        contributors[author]["commits"] += 1
+    if cutoff.truncated:
+        return {**contributors, "truncated": True}
+    return dict(contributors)
 
-    # Count pull requests per user in timeframe
-    for pr in repo.get_pulls(state="all", sort="created", direction="asc"):
-        if pr.created_at >= start_dt and pr.created_at <= end_dt:
-            author = pr.user.login if pr.user else "Unknown"
-            contributors[author]["pull_requests"] += 1
 
-    # Count issues per creator in timeframe (exclude PRs because issues includes them)
-    for issue in repo.get_issues(state="all", since=start_dt):
-        if issue.created_at <= end_dt and not issue.pull_request:
-            author = issue.user.login if issue.user else "Unknown"
-            contributors[author]["issues"] += 1
+#-------------------------------------------------------------------------------------------
 
-    return dict(contributors)
+
+@mcp_analysis.tool(annotations={"readOnlyHint": True})
+@offloaded(limit=2, priority=ANALYTICS)
+def activity_summary(
+    repo_name: str,
+    start_date: str,
+    end_date: str,
+    fields: Optional[list[str]] = None,
+    background: bool = False
+) -> dict:
+    """
+    Summarize repository activity within a timeframe.
+
+    Args:
+        repo_name (str): the repo name
+        start_date (str): Start date in ISO format (e.g. "2024-01-01T00:00:00").
+        end_date (str): End date in ISO format (e.g. "2024-12-31T23:59:59").
+        fields (list[str], optional): Only return these keys (e.g. ["commits"]); all keys by default.
+        background (bool): Start a background job and return its job_id right away instead of
+                           waiting (for timeframes of months or more); follow it with
+                           get_job_status and get_job_result.
+
+    Returns:
+        dict: Counts of commits, opened/closed/merged pull requests, opened/closed issues
+              and active contributors in the timeframe, plus "truncated": True if the
+              caller's deadline cut the sync short; or the started job with background=True.
+    """
+    if activity_index is None:
+        raise ValueError("activity_summary needs the activity index (GITHUB_ACTIVITY_INDEX is disabled).")
+
+    repo = get_repo(repo_name)
+    start_dt = _parse_date(start_date)
+    end_dt = _parse_date(end_date)
+
+    complete = activity_index.sync(repo, start_dt, executor=stream_pool)
+    summary = select_fields({
+        "name": repo.full_name,
+        "start_date": start_dt.isoformat(),
+        "end_date": end_dt.isoformat(),
+        **activity_index.summary(repo.full_name, start_dt, end_dt),
+    }, fields)
+    return summary if complete else {**summary, "truncated": True}
 
 
 #-------------------------------------------------------------------------------------------
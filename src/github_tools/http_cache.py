@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+# On-disk cache of GitHub REST GET responses, keyed by URL and credentials.
+# Stored ETag / Last-Modified validators are replayed as conditional headers,
+# and a 304 answer is served from the stored body. GitHub does not count 304
+# responses against the rate limit, and the database survives restarts.
+
+MAX_ENTRIES = int(os.getenv("GITHUB_HTTP_CACHE_MAX_ENTRIES", "20000"))
+
+# headers that change on every response and must come from the fresh 304
+FRESH_HEADERS = ("x-ratelimit-limit", "x-ratelimit-remaining", "x-ratelimit-reset", "x-ratelimit-used", "date")
+
+
+class CachedResponse:
+    """
+    Stored response that mimics the response object PyGithub reads from.
+    """
+
+    def __init__(self, status: int, headers: dict, body: str):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def getheaders(self):
+        return self.headers.items()
+
+    def read(self) -> str:
+        return self.body
+
+    def validators(self) -> dict:
+        """
+        Conditional request headers for revalidating this response.
+        """
+        if "etag" in self.headers:
+            return {"If-None-Match": self.headers["etag"]}
+        if "last-modified" in self.headers:
+            return {"If-Modified-Since": self.headers["last-modified"]}
+        return {}
+
+    def refreshed(self, not_modified_headers) -> "CachedResponse":
+        """
+        Return a copy with rate-limit headers taken from the 304 that revalidated it.
+        """
+        headers = dict(self.headers)
+        for name, value in not_modified_headers.items():
+            if name.lower() in FRESH_HEADERS:
+                headers[name.lower()] = value
+        return CachedResponse(self.status, headers, self.body)
+
+
+class HttpCache:
+    """
+    SQLite-backed store of validated GET responses.
+    """
+
+    def __init__(self, path: str, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body TEXT NOT NULL,
+                stored_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_stored_at ON responses (stored_at)")
+        self._db.commit()
+
+    @staticmethod
+    def key(url: str, headers: dict) -> str:
+        # the same URL can return different data per token or media type
+        parts = (headers.get("Authorization", ""), headers.get("Accept", ""), url)
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    def lookup(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            row = self._db.execute("SELECT status, headers, body FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        status, headers, body = row
+        return CachedResponse(status, json.loads(headers), body)
+
+    def store(self, key: str, url: str, status: int, headers: dict, body: str) -> None:
+        headers = {k.lower(): v for k, v in headers.items()}
+        if "etag" not in headers and "last-modified" not in headers:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, url, status, headers, body, stored_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, url, status, json.dumps(headers), body, time.time()),
+            )
+            self.stores += 1
+            if self.stores % 500 == 0:
+                self._prune()
+            self._db.commit()
+
+    def record_hit(self, response: CachedResponse) -> None:
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += len(response.body)
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "bytes_saved": self.bytes_saved,
+                "entries": entries,
+                "path": self.path,
+            }
+
+    def _prune(self) -> None:
+        # caller holds the lock; keep only the newest max_entries rows
+        self._db.execute(
+            "DELETE FROM responses WHERE key NOT IN (SELECT key FROM responses ORDER BY stored_at DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+
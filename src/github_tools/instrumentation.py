@@ -0,0 +1,189 @@
+import time
+from collections import deque
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from github_tools.activity_index import activity_index
+from github_tools.client import http_cache
+from github_tools.execution import stats as execution_stats
+from github_tools.jobs import FINISHED, QUEUED, RUNNING, jobs
+from github_tools.metrics import COUNT_BUCKETS, SIZE_BUCKETS, CallMetrics, current_call, registry
+from github_tools.projection import projection_stats
+from github_tools.rate_limit import governor
+from github_tools.repo_cache import repo_cache
+
+
+# Per-tool metrics of the tool server.
+#
+# ToolMetrics is installed as middleware on main_mcp, so every mounted tool is
+# measured without touching the tools: latency and outcome, how many GitHub
+# requests and listing pages one invocation needed (client.py reports them
+# against the call through metrics.current_call), the time it spent waiting
+# for the rate limit, and the size of its response. The collectors below add
+# the existing stats() of the worker pool, caches and rate-limit governor.
+#
+# A caller can put "request_id" in the _meta of a tools/call request; it is
+# kept with the call in recent_calls, so one /ask of the LLM client can be
+# followed into the tool server (see /debug/tool-calls in main.py).
+
+REQUEST_ID_KEY = "request_id"
+
+tool_calls = registry.counter(
+    "mcp_tool_calls_total",
+    "Tool calls by tool and outcome",
+    ("tool", "outcome"),
+)
+tool_latency = registry.histogram(
+    "mcp_tool_duration_seconds",
+    "Tool call latency, from the request reaching the server to the response",
+    ("tool",),
+)
+tool_upstream = registry.histogram(
+    "mcp_tool_github_requests",
+    "GitHub requests made by one tool call",
+    ("tool",),
+    COUNT_BUCKETS,
+)
+tool_pages = registry.histogram(
+    "mcp_tool_github_pages",
+    "Pages of paginated GitHub listings fetched by one tool call",
+    ("tool",),
+    COUNT_BUCKETS,
+)
+tool_response_bytes = registry.histogram(
+    "mcp_tool_response_bytes",
+    "Size of tool responses",
+    ("tool",),
+    SIZE_BUCKETS,
+)
+
+# the most recent tool calls, newest last
+recent_calls: deque = deque(maxlen=200)
+
+
+def _response_size(result) -> int:
+    return sum(len((getattr(block, "text", None) or "").encode()) for block in getattr(result, "content", None) or [])
+
+
+class ToolMetrics(Middleware):
+    """
+    Measures every tools/call handled by the server it is added to.
+    """
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        name = context.message.name
+        request_id = None
+        try:
+            meta = context.fastmcp_context.request_context.meta
+            request_id = (meta.model_extra or {}).get(REQUEST_ID_KEY) if meta is not None else None
+        except (AttributeError, LookupError, RuntimeError):
+            # called in-process without an MCP request
+            pass
+
+        call = CallMetrics(name, request_id)
+        token = current_call.set(call)
+        started = time.perf_counter()
+        outcome, size = "error", 0
+        try:
+            result = await call_next(context)
+            outcome, size = "ok", _response_size(result)
+            return result
+        finally:
+            current_call.reset(token)
+            seconds = time.perf_counter() - started
+            tool_calls.inc(tool=name, outcome=outcome)
+            tool_latency.observe(seconds, tool=name)
+            tool_upstream.observe(call.requests, tool=name)
+            tool_pages.observe(call.pages, tool=name)
+            if outcome == "ok":
+                tool_response_bytes.observe(size, tool=name)
+            recent_calls.append({
+                "request_id": request_id,
+                "tool": name,
+                "outcome": outcome,
+                "started_at": time.time() - seconds,
+                "duration_ms": round(seconds * 1000, 1),
+                "github_requests": call.requests,
+                "github_pages": call.pages,
+                "rate_limit_wait_ms": round(call.rate_limit_wait * 1000, 1),
+                "response_bytes": size,
+            })
+
+
+@registry.collector
+def _execution():
+    stats = execution_stats()
+    tools = stats["tools"]
+    for field in ("waiting", "queued", "running"):
+        yield (
+            f"mcp_tool_{field}",
+            "gauge",
+            f"Tool calls currently {field} (see execution.py)",
+            [({"tool": name}, entry[field]) for name, entry in tools.items()],
+        )
+    yield "mcp_tool_workers", "gauge", "Size of the shared tool worker pool", [({}, stats["workers"])]
+
+
+@registry.collector
+def _jobs():
+    stats = jobs.stats()
+    yield "github_jobs_started_total", "counter", "Background jobs started since the server started", [({}, stats["started"])]
+    yield "github_jobs", "gauge", "Background jobs kept in the job store, by status", [
+        ({"status": status}, stats[status]) for status in (QUEUED, RUNNING, *FINISHED)
+    ]
+
+
+@registry.collector
+def _rate_limit():
+    snapshot = governor.snapshot()
+    resources = snapshot["resources"]
+    yield "github_rate_limit_limit", "gauge", "Hourly GitHub rate limit", [
+        ({"resource": name}, budget["limit"]) for name, budget in resources.items()
+    ]
+    yield "github_rate_limit_remaining", "gauge", "GitHub requests left in the current window", [
+        ({"resource": name}, budget["remaining"]) for name, budget in resources.items()
+    ]
+    yield "github_rate_limit_reset_seconds", "gauge", "Seconds until the rate-limit window resets", [
+        ({"resource": name}, budget["reset_in_seconds"]) for name, budget in resources.items()
+    ]
+    yield "github_rate_limit_waits_total", "counter", "Requests that waited for the rate-limit governor", [
+        ({"priority": level}, count) for level, count in snapshot["waits"].items()
+    ]
+    yield "github_rate_limit_wait_seconds_total", "counter", "Time spent waiting for the rate-limit governor", [
+        ({"priority": level}, seconds) for level, seconds in snapshot["wait_seconds"].items()
+    ]
+
+
+@registry.collector
+def _caches():
+    repos = repo_cache.stats()
+    yield "github_repo_cache_hits_total", "counter", "Repository lookups served from the repo cache", [({}, repos["hits"])]
+    yield "github_repo_cache_misses_total", "counter", "Repository lookups that went to GitHub", [({}, repos["misses"])]
+    yield "github_repo_cache_entries", "gauge", "Repositories in the repo cache", [({}, repos["size"])]
+    if http_cache is not None:
+        http = http_cache.stats()
+        yield "github_http_cache_hits_total", "counter", "Conditional requests answered 304 from the HTTP cache", [({}, http["hits"])]
+        yield "github_http_cache_misses_total", "counter", "Cacheable requests answered with a full response", [({}, http["misses"])]
+        yield "github_http_cache_bytes_saved_total", "counter", "Response bytes not downloaded thanks to the HTTP cache", [({}, http["bytes_saved"])]
+        yield "github_http_cache_entries", "gauge", "Responses in the HTTP cache", [({}, http["entries"])]
+    if activity_index is not None:
+        index = activity_index.stats()
+        yield "github_activity_index_repos", "gauge", "Repositories in the activity index", [({}, index["repos"])]
+        yield "github_activity_index_syncs_total", "counter", "Incremental activity index syncs", [({}, index["syncs"])]
+        yield "github_activity_index_synced_total", "counter", "Commits and issues/PRs fetched into the activity index", [
+            ({"kind": "commits"}, index["synced_commits"]),
+            ({"kind": "items"}, index["synced_items"]),
+        ]
+        yield "github_activity_index_pushed_total", "counter", "Commits and issues/PRs applied to the activity index from webhooks", [
+            ({"kind": "commits"}, index["pushed_commits"]),
+            ({"kind": "items"}, index["pushed_items"]),
+        ]
+
+
+@registry.collector
+def _projection():
+    tools = projection_stats.snapshot()["tools"]
+    yield "mcp_tool_result_bytes_total", "counter", "Tool result bytes before and after projection", [
+        ({"tool": name, "stage": stage}, entry[f"bytes_{stage}"]) for name, entry in tools.items() for stage in ("in", "out")
+    ]
+    yield "mcp_tool_truncated_fields_total", "counter", "Fields shortened by the projection budgets", [
+        ({"tool": name}, entry["truncated_fields"]) for name, entry in tools.items()
+    ]
@@ -1,8 +1,15 @@
 from fastmcp import FastMCP
-import os
-from github import Github, Repository, Issue, AuthenticatedUser, Label, Milestone, Issue
-from github.GithubObject import NotSet
-from typing import Optional
+from github_tools.batch import batch_fields, batch_numbers, fetch_many
+from github_tools.bulk import run_bulk
+from github_tools.client import or_not_set
+from github_tools.execution import offloaded
+from github_tools.projection import select_fields
+from github_tools.rate_limit import BULK
+from github_tools.repo_cache import get_repo, invalidate_repo
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from github.Issue import Issue
 
 
 mcp_issue_tracking = FastMCP(
@@ -11,23 +18,17 @@ mcp_issue_tracking = FastMCP(
         This server is to help you perform actions on github 
     """,
 )
- 
-token = os.getenv("GITHUB_TOKEN")
-if not token:
-    raise ValueError("GITHUB_TOKEN environment variable not set.")
-
-g = Github(token)
-user = g.get_user()
 
 #---------------------------------------------------------------------------------------------------
 
 @mcp_issue_tracking.tool
+@offloaded()
 def create_issue(
     repo_name: str,       
     issue_title: str,
-    issue_body: str = NotSet,
-    label_name: Optional[list[str]] = NotSet,
-    assignee_username: Optional[list[str]] = NotSet
+    issue_body: Optional[str] = None,
+    label_name: Optional[list[str]] = None,
+    assignee_username: Optional[list[str]] = None
 ) -> str:
     """
     Creates an issue in the specified repository.
@@ -42,30 +43,34 @@ def create_issue(
     Returns:
         str: Summary string of the created issue (title and issue number)
     """
-    repo = user.get_repo(repo_name)
+    repo = get_repo(repo_name)
 
 
 
     issue = repo.create_issue(
         title=issue_title,
-        body=issue_body,
-        labels=label_name,
-        assignee=assignee_username
+        body=or_not_set(issue_body),
+        labels=or_not_set(label_name),
+        assignee=or_not_set(assignee_username)
     )
+    # the cached repo's open_issues_count is stale now
+    invalidate_repo(repo.full_name)
 
     return f"Issue created: {issue.title} (#{issue.number})"
 
 #---------------------------------------------------------------------------------------------------
 
 
-@mcp_issue_tracking.tool
-def get_issue_from_repo(repo_name: str, issue_number: int):
+@mcp_issue_tracking.tool(annotations={"readOnlyHint": True})
+@offloaded()
+def get_issue_from_repo(repo_name: str, issue_number: int, fields: Optional[list[str]] = None) -> dict:
     """
         Retrieve detailed information about a specific issue from a GitHub repository.
 
         Args:
             repo_name (str): The full name of the repository (e.g., "owner/repo").
             issue_number (int): The number of the issue to retrieve.
+            fields (list[str], optional): Only return these keys (e.g. ["title", "state"]); all keys by default.
 
         Returns:
             dict: A dictionary containing the following keys:
@@ -77,15 +82,19 @@ def get_issue_from_repo(repo_name: str, issue_number: int):
                 - url (str): The URL to view the issue on GitHub.
         """
 
-    repo = user.get_repo(repo_name)
+    repo = get_repo(repo_name)
     issue = repo.get_issue(number=issue_number)
     
+    return select_fields(_issue_summary(issue), fields)
+
+
+def _issue_summary(issue: "Issue") -> dict:
     return {
         "title": issue.title,
         "number": issue.number,
         "state": issue.state,
         "labels": [label.name for label in issue.labels],
-        "body": issue.body[:200] + ("..." if issue.body and len(issue.body) > 200 else ""),
+        "body": (issue.body or "")[:200] + ("..." if issue.body and len(issue.body) > 200 else ""),
         "url": issue.html_url
     }
 
@@ -93,8 +102,49 @@ def get_issue_from_repo(repo_name: str, issue_number: int):
 #---------------------------------------------------------------------------------------------------
 
 
+@mcp_issue_tracking.tool(annotations={"readOnlyHint": True})
+@offloaded()
+def get_issues_from_repo(
+    repo_name: str,
+    numbers: Optional[list[int]] = None,
+    first: Optional[int] = None,
+    last: Optional[int] = None,
+    fields: Optional[list[str]] = None
+) -> dict:
+    """
+        Retrieve several issues of a GitHub repository in one call, by number or by range.
+
+        Use this instead of repeated get_issue_from_repo calls, e.g. for "summarize issues 10-25".
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., "owner/repo").
+            numbers (list[int], optional): Issue numbers to retrieve, e.g. [12, 15, 31].
+            first (int, optional): First issue number of a range to retrieve.
+            last (int, optional): Last issue number of the range (inclusive).
+            fields (list[str], optional): Only return these keys of each issue; all keys by default.
+
+        Returns:
+            dict: A dictionary containing the following keys:
+                - items (List[dict]): The issues found, in the requested order, with the
+                  keys returned by get_issue_from_repo.
+                - errors (List[dict]): The number and error of each issue that couldn't
+                  be retrieved (e.g. it doesn't exist).
+                - omitted_numbers (List[int]): Only when the response was too big: issues
+                  retrieved but left out; ask for them again in another call.
+        """
+
+    wanted = batch_numbers(numbers, first, last)
+    repo = get_repo(repo_name)
+
+    return select_fields(fetch_many(wanted, lambda number: _issue_summary(repo.get_issue(number=number))), batch_fields(fields))
+
+
+#---------------------------------------------------------------------------------------------------
+
+
 
 @mcp_issue_tracking.tool
+@offloaded()
 def close_issue(repo_name: str, issue_number: int):
     """
     Close a specific issue in a repository.
@@ -107,11 +157,12 @@ def close_issue(repo_name: str, issue_number: int):
         dict: A confirmation message with the issue number and title.
     """
 
-    repo = user.get_repo(repo_name)
+    repo = get_repo(repo_name)
     issue = repo.get_issue(number=issue_number)
     
     issue.edit(state='closed')
-    
+    invalidate_repo(repo.full_name)
+
     return {
         "message": f"Issue #{issue.number} closed.",
         "title": issue.title
@@ -123,27 +174,39 @@ def close_issue(repo_name: str, issue_number: int):
 
 
 @mcp_issue_tracking.tool
-def close_all_open_issues(repo_name: str):
+@offloaded(limit=1, priority=BULK)
+def close_all_open_issues(repo_name: str, dry_run: bool = False, background: bool = False) -> dict:
     """
     Close all open issues in a given repository.
 
     Args:
         repo_name (str): The name of the repo .
+        dry_run (bool): Only count the issues that would be closed.
+        background (bool): Start a background job and return its job_id right away instead of
+                           waiting (for repositories with many open issues); follow it with
+                           get_job_status and get_job_result.
 
     Returns:
-        dict: A summary of how many issues were closed.
+        dict: A summary with the number of closed issues, the issues that failed to close
+              (with errors), skipped pull requests and the elapsed time in seconds; or the
+              started job with background=True.
     """
 
-    repo = user.get_repo(repo_name)
-
-    open_issues = repo.get_issues(state='open')
-    closed_count = 0
-
-    for issue in open_issues:
-        issue.edit(state='closed')
-        closed_count += 1
-
-    return {"closed_issues": closed_count}
+    repo = get_repo(repo_name)
+
+    summary = run_bulk(
+        repo.get_issues(state="open"),
+        lambda issue: issue.edit(state="closed"),
+        # the issues API lists pull requests too; those are left to close_all_pull_request.
+        # Listed plain issues have no "pull_request" key, and reading the attribute
+        # would fetch each of them again, so the URL tells them apart.
+        skip=lambda issue: "/pull/" in issue.html_url,
+        dry_run=dry_run,
+        outcome="closed",
+    )
+    if not dry_run:
+        invalidate_repo(repo.full_name)
+    return summary
 
 if __name__ == "__main__":
     mcp_issue_tracking.run(transport="http")
@@ -0,0 +1,57 @@
+from fastmcp import FastMCP
+from github_tools.execution import offloaded
+from github_tools.jobs import FINISHED, SUCCEEDED, jobs
+
+
+mcp_jobs = FastMCP(
+    name="mcp_jobs",
+    instructions="""
+        This server is to help you follow the background jobs started by other github tools
+    """,
+)
+
+# read-only, but the answer changes while a job runs, so it must not be reused
+POLL = {"readOnlyHint": True, "idempotentHint": False}
+
+
+@mcp_jobs.tool(annotations=POLL)
+@offloaded()
+def get_job_status(job_id: str) -> dict:
+    """
+    Check on a background job started by a tool called with background=True.
+
+    Args:
+        job_id (str): The job_id returned when the job was started.
+
+    Returns:
+        dict: The job's tool, arguments, status ("queued", "running", "succeeded",
+              "failed" or "interrupted"), progress (done, total, message),
+              elapsed seconds and error, if it failed.
+    """
+    return jobs.get(job_id).status_dict()
+
+
+#---------------------------------------------------------------------------------------------------
+
+
+@mcp_jobs.tool(annotations=POLL)
+@offloaded()
+def get_job_result(job_id: str) -> dict:
+    """
+    Get the result of a background job once it has finished.
+
+    Args:
+        job_id (str): The job_id returned when the job was started.
+
+    Returns:
+        dict: The job's status, plus "result" (what the tool would have returned)
+              when it succeeded. While it is still running, only the status and
+              progress are returned; ask again later.
+    """
+    job = jobs.get(job_id)
+    status = job.status_dict()
+    if job.status not in FINISHED:
+        return {**status, "message": "The job is still running; ask again later."}
+    if job.status == SUCCEEDED:
+        return {**status, "result": job.result}
+    return status
@@ -0,0 +1,229 @@
+import contextvars
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from github_tools.client import CACHE_DIR
+
+
+# Background jobs for long-running tools.
+#
+# Tools that take a `background` argument (see @offloaded() in execution.py)
+# can return a job ID right away instead of holding the caller until they are
+# done, which may be longer than the LLM client waits for an answer. The job
+# runs on its own small pool, without the caller's deadline, and reports its
+# progress through progress(). Jobs and their results are kept in SQLite, so
+# get_job_status / get_job_result still answer after the caller is gone or the
+# server restarted; jobs that were running during a restart are marked
+# "interrupted".
+#
+#   GITHUB_JOB_WORKERS   jobs that run at the same time; later ones queue
+#   GITHUB_JOB_TTL       seconds a finished job and its result are kept
+
+MAX_WORKERS = int(os.getenv("GITHUB_JOB_WORKERS", "2"))
+TTL = float(os.getenv("GITHUB_JOB_TTL", "86400"))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, INTERRUPTED = "queued", "running", "succeeded", "failed", "interrupted"
+FINISHED = (SUCCEEDED, FAILED, INTERRUPTED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    tool TEXT NOT NULL,
+    arguments TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT
+);
+"""
+
+# the job the current thread is working for, if any
+current_job = contextvars.ContextVar("github_job", default=None)
+
+
+class Job:
+    """
+    State of one background job; progress is updated from the job's threads.
+    """
+
+    def __init__(self, tool: str, arguments: dict, job_id: str | None = None):
+        self.id = job_id or uuid.uuid4().hex[:12]
+        self.tool = tool
+        self.arguments = arguments
+        self.status = QUEUED
+        self.done = 0
+        self.total = None
+        self.message = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self._lock = threading.Lock()
+
+    def update(self, done: int | None = None, total: int | None = None, advance: int = 0, message: str | None = None) -> None:
+        with self._lock:
+            if done is not None:
+                self.done = done
+            self.done += advance
+            if total is not None:
+                self.total = total
+            if message is not None:
+                self.message = message
+
+    def progress(self) -> dict:
+        with self._lock:
+            return {"done": self.done, "total": self.total, "message": self.message}
+
+    def status_dict(self) -> dict:
+        end = self.finished_at or time.time()
+        return {
+            "job_id": self.id,
+            "tool": self.tool,
+            "arguments": self.arguments,
+            "status": self.status,
+            "progress": self.progress(),
+            "elapsed_seconds": round(end - (self.started_at or end), 3),
+            "error": self.error,
+        }
+
+
+def progress(done: int | None = None, total: int | None = None, advance: int = 0, message: str | None = None) -> None:
+    """
+    Report progress of the job the calling code runs in; does nothing outside jobs.
+
+    Args:
+        done (int, optional): Units of work finished so far.
+        total (int, optional): Units of work in total, when known.
+        advance (int): Units finished since the last report.
+        message (str, optional): What the job is doing right now.
+    """
+    job = current_job.get()
+    if job is not None:
+        job.update(done, total, advance, message)
+
+
+class JobStore:
+    """
+    Runs jobs on a thread pool and keeps their state in memory and in SQLite.
+    """
+
+    def __init__(self, path: str, workers: int = MAX_WORKERS, ttl: float = TTL):
+        self.path = path
+        self.ttl = ttl
+        self.started = 0
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="github-job")
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        # nothing survives a restart but the rows
+        self._db.execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE status IN (?, ?)",
+            (INTERRUPTED, time.time(), "The tool server restarted while the job was running.", QUEUED, RUNNING),
+        )
+        self._db.commit()
+
+    def _save(self, job: Job) -> None:
+        result = None if job.result is None else json.dumps(job.result, default=str)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job.id, job.tool, json.dumps(job.arguments, default=str), job.status,
+                    json.dumps(job.progress()), job.created_at, job.started_at, job.finished_at, result, job.error,
+                ),
+            )
+            self._db.commit()
+
+    def _purge(self) -> None:
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            self._db.execute("DELETE FROM jobs WHERE finished_at < ?", (cutoff,))
+            self._db.commit()
+            for job_id in [job.id for job in self._jobs.values() if job.finished_at and job.finished_at < cutoff]:
+                del self._jobs[job_id]
+
+    def start(self, tool: str, arguments: dict, work: Callable[[], Any]) -> dict:
+        """
+        Queue `work` as a background job.
+
+        Args:
+            tool (str): Name of the tool the job runs.
+            arguments (dict): The tool's arguments, reported with the job's status.
+            work (Callable): Runs the tool and returns its result.
+
+        Returns:
+            dict: The new job's status, including its "job_id".
+        """
+        self._purge()
+        job = Job(tool, arguments)
+        with self._lock:
+            self._jobs[job.id] = job
+            self.started += 1
+        self._save(job)
+        # a fresh context: the job outlives the request's deadline and metrics
+        self._pool.submit(contextvars.Context().run, self._run, job, work)
+        return job.status_dict()
+
+    def _run(self, job: Job, work: Callable[[], Any]) -> None:
+        current_job.set(job)
+        job.status, job.started_at = RUNNING, time.time()
+        self._save(job)
+        try:
+            job.result = work()
+            job.status = SUCCEEDED
+        except Exception as error:
+            job.status, job.error = FAILED, f"{type(error).__name__}: {error}"
+        job.finished_at = time.time()
+        self._save(job)
+
+    def get(self, job_id: str) -> Job:
+        """
+        A job by ID, from memory or from the database.
+
+        Raises:
+            ValueError: If there is no such job (or it expired).
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return job
+            row = self._db.execute(
+                "SELECT tool, arguments, status, progress, created_at, started_at, finished_at, result, error "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            raise ValueError(f"Unknown job '{job_id}'; finished jobs are kept for {self.ttl:g} seconds.")
+
+        tool, arguments, status, saved_progress, created_at, started_at, finished_at, result, error = row
+        job = Job(tool, json.loads(arguments), job_id)
+        job.update(**json.loads(saved_progress))
+        job.status, job.created_at, job.started_at, job.finished_at = status, created_at, started_at, finished_at
+        job.result = None if result is None else json.loads(result)
+        job.error = error
+        return job
+
+    def stats(self) -> dict:
+        with self._lock:
+            statuses = dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {
+            "started": self.started,
+            **{status: statuses.get(status, 0) for status in (QUEUED, RUNNING, *FINISHED)},
+            "path": self.path,
+        }
+
+
+jobs = JobStore(os.path.join(CACHE_DIR, "jobs.sqlite3"))
@@ -0,0 +1,206 @@
+import bisect
+import contextvars
+import threading
+from typing import Callable, Iterable
+
+
+# Prometheus text-format metrics without a client library.
+#
+# A Registry holds counters and histograms that are updated as things happen,
+# plus collectors: functions called at scrape time that turn the stats()
+# snapshots the caches, pools and governors already keep into samples. This
+# module imports nothing else from the repo, so the LLM client keeps its own
+# Registry built from the same pieces.
+#
+# The tool server's metrics live in `registry` below; main.py serves them at
+# /metrics.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# (labels, value) pairs of one metric family
+Samples = list[tuple[dict, float]]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(name: str, labels: dict, value: float) -> str:
+    if labels:
+        rendered = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+        name = f"{name}{{{rendered}}}"
+    if value == float("inf"):
+        return f"{name} +Inf"
+    return f"{name} {value:g}" if isinstance(value, float) else f"{name} {value}"
+
+
+class Counter:
+    """
+    Monotonically increasing value per label set.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels.get(label, "")) for label in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def lines(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [_format(self.name, dict(zip(self.labels, key)), value) for key, value in sorted(values.items())]
+
+
+class Histogram:
+    """
+    Cumulative bucket counts, sum and count of observations per label set.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self._values: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(label, "")) for label in self.labels)
+        with self._lock:
+            # [per-bucket counts (last one is +Inf), sum]
+            entry = self._values.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+            entry[0][bisect.bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+
+    def lines(self) -> list[str]:
+        with self._lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        lines = []
+        for key, (counts, total) in sorted(values.items()):
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(_format(f"{self.name}_bucket", {**labels, "le": le}, cumulative))
+            lines.append(_format(f"{self.name}_sum", labels, round(total, 6)))
+            lines.append(_format(f"{self.name}_count", labels, cumulative))
+        return lines
+
+
+class Registry:
+    """
+    Metrics of one process and the collectors that add samples at scrape time.
+    """
+
+    def __init__(self):
+        self.metrics: list = []
+        self.collectors: list[Callable[[], Iterable[tuple[str, str, str, Samples]]]] = []
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labels, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def collector(self, fn: Callable[[], Iterable[tuple[str, str, str, Samples]]]):
+        """
+        Register a function yielding (name, kind, help, samples) families at scrape time.
+        """
+        self.collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        """
+        All metrics in the Prometheus text exposition format.
+        """
+        out = []
+        for metric in self.metrics:
+            out.append(f"# HELP {metric.name} {metric.help}")
+            out.append(f"# TYPE {metric.name} {metric.kind}")
+            out.extend(metric.lines())
+        for collect in self.collectors:
+            try:
+                families = list(collect())
+            except Exception:
+                # a broken source shouldn't take the whole scrape down
+                continue
+            for name, kind, help, samples in families:
+                out.append(f"# HELP {name} {help}")
+                out.append(f"# TYPE {name} {kind}")
+                out.extend(_format(name, labels, value) for labels, value in samples if value is not None)
+        return "\n".join(out) + "\n"
+
+
+class CallMetrics:
+    """
+    Upstream work done on behalf of one tool call, shared by the threads it uses.
+    """
+
+    def __init__(self, tool: str, request_id: str | None = None):
+        self.tool = tool
+        self.request_id = request_id
+        self.requests = 0
+        self.pages = 0
+        self.rate_limit_wait = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, requests: int = 0, pages: int = 0, rate_limit_wait: float = 0.0) -> None:
+        with self._lock:
+            self.requests += requests
+            self.pages += pages
+            self.rate_limit_wait += rate_limit_wait
+
+
+# the tool call the current thread is working for; copied into worker threads by submit()
+current_call = contextvars.ContextVar("github_call", default=None)
+
+registry = Registry()
+
+api_requests = registry.counter(
+    "github_api_requests_total",
+    "GitHub REST requests sent, by tool, rate-limit resource and response status",
+    ("tool", "resource", "status"),
+)
+api_latency = registry.histogram(
+    "github_api_request_duration_seconds",
+    "Latency of GitHub REST requests, including rate-limit waits",
+    ("resource",),
+)
+api_pages = registry.counter(
+    "github_api_pages_total",
+    "Pages of paginated GitHub listings fetched, by tool",
+    ("tool",),
+)
+
+
+def record_api_request(resource: str, status: int, seconds: float, paginated: bool, waited: float = 0.0) -> None:
+    """
+    Count one GitHub request against the tool call it was made for.
+    """
+    call = current_call.get()
+    tool = call.tool if call is not None else ""
+    api_requests.inc(tool=tool, resource=resource, status=status)
+    api_latency.observe(seconds, resource=resource)
+    if paginated:
+        api_pages.inc(tool=tool)
+    if call is not None:
+        call.add(requests=1, pages=int(paginated), rate_limit_wait=waited)
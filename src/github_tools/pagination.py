@@ -0,0 +1,98 @@
+import base64
+import json
+from typing import Any, Callable
+from github_tools.client import github
+from github_tools.deadline import expired
+
+
+# Cursor-based paging for the list tools. Instead of loading every page of a
+# GitHub listing into memory, a tool returns up to `limit` items plus an opaque
+# cursor that continues exactly where the response stopped. When the caller's
+# deadline passes between pages, the items so far are returned early (marked
+# "truncated") with a cursor for the rest.
+
+DEFAULT_PER_PAGE = 100
+MAX_PER_PAGE = 100
+MAX_LIMIT = 1000
+
+
+def encode_cursor(page: int, offset: int, per_page: int) -> str:
+    raw = json.dumps({"page": page, "offset": offset, "per_page": per_page}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int, int, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return int(state["page"]), int(state["offset"]), int(state["per_page"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor; pass the next_cursor value from a previous response.")
+
+
+def advance_cursor(cursor: str, count: int) -> str:
+    """
+    The cursor `count` items further into the same listing.
+    """
+    page, offset, per_page = decode_cursor(cursor)
+    position = (page - 1) * per_page + offset + count
+    return encode_cursor(position // per_page + 1, position % per_page, per_page)
+
+
+def paginate(
+    url: str,
+    transform: Callable[[dict], Any],
+    params: dict | None = None,
+    limit: int = DEFAULT_PER_PAGE,
+    cursor: str | None = None,
+    per_page: int = DEFAULT_PER_PAGE,
+) -> dict:
+    """
+    Fetch one slice of a paginated GitHub REST listing.
+
+    Args:
+        url (str): API URL of the listing (absolute, or relative like "/user/repos").
+        transform (Callable): Turns one raw JSON item into the value returned to the caller.
+        params (dict, optional): Query parameters of the listing.
+        limit (int): Maximum number of items to return.
+        cursor (str, optional): next_cursor from a previous response.
+        per_page (int): GitHub page size (max 100); a cursor keeps the size it was created with.
+
+    Returns:
+        dict: {"items": [...], "cursor": str, "next_cursor": str or None}, plus
+              "truncated": True if the caller's deadline stopped it before `limit`
+              items. "cursor" is where this slice starts, so a slice cut short
+              later (see projection.fit) can still continue after its last item.
+    """
+    limit = max(1, min(limit, MAX_LIMIT))
+    if cursor:
+        page, offset, per_page = decode_cursor(cursor)
+    else:
+        page, offset, per_page = 1, 0, max(1, min(per_page, MAX_PER_PAGE))
+
+    start = encode_cursor(page, offset, per_page)
+    items = []
+    next_cursor = None
+    while True:
+        headers, data = github().requester.requestJsonAndCheck(
+            "GET", url, parameters={**(params or {}), "page": page, "per_page": per_page}
+        )
+        remaining = data[offset:]
+        taken = remaining[: limit - len(items)]
+        items.extend(transform(item) for item in taken)
+        has_next = 'rel="next"' in headers.get("link", "")
+
+        if len(taken) < len(remaining):
+            # stopped inside this page
+            next_cursor = encode_cursor(page, offset + len(taken), per_page)
+            break
+        if not has_next:
+            break
+        page, offset = page + 1, 0
+        if len(items) >= limit:
+            next_cursor = encode_cursor(page, 0, per_page)
+            break
+        if expired():
+            return {"items": items, "cursor": start, "next_cursor": encode_cursor(page, 0, per_page), "truncated": True}
+
+    return {"items": items, "cursor": start, "next_cursor": next_cursor}
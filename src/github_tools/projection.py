@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+from typing import Any
+from github_tools.pagination import advance_cursor
+from github_tools.settings import overrides, tokens_for_bytes
+
+
+# Projection of tool results before they are sent back to the model.
+#
+# Tools can narrow their result to caller-selected fields with select_fields().
+# Every @offloaded() tool result then goes through fit(), which truncates long
+# text fields and trims list items until the whole response fits the byte
+# budget. A trimmed page of a listing gets a next_cursor that continues at its
+# first omitted item, so paging still returns every item; omitted issues and
+# pull requests elsewhere are listed by number. A mapping of counts (e.g.
+# top_contributors) loses its smallest entries first. The savings are counted
+# per tool.
+#
+#   GITHUB_FIELD_CHAR_BUDGET     default maximum characters per text field
+#   GITHUB_FIELD_BUDGETS         per-field overrides, e.g. "body=2000,description=300"
+#   GITHUB_RESPONSE_BYTE_BUDGET  maximum JSON size of one tool response (0 disables)
+
+FIELD_BUDGET = int(os.getenv("GITHUB_FIELD_CHAR_BUDGET", "1000"))
+RESPONSE_BUDGET = int(os.getenv("GITHUB_RESPONSE_BYTE_BUDGET", "20000"))
+FIELD_BUDGETS = overrides("GITHUB_FIELD_BUDGETS", int)
+
+ELLIPSIS = "…"
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode())
+
+def select_fields(result: Any, fields: list[str] | None) -> Any:
+    """
+    Keep only the requested keys of a result.
+
+    Works on a single dict, a list of dicts, or a paginated {"items": [...]}
+    response, where the selection applies to each item. Unknown field names
+    are ignored.
+    """
+    if not fields:
+        return result
+    wanted = set(fields)
+
+    def pick(value):
+        if isinstance(value, dict):
+            return {k: v for k, v in value.items() if k in wanted}
+        return value
+
+    if isinstance(result, list):
+        return [pick(item) for item in result]
+    if isinstance(result, dict) and isinstance(result.get("items"), list):
+        return {**result, "items": [pick(item) for item in result["items"]]}
+    return pick(result)
+
+
+class ProjectionStats:
+    """
+    Per-tool counters of how much the projection saved.
+    """
+
+    def __init__(self):
+        self.tools: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, tool: str, bytes_in: int, bytes_out: int, truncated_fields: int, omitted_items: int) -> None:
+        with self._lock:
+            entry = self.tools.setdefault(
+                tool,
+                {"calls": 0, "bytes_in": 0, "bytes_out": 0, "truncated_fields": 0, "omitted_items": 0},
+            )
+            entry["calls"] += 1
+            entry["bytes_in"] += bytes_in
+            entry["bytes_out"] += bytes_out
+            entry["truncated_fields"] += truncated_fields
+            entry["omitted_items"] += omitted_items
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            tools = {name: dict(entry) for name, entry in self.tools.items()}
+        bytes_in = sum(t["bytes_in"] for t in tools.values())
+        bytes_out = sum(t["bytes_out"] for t in tools.values())
+        return {
+            "bytes_in": bytes_in,
+            "bytes_out": bytes_out,
+            "estimated_tokens_saved": tokens_for_bytes(bytes_in - bytes_out),
+            "tools": tools,
+        }
+
+
+projection_stats = ProjectionStats()
+
+
+def _truncate_fields(value: Any, key: str | None, counter: list[int]) -> Any:
+    if isinstance(value, str) and key is not None:
+        budget = FIELD_BUDGETS.get(key, FIELD_BUDGET)
+        if budget and len(value) > budget:
+            counter[0] += 1
+            return value[:budget] + ELLIPSIS
+        return value
+    if isinstance(value, dict):
+        return {k: _truncate_fields(v, k, counter) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_truncate_fields(v, key or "items", counter) for v in value]
+    return value
+
+
+def _keep_within(entries: list, overflow: int) -> int:
+    # how many leading entries remain after dropping enough from the end
+    kept, removed = len(entries), 0
+    while kept and removed < overflow:
+        kept -= 1
+        removed += _size(entries[kept]) + 1
+    return kept
+
+
+def _weight(value: Any) -> float | None:
+    # the total of a count or of a mapping of counts, e.g. {"commits": 3, "issues": 1}
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, dict) and value and all(
+        isinstance(v, (int, float)) and not isinstance(v, bool) for v in value.values()
+    ):
+        return sum(value.values())
+    return None
+
+
+def _ranked(entries: list[tuple]) -> list[tuple]:
+    # entries holding counts (e.g. top_contributors' login -> counts) go last,
+    # biggest first, so trimming from the end drops the smallest ones
+    weights = [_weight(value) for _, value in entries]
+    others = [entry for entry, weight in zip(entries, weights) if weight is None]
+    counted = sorted(
+        (entry for entry, weight in zip(entries, weights) if weight is not None),
+        key=lambda entry: _weight(entry[1]),
+        reverse=True,
+    )
+    return others + counted
+
+
+def _trim(result: Any, budget: int) -> tuple[Any, int]:
+    overflow = _size(result) - budget
+    if overflow <= 0:
+        return result, 0
+
+    if isinstance(result, list):
+        kept = _keep_within(result, overflow)
+        return result[:kept], len(result) - kept
+
+    if isinstance(result, dict):
+        lists = [k for k, v in result.items() if isinstance(v, list) and v]
+        if lists:
+            # shorten the biggest list, e.g. "items" of a paginated response
+            key = max(lists, key=lambda k: _size(result[k]))
+            kept = _keep_within(result[key], overflow)
+            trimmed = {**result}
+            if key == "items" and result.get("cursor"):
+                # a page of a listing: continue at the first omitted item, and
+                # always keep one so that paging makes progress
+                kept = max(kept, 1)
+                trimmed["next_cursor"] = advance_cursor(result["cursor"], kept)
+            elif all(isinstance(item, dict) and "number" in item for item in result[key][kept:]):
+                # e.g. a batch lookup: name what to ask for again
+                trimmed["omitted_numbers"] = [item["number"] for item in result[key][kept:]]
+            omitted = len(result[key]) - kept
+            trimmed.update({key: result[key][:kept], "truncated": True, "omitted_items": omitted})
+            return trimmed, omitted
+        entries = _ranked(list(result.items()))
+        kept = _keep_within(entries, overflow)
+        omitted = len(entries) - kept
+        return {**dict(entries[:kept]), "truncated": True, "omitted_items": omitted}, omitted
+
+    return result, 0
+
+
+def fit(tool: str, result: Any) -> Any:
+    """
+    Apply the field and response budgets to a tool result and record the savings.
+    """
+    bytes_in = _size(result)
+    counter = [0]
+    projected = _truncate_fields(result, None, counter)
+    omitted = 0
+    if RESPONSE_BUDGET:
+        projected, omitted = _trim(projected, RESPONSE_BUDGET)
+    projection_stats.record(tool, bytes_in, _size(projected), counter[0], omitted)
+    return projected
@@ -1,8 +1,16 @@
 from fastmcp import FastMCP
-import os
-from github import Github, Repository, Issue, AuthenticatedUser, Label, Milestone, Issue
-from github.GithubObject import NotSet
-from typing import Optional
+from github_tools.batch import batch_fields, batch_numbers, fetch_many
+from github_tools.bulk import run_bulk
+from github_tools.client import or_not_set
+from github_tools.execution import offloaded
+from github_tools.pagination import paginate
+from github_tools.projection import select_fields
+from github_tools.rate_limit import BULK
+from github_tools.repo_cache import get_repo, invalidate_repo
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from github.PullRequest import PullRequest
 
 
 mcp_pull_request = FastMCP(
@@ -11,24 +19,18 @@ mcp_pull_request = FastMCP(
         This server is to help you perform actions on github 
     """,
 )
- 
-token = os.getenv("GITHUB_TOKEN")
-if not token:
-    raise ValueError("GITHUB_TOKEN environment variable not set.")
-
-g = Github(token)
-user = g.get_user()
 
 
 #------------------------------------------------------------------------------------------
 
 @mcp_pull_request.tool
+@offloaded()
 def create_pull_request(
     repo_name: str,
     base_branch: str,
     head_branch: str,
     pr_title: str,
-    pr_body: str = NotSet
+    pr_body: Optional[str] = None
 ) -> dict:
     """
     Create a new pull request in the specified GitHub repository.
@@ -43,13 +45,15 @@ def create_pull_request(
     Returns:
         dict: Dictionary containing the pull request title, number, state, and URL.
     """
-    repo = user.get_repo(repo_name)
+    repo = get_repo(repo_name)
     pr = repo.create_pull(
         base=base_branch,
         head=head_branch,
         title=pr_title,
-        body=pr_body
+        body=or_not_set(pr_body)
     )
+    # the cached repo's open_issues_count (which includes PRs) is stale now
+    invalidate_repo(repo.full_name)
 
     return {
         "title": pr.title,
@@ -62,8 +66,9 @@ def create_pull_request(
 
 #---------------------------------------------------------------------------------------------------
 
-@mcp_pull_request.tool
-def get_pull_request_details(repo_name: str, pr_number: int) -> dict:
+@mcp_pull_request.tool(annotations={"readOnlyHint": True})
+@offloaded()
+def get_pull_request_details(repo_name: str, pr_number: int, fields: Optional[list[str]] = None) -> dict:
 
     """
     Get details of a specific pull request from the repository.
@@ -71,15 +76,21 @@ def get_pull_request_details(repo_name: str, pr_number: int) -> dict:
     Args:
         repo_name (str): name of the repo 
         pr_number (int): Pull request number
+        fields (list[str], optional): Only return these keys (e.g. ["title", "state"]); all keys by default.
 
     Returns:
         dict: Information about the pull request (title, state, user, base, head, etc.)
     """
 
-    repo = user.get_repo(repo_name)
+    repo = get_repo(repo_name)
     pr = repo.get_pull(pr_number)
 
+    return select_fields(_pull_request_details(pr), fields)
+
+
+def _pull_request_details(pr: "PullRequest") -> dict:
     return {
+        "number": pr.number,
         "title": pr.title,
         "state": pr.state,
         "user": pr.user.login,
@@ -93,85 +104,191 @@ def get_pull_request_details(repo_name: str, pr_number: int) -> dict:
     }
 
 
+#--------------------------------------------------------------------------------------------------------
+
+@mcp_pull_request.tool(annotations={"readOnlyHint": True})
+@offloaded()
+def get_pull_requests_details(
+    repo_name: str,
+    numbers: Optional[list[int]] = None,
+    first: Optional[int] = None,
+    last: Optional[int] = None,
+    fields: Optional[list[str]] = None
+) -> dict:
+
+    """
+    Get details of several pull requests from the repository in one call, by number or by range.
+
+    Use this instead of repeated get_pull_request_details calls, e.g. for "summarize PRs 101-140".
+
+    Args:
+        repo_name (str): name of the repo 
+        numbers (list[int], optional): Pull request numbers, e.g. [101, 105]
+        first (int, optional): First pull request number of a range
+        last (int, optional): Last pull request number of the range (inclusive)
+        fields (list[str], optional): Only return these keys of each pull request; all keys by default.
+
+    Returns:
+        dict: "items" with the details of each pull request found (as in get_pull_request_details),
+              in the requested order, and "errors" with the number and error of each one
+              that couldn't be retrieved (e.g. the number is an issue, not a pull request).
+              When the response was too big, "omitted_numbers" lists the pull requests
+              left out; ask for them again in another call.
+    """
+
+    wanted = batch_numbers(numbers, first, last)
+    repo = get_repo(repo_name)
+
+    return select_fields(fetch_many(wanted, lambda number: _pull_request_details(repo.get_pull(number))), batch_fields(fields))
+
+
 
 #--------------------------------------------------------------------------------------------------------
 
-@mcp_pull_request.tool
-def list_open_pull_requests(repo_name: str):
+@mcp_pull_request.tool(annotations={"readOnlyHint": True})
+@offloaded()
+def list_open_pull_requests(
+    repo_name: str,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    per_page: int = 100,
+    fields: Optional[list[str]] = None
+) -> dict:
 
     """
-    List all open pull requests for a given GitHub repository.
+    List the open pull requests for a given GitHub repository, one slice at a time.
 
     Args:
         repo_name (str): the name of the repository
+        limit (int): Maximum number of pull requests to return (default 100).
+        cursor (str, optional): The next_cursor from a previous call, to continue the listing.
+        per_page (int): How many pull requests to fetch from GitHub per request (max 100).
+        fields (list[str], optional): Only return these keys of each item (e.g. ["number"]); all keys by default.
 
     Returns:
-        list: A list of dictionaries containing title, number, and URL for each open pull request.
+        dict: "items" with title, number, and URL for each open pull request,
+              and "next_cursor" to fetch more (None when done).
     """
 
-    repo = user.get_repo(repo_name)
-    pulls = repo.get_pulls(state="open")
-    
-    return [
-        {
-            "title": pr.title,
-            "number": pr.number,
-            "url": pr.html_url
-        }
-        for pr in pulls
-    ]
+    repo = get_repo(repo_name)
+
+    return select_fields(paginate(
+        f"{repo.url}/pulls",
+        lambda pr: {
+            "title": pr["title"],
+            "number": pr["number"],
+            "url": pr["html_url"]
+        },
+        params={"state": "open"},
+        limit=limit,
+        cursor=cursor,
+        per_page=per_page,
+    ), fields)
 
 
 #--------------------------------------------------------------------------------------------------------
 
 
-@mcp_pull_request.tool
-def list_recently_updated_prs(repo_name: str):
+@mcp_pull_request.tool(annotations={"readOnlyHint": True})
+@offloaded()
+def list_recently_updated_prs(
+    repo_name: str,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    per_page: int = 100,
+    fields: Optional[list[str]] = None
+) -> dict:
     """
-    List PRs sorted by most recently updated.
+    List open PRs sorted by most recently updated, one slice at a time.
+
+    Args:
+        repo_name (str): the name of the repository
+        limit (int): Maximum number of pull requests to return (default 100).
+        cursor (str, optional): The next_cursor from a previous call, to continue the listing.
+        per_page (int): How many pull requests to fetch from GitHub per request (max 100).
+        fields (list[str], optional): Only return these keys of each item (e.g. ["title", "url"]); all keys by default.
+
+    Returns:
+        dict: "items" with title, update time and URL of each PR, and "next_cursor" to fetch more.
     """
-    repo = user.get_repo(repo_name)
-    pulls = repo.get_pulls(state="open", sort="updated", direction="desc")
-    return [{"title": pr.title, "updated_at": str(pr.updated_at), "url": pr.html_url} for pr in pulls]
+    repo = get_repo(repo_name)
+    return select_fields(paginate(
+        f"{repo.url}/pulls",
+        lambda pr: {"title": pr["title"], "updated_at": pr["updated_at"], "url": pr["html_url"]},
+        params={"state": "open", "sort": "updated", "direction": "desc"},
+        limit=limit,
+        cursor=cursor,
+        per_page=per_page,
+    ), fields)
 
 
 #--------------------------------------------------------------------------------------------------------
 
 
-@mcp_pull_request.tool
-def list_pr_comments(repo_name: str, pr_number: int):
+@mcp_pull_request.tool(annotations={"readOnlyHint": True})
+@offloaded()
+def list_pr_comments(
+    repo_name: str,
+    pr_number: int,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    per_page: int = 100
+) -> dict:
     """
-    Lists all review comments on a pull request.
+    Lists the review comments on a pull request, one slice at a time.
 
     Args:
         repo_name (str): Repository in the form "owner/repo"
         pr_number (int): The pull request number
+        limit (int): Maximum number of comments to return (default 100).
+        cursor (str, optional): The next_cursor from a previous call, to continue the listing.
+        per_page (int): How many comments to fetch from GitHub per request (max 100).
 
     Returns:
-        List[str]: A list of comment bodies
+        dict: "items" with the comment bodies, and "next_cursor" to fetch more (None when done).
     """
-    repo = g.get_repo(repo_name)
-    pr = repo.get_pull(pr_number)
-    comments = pr.get_comments()
-    
-    return [comment.body for comment in comments]
+    repo = get_repo(repo_name)
+    return paginate(
+        f"{repo.url}/pulls/{pr_number}/comments",
+        lambda comment: comment["body"],
+        limit=limit,
+        cursor=cursor,
+        per_page=per_page,
+    )
 
 
 #--------------------------------------------------------------------------------------------------------
 
 
 @mcp_pull_request.tool
-def close_all_pull_request(repo_name):
+@offloaded(limit=1, priority=BULK)
+def close_all_pull_request(repo_name: str, dry_run: bool = False, background: bool = False) -> dict:
 
     """
     Close all open pull requests in the given repository.
+
+    Args:
+        repo_name (str): the name of the repository
+        dry_run (bool): Only count the pull requests that would be closed.
+        background (bool): Start a background job and return its job_id right away instead of
+                           waiting (for repositories with many open pull requests); follow it
+                           with get_job_status and get_job_result.
+
+    Returns:
+        dict: A summary with the number of closed pull requests, the ones that failed to close
+              (with errors) and the elapsed time in seconds; or the started job with background=True.
     """
-    repo = user.get_repo(repo_name)
-    open_pulls = repo.get_pulls(state='open')
-    
-    for pr in open_pulls:
-        pr.edit(state="closed")
-        print(f"Closed PR #{pr.number}: {pr.title}")
+    repo = get_repo(repo_name)
+
+    summary = run_bulk(
+        repo.get_pulls(state="open"),
+        lambda pr: pr.edit(state="closed"),
+        dry_run=dry_run,
+        outcome="closed",
+    )
+    if not dry_run:
+        invalidate_repo(repo.full_name)
+    return summary
 
 
 if __name__ == "__main__":
@@ -0,0 +1,166 @@
+import contextvars
+import os
+import threading
+import time
+from github_tools.deadline import DeadlineExceeded, remaining
+
+
+# Process-wide GitHub rate-limit governor.
+#
+# Every request made through the shared client asks the governor for
+# permission first and reports the rate-limit headers of its response back.
+# Interactive tools may use the whole remaining budget. Bulk and analytics
+# tools draw from a token bucket refilled at the pace that spreads what is
+# left above a reserve until the reset. So they slow down before the budget
+# runs out, and they stop at the reserve that is kept for interactive lookups.
+#
+#   GITHUB_RATE_RESERVE  share of the hourly limit kept for interactive tools
+#   GITHUB_RATE_BURST    requests bulk/analytics tools may make back-to-back
+
+RESERVE = float(os.getenv("GITHUB_RATE_RESERVE", "0.2"))
+BURST = float(os.getenv("GITHUB_RATE_BURST", "10"))
+
+INTERACTIVE = "interactive"
+ANALYTICS = "analytics"
+BULK = "bulk"
+
+# priority of the tool call the current thread is working for
+priority = contextvars.ContextVar("github_priority", default=INTERACTIVE)
+
+
+def resource_for(url: str) -> str:
+    """
+    GitHub rate-limit bucket ("core", "search" or "graphql") a request URL counts against.
+    """
+    path = url.split("?", 1)[0]
+    if "/search/" in path:
+        return "search"
+    if path.endswith("/graphql"):
+        return "graphql"
+    return "core"
+
+
+class Budget:
+    """
+    Rate-limit state of one resource as last reported by GitHub.
+    """
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.reset = 0.0
+        self.tokens = BURST
+        self.refilled = time.monotonic()
+
+    def reserve(self) -> float:
+        return (self.limit or 0) * RESERVE
+
+    def refill_rate(self) -> float:
+        # tokens per second that spread the budget above the reserve until the reset
+        seconds_left = max(self.reset - time.time(), 1.0)
+        return max(self.remaining - self.reserve(), 0) / seconds_left
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        if self.remaining is not None:
+            self.tokens = min(BURST, self.tokens + (now - self.refilled) * self.refill_rate())
+        self.refilled = now
+
+
+class RateLimitGovernor:
+    """
+    Throttles outgoing GitHub requests by priority based on response headers.
+    """
+
+    def __init__(self):
+        self.budgets: dict[str, Budget] = {}
+        self.blocked_until = 0.0
+        self.waits = {INTERACTIVE: 0, ANALYTICS: 0, BULK: 0}
+        self.wait_seconds = {INTERACTIVE: 0.0, ANALYTICS: 0.0, BULK: 0.0}
+        self._condition = threading.Condition()
+
+    def _delay(self, budget: Budget, level: str) -> float:
+        """
+        Seconds to wait before a request may go out; 0 takes the permit.
+        """
+        now = time.time()
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        if budget.remaining is None:
+            return 0.0
+        if now >= budget.reset and budget.limit is not None:
+            # the window rolled over; headers on the next response confirm it
+            budget.remaining = budget.limit
+        budget.refill()
+
+        if level == INTERACTIVE:
+            if budget.remaining <= 0:
+                return budget.reset - now
+        elif budget.remaining <= budget.reserve():
+            return budget.reset - now
+        elif budget.tokens < 1:
+            rate = budget.refill_rate()
+            return (1 - budget.tokens) / rate if rate > 0 else budget.reset - now
+
+        # interactive calls take tokens too (possibly going negative), so
+        # background work automatically yields to them
+        budget.tokens -= 1
+        budget.remaining -= 1
+        return 0.0
+
+    def acquire(self, resource: str = "core") -> None:
+        level = priority.get()
+        started = time.monotonic()
+        with self._condition:
+            budget = self.budgets.setdefault(resource, Budget())
+            while True:
+                delay = self._delay(budget, level)
+                if delay <= 0:
+                    break
+                left = remaining()
+                if left is not None and left < delay:
+                    # nobody will be waiting for the answer anymore
+                    raise DeadlineExceeded(f"GitHub rate limit wait of {delay:.0f}s outlasts the caller's deadline")
+                # wake up early when new headers arrive
+                self._condition.wait(timeout=min(delay, 5.0))
+
+            waited = time.monotonic() - started
+            if waited > 0.001:
+                self.waits[level] += 1
+                self.wait_seconds[level] += waited
+
+    def update(self, resource: str, status: int, headers) -> None:
+        headers = {k.lower(): v for k, v in headers.items()}
+        with self._condition:
+            budget = self.budgets.setdefault(resource, Budget())
+            if "x-ratelimit-remaining" in headers:
+                budget.refill()
+                budget.limit = int(float(headers["x-ratelimit-limit"]))
+                budget.remaining = int(float(headers["x-ratelimit-remaining"]))
+                budget.reset = float(headers.get("x-ratelimit-reset", budget.reset))
+            if status in (403, 429) and "retry-after" in headers:
+                # secondary rate limit: nobody sends anything until it passes
+                self.blocked_until = max(self.blocked_until, time.time() + float(headers["retry-after"]))
+            self._condition.notify_all()
+
+    def snapshot(self) -> dict:
+        with self._condition:
+            now = time.time()
+            return {
+                "resources": {
+                    name: {
+                        "limit": budget.limit,
+                        "remaining": budget.remaining,
+                        "reset_in_seconds": max(round(budget.reset - now), 0),
+                        "bucket_tokens": round(budget.tokens, 2),
+                        "refill_per_second": round(budget.refill_rate(), 3) if budget.remaining is not None else None,
+                    }
+                    for name, budget in self.budgets.items()
+                },
+                "secondary_blocked_seconds": max(round(self.blocked_until - now, 1), 0),
+                "waits": dict(self.waits),
+                "wait_seconds": {level: round(seconds, 3) for level, seconds in self.wait_seconds.items()},
+            }
+
+
+governor = RateLimitGovernor()
@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+from github_tools.client import authenticated_user, github
+
+if TYPE_CHECKING:
+    from github.Repository import Repository
+
+
+# Every tool resolves its repository before doing any real work, which costs
+# a full REST round-trip. Resolved Repository objects are kept here for a
+# short time so repeated calls on the same repo skip that lookup.
+
+TTL = float(os.getenv("GITHUB_REPO_CACHE_TTL", "300"))
+MAX_SIZE = int(os.getenv("GITHUB_REPO_CACHE_SIZE", "256"))
+
+
+class RepoCache:
+    """
+    Thread-safe TTL + LRU cache of Repository objects keyed by "owner/name".
+    """
+
+    def __init__(self, ttl: float = TTL, max_size: int = MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, "Repository"]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def full_name(repo_name: str) -> str:
+        """
+        Return "owner/name" for a repo name, using the authenticated user as the
+        owner when only a bare name is given.
+        """
+        if "/" in repo_name:
+            return repo_name
+        return f"{authenticated_user().login}/{repo_name}"
+
+    def get(self, repo_name: str) -> "Repository":
+        full_name = self.full_name(repo_name)
+        key = full_name.lower()
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # fetch outside the lock so one slow lookup doesn't block the others
+        repo = github().get_repo(full_name)
+
+        with self._lock:
+            self._entries[key] = (now + self.ttl, repo)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return repo
+
+    def invalidate(self, repo_name: str) -> None:
+        key = self.full_name(repo_name).lower()
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+            }
+
+
+repo_cache = RepoCache()
+
+
+def get_repo(repo_name: str) -> "Repository":
+    """
+    Resolve a repository through the shared cache.
+    """
+    return repo_cache.get(repo_name)
+
+
+def invalidate_repo(repo_name: str) -> None:
+    """
+    Drop a repository from the cache, e.g. after it was created, deleted or changed.
+    """
+    repo_cache.invalidate(repo_name)
@@ -1,7 +1,9 @@
 from fastmcp import FastMCP
-import os
-from github import Github, Repository, Issue, AuthenticatedUser
-from github.GithubObject import NotSet
+from typing import Optional
+from github_tools.client import authenticated_user, or_not_set
+from github_tools.execution import offloaded
+from github_tools.pagination import paginate
+from github_tools.repo_cache import get_repo, invalidate_repo
 
 
 mcp_management = FastMCP(
@@ -10,31 +12,27 @@ mcp_management = FastMCP(
         This server is to help you perform actions on github 
     """,
 )
- 
-token = os.getenv("GITHUB_TOKEN")
-if not token:
-    raise ValueError("GITHUB_TOKEN environment variable not set.")
-
-g = Github(token)
-user = g.get_user()
 
 
 
 #repository management (creating and deleting repos)
 #first tool is creating a repo
 @mcp_management.tool
+@offloaded()
 def create_github_repo(
     name: str,
-    private: bool = NotSet
+    private: Optional[bool] = None
 ) -> str:
     """
     Create a GitHub repository with the given parameters.
     Returns the URL of the newly created repo.
     """
-    repo = user.create_repo(
+    repo = authenticated_user().create_repo(
         name=name,
-        private=private
+        private=or_not_set(private)
     )
+    # a repo with the same name may have been deleted and cached earlier
+    invalidate_repo(repo.full_name)
     return f"✅ Repository '{repo.name}' created successfully at {repo.html_url}"
 
 
@@ -43,6 +41,7 @@ def create_github_repo(
 
 #second tool is deleting a repo
 @mcp_management.tool
+@offloaded()
 def delete_github_repo(repo_name: str) -> None:
     """
     Deletes the repository owned by user.
@@ -54,13 +53,14 @@ def delete_github_repo(repo_name: str) -> None:
         github.GithubException if repo not found or delete fails.
     """
 
-    repo = user.get_repo(repo_name)  
+    repo = get_repo(repo_name)  
     
     #confirm = input(f"⚠️ Are you sure you want to delete '{repo_name}'? This cannot be undone! (yes/no): ").strip().lower()
     #if confirm != "yes":
     #    print("Deletion cancelled.")
     
     repo.delete()  # This calls the GitHub DELETE /repos/{owner}/{repo} API
+    invalidate_repo(repo_name)
     
     return f"✅ Repository '{repo_name}' deleted successfully."
 
@@ -69,15 +69,32 @@ def delete_github_repo(repo_name: str) -> None:
 
 
 #third toold is listing all the current repos
-@mcp_management.tool
-def list_github_repos() -> list[str]:
+@mcp_management.tool(annotations={"readOnlyHint": True})
+@offloaded()
+def list_github_repos(
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    per_page: int = 100
+) -> dict:
     """
-    Returns a list of repo names for the user.
-    
+    Returns the repo names for the user, one slice at a time.
+
+    Args:
+        limit (int): Maximum number of repos to return (default 100).
+        cursor (str, optional): The next_cursor from a previous call, to continue the listing.
+        per_page (int): How many repos to fetch from GitHub per request (max 100).
+
+    Returns:
+        dict: "items" with the repo names, and "next_cursor" to fetch more (None when done).
     """
 
-    repos = user.get_repos()
-    return [repo.name for repo in repos]
+    return paginate(
+        "/user/repos",
+        lambda repo: repo["name"],
+        limit=limit,
+        cursor=cursor,
+        per_page=per_page,
+    )
 
 
 
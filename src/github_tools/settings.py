@@ -0,0 +1,39 @@
+import os
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+# Conventions the tool server and the LLM client share: the format of per-name
+# overrides in environment variables, and the rough size of a model token.
+# Like metrics.py, this module imports nothing else from the repo, so the LLM
+# client can use it without loading the tools.
+
+# rough rule of thumb for JSON sent to the model
+BYTES_PER_TOKEN = 4
+
+
+def overrides(variable: str, cast: Callable[[str], T]) -> dict[str, T]:
+    """
+    Per-name overrides from an environment variable.
+
+    Args:
+        variable (str): Name of the variable, holding e.g. "top_contributors=60,body=2000".
+        cast (Callable[[str], T]): Converts each value, e.g. int or float.
+
+    Returns:
+        dict[str, T]: Value by name; entries without "=" are ignored.
+    """
+    values = {}
+    for item in os.getenv(variable, "").split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            values[name.strip()] = cast(value)
+    return values
+
+
+def tokens_for_bytes(size: int) -> int:
+    """
+    Rough number of model tokens in `size` bytes of JSON.
+    """
+    return size // BYTES_PER_TOKEN
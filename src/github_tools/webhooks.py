@@ -0,0 +1,234 @@
+import hashlib
+import hmac
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Mapping
+from urllib.parse import parse_qs
+from github_tools.activity_index import activity_index
+from github_tools.metrics import registry
+from github_tools.repo_cache import invalidate_repo
+
+
+# GitHub webhook receiver (POST /webhooks/github on the tool server).
+#
+# Deliveries are checked against the X-Hub-Signature-256 HMAC of the shared
+# secret and applied to the in-process state, so reads stay fresh without
+# polling GitHub:
+#
+#   issues, pull_request  the item is written to the activity index and the
+#                         repo's cached metadata (open issue count) is dropped
+#   push                  commits pushed to the default branch go into the
+#                         activity index; the repo's cached metadata is dropped
+#   repository            the cached repo is dropped; a deleted, renamed or
+#                         transferred repo's activity index is forgotten
+#   create, delete        branches and tags aren't cached in-process (listings
+#                         revalidate through the ETag cache), so these are
+#                         only acknowledged
+#
+# A dropped repo is looked up again on its next use, usually as a free 304
+# from the HTTP cache. Redeliveries of an already applied delivery ID are
+# ignored. Without a secret the endpoint rejects every delivery.
+#
+#   GITHUB_WEBHOOK_SECRET   secret configured on the GitHub webhook
+
+SECRET = os.getenv("GITHUB_WEBHOOK_SECRET", "")
+
+EVENT_HEADER = "X-GitHub-Event"
+DELIVERY_HEADER = "X-GitHub-Delivery"
+SIGNATURE_HEADER = "X-Hub-Signature-256"
+
+webhook_events = registry.counter(
+    "github_webhook_events_total",
+    "Webhook deliveries by event and outcome",
+    ("event", "outcome"),
+)
+
+
+def sign(body: bytes, secret: str = SECRET) -> str:
+    """
+    The X-Hub-Signature-256 value GitHub sends for a body.
+    """
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(body: bytes, signature: str | None, secret: str = SECRET) -> bool:
+    if not secret or not signature:
+        return False
+    return hmac.compare_digest(sign(body, secret), signature)
+
+
+class DeliveryLog:
+    """
+    Delivery IDs applied recently, so a redelivered event isn't applied twice.
+    """
+
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self._ids: OrderedDict[str, None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def seen(self, delivery: str | None) -> bool:
+        with self._lock:
+            return delivery in self._ids
+
+    def add(self, delivery: str | None) -> None:
+        if not delivery:
+            return
+        with self._lock:
+            self._ids[delivery] = None
+            while len(self._ids) > self.max_size:
+                self._ids.popitem(last=False)
+
+
+deliveries = DeliveryLog()
+
+
+def _timestamp(value) -> datetime | None:
+    # webhook payloads use ISO strings, except push payloads' repository,
+    # which has epoch seconds
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc)
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _login(user: dict | None) -> str:
+    return user["login"] if user else "Unknown"
+
+
+def _apply_item(repo_name: str, item: dict, kind: str, merged_at) -> None:
+    activity_index.apply_item(
+        repo_name,
+        item["number"],
+        kind,
+        _login(item.get("user")),
+        item["state"],
+        _timestamp(item["created_at"]),
+        _timestamp(item["updated_at"]),
+        _timestamp(item.get("closed_at")),
+        _timestamp(merged_at),
+    )
+
+
+def _issues(payload: dict) -> None:
+    repo_name = payload["repository"]["full_name"]
+    issue = payload["issue"]
+    invalidate_repo(repo_name)
+    if activity_index is None:
+        return
+    if payload.get("action") == "deleted":
+        activity_index.delete_item(repo_name, issue["number"])
+        return
+    # the issues API reports pull requests as issues with a "pull_request" link
+    pull_request = issue.get("pull_request")
+    kind = "pull_request" if pull_request else "issue"
+    _apply_item(repo_name, issue, kind, pull_request.get("merged_at") if pull_request else None)
+
+
+def _pull_request(payload: dict) -> None:
+    repo_name = payload["repository"]["full_name"]
+    pull_request = payload["pull_request"]
+    invalidate_repo(repo_name)
+    if activity_index is not None:
+        _apply_item(repo_name, pull_request, "pull_request", pull_request.get("merged_at"))
+
+
+def _push(payload: dict) -> None:
+    repository = payload["repository"]
+    repo_name = repository["full_name"]
+    invalidate_repo(repo_name)
+    # the index mirrors the commits listing, which follows the default branch
+    if activity_index is None or payload["ref"] != f"refs/heads/{repository['default_branch']}":
+        return
+    commits = [
+        (commit["id"], commit.get("author", {}).get("username") or "Unknown", _timestamp(commit["timestamp"]))
+        for commit in payload.get("commits", [])
+        if commit.get("distinct", True)
+    ]
+    if commits:
+        activity_index.apply_commits(repo_name, commits)
+
+
+def _ref(payload: dict) -> None:
+    return None
+
+
+def _repository(payload: dict) -> None:
+    repository = payload["repository"]
+    repo_name = repository["full_name"]
+    action = payload.get("action")
+    changes = payload.get("changes", {})
+
+    stale = [repo_name]
+    if action == "renamed":
+        stale.append(f"{repository['owner']['login']}/{changes['repository']['name']['from']}")
+    elif action == "transferred":
+        previous = changes["owner"]["from"]
+        owner = (previous.get("user") or previous.get("organization"))["login"]
+        stale.append(f"{owner}/{repository['name']}")
+
+    for name in stale:
+        invalidate_repo(name)
+    if activity_index is not None and action in ("deleted", "renamed", "transferred"):
+        # the old name's history is re-synced under the new name on first use
+        for name in stale if action == "deleted" else stale[1:]:
+            activity_index.drop_repo(name)
+
+
+HANDLERS: dict[str, Callable[[dict], None]] = {
+    "issues": _issues,
+    "pull_request": _pull_request,
+    "push": _push,
+    "create": _ref,
+    "delete": _ref,
+    "repository": _repository,
+    "ping": _ref,
+}
+
+
+def _payload(headers: Mapping[str, str], body: bytes) -> dict:
+    # webhooks can be configured with either content type
+    if headers.get("content-type", "").startswith("application/x-www-form-urlencoded"):
+        return json.loads(parse_qs(body.decode())["payload"][0])
+    return json.loads(body)
+
+
+def receive(headers: Mapping[str, str], body: bytes) -> tuple[int, dict]:
+    """
+    Verify and apply one webhook delivery.
+
+    Args:
+        headers (Mapping[str, str]): Request headers (case-insensitive, like Starlette's).
+        body (bytes): Raw request body, as signed by GitHub.
+
+    Returns:
+        tuple[int, dict]: HTTP status and response body, with the event and
+                          its outcome ("applied", "ignored" or "duplicate").
+    """
+    event = headers.get(EVENT_HEADER, "")
+    if not SECRET:
+        return 503, {"error": "Webhooks are disabled: GITHUB_WEBHOOK_SECRET is not set."}
+    if not verify_signature(body, headers.get(SIGNATURE_HEADER), SECRET):
+        webhook_events.inc(event=event, outcome="rejected")
+        return 401, {"error": "Invalid signature."}
+
+    handler = HANDLERS.get(event)
+    if handler is None:
+        outcome = "ignored"
+    elif deliveries.seen(headers.get(DELIVERY_HEADER)):
+        outcome = "duplicate"
+    else:
+        try:
+            handler(_payload(headers, body))
+        except (KeyError, TypeError, ValueError) as error:
+            webhook_events.inc(event=event, outcome="invalid")
+            return 400, {"error": f"Malformed {event} payload: {error!r}"}
+        deliveries.add(headers.get(DELIVERY_HEADER))
+        outcome = "applied"
+
+    webhook_events.inc(event=event, outcome=outcome)
+    return 200, {"event": event, "outcome": outcome}
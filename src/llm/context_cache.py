@@ -0,0 +1,126 @@
+import asyncio
+import hashlib
+import os
+import time
+from google import genai
+from google.genai import types
+
+
+# Gemini context caching of the tool declarations.
+#
+# The declarations are the same large prefix on every request. For each set
+# of tools a request offers (see routing.py), a cached content is created
+# once and later requests only reference it by name. Sets smaller than the
+# API's minimum cacheable size are sent inline as before, and so is every set
+# whose cache couldn't be created. When the tool catalog changes, reset()
+# drops all caches and they are rebuilt on demand.
+#
+#   LLM_CONTEXT_CACHE             set to "0" to always send the declarations inline
+#   LLM_CONTEXT_CACHE_TTL         seconds a cached content lives on Gemini's side
+#   LLM_CONTEXT_CACHE_MIN_TOKENS  estimated tokens below which a tool set is sent inline
+
+ENABLED = os.getenv("LLM_CONTEXT_CACHE", "1") != "0"
+TTL = int(os.getenv("LLM_CONTEXT_CACHE_TTL", "3600"))
+MIN_TOKENS = int(os.getenv("LLM_CONTEXT_CACHE_MIN_TOKENS", "1024"))
+# recreate a cache this long before it expires instead of racing the expiry
+RENEW_MARGIN = 60.0
+
+
+def tool_set_key(tools: list[types.Tool]) -> str:
+    names = sorted(declaration.name for tool in tools for declaration in tool.function_declarations or [])
+    return hashlib.sha256("\n".join(names).encode()).hexdigest()
+
+
+class ContextCache:
+    """
+    Gemini cached contents for tool sets, created lazily and shared by all requests.
+    """
+
+    def __init__(self, ttl: int = TTL, min_tokens: int = MIN_TOKENS, enabled: bool = ENABLED):
+        self.ttl = ttl
+        self.min_tokens = min_tokens
+        self.enabled = enabled
+        self.hits = 0
+        self.inline = 0
+        self.created = 0
+        self.failures = 0
+        self.resets = 0
+        self._caches: dict[str, tuple[str, float]] = {}
+        self._failed: set[str] = set()
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def lookup(
+        self,
+        gemini_client: genai.Client,
+        model: str,
+        tools: list[types.Tool],
+        tokens: int,
+    ) -> str | None:
+        """
+        Name of the cached content holding these tools, or None to send them inline.
+
+        Args:
+            gemini_client (genai.Client): Client used to create the cache.
+            model (str): Model the cache is created for (caches are per model).
+            tools (list[types.Tool]): Declarations offered with the request.
+            tokens (int): Estimated size of the declarations.
+        """
+        key = f"{model}:{tool_set_key(tools)}"
+        if not self.enabled or tokens < self.min_tokens or key in self._failed:
+            self.inline += 1
+            return None
+
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            entry = self._caches.get(key)
+            if entry is None or entry[1] - RENEW_MARGIN < time.monotonic():
+                try:
+                    cache = await gemini_client.aio.caches.create(
+                        model=model,
+                        config=types.CreateCachedContentConfig(
+                            display_name="github-mcp-tools",
+                            tools=tools,
+                            ttl=f"{self.ttl}s",
+                        ),
+                    )
+                except Exception:
+                    # e.g. below the model's minimum size or caching unavailable;
+                    # don't try again for this set until the catalog changes
+                    self.failures += 1
+                    self._failed.add(key)
+                    self.inline += 1
+                    return None
+                entry = (cache.name, time.monotonic() + self.ttl)
+                self._caches[key] = entry
+                self.created += 1
+            else:
+                self.hits += 1
+            return entry[0]
+
+    async def reset(self, gemini_client: genai.Client) -> None:
+        """
+        Forget every cache, e.g. after the tool catalog changed, and delete them
+        on Gemini's side (best effort; they expire anyway).
+        """
+        names = [name for name, _ in self._caches.values()]
+        self._caches.clear()
+        self._failed.clear()
+        self.resets += 1
+        for name in names:
+            try:
+                await gemini_client.aio.caches.delete(name=name)
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "caches": len(self._caches),
+            "hits": self.hits,
+            "inline": self.inline,
+            "created": self.created,
+            "failures": self.failures,
+            "resets": self.resets,
+        }
+
+
+context_cache = ContextCache()
@@ -0,0 +1,78 @@
+from github_tools.metrics import COUNT_BUCKETS, Registry
+from .context_cache import context_cache
+from .prompt_cache import prompt_cache
+from .routing import router
+
+
+# Metrics of the LLM client, served at /metrics in the Prometheus text format.
+#
+# /ask and /ask/stream report their latency and outcome, the orchestrator each
+# model turn (latency, tokens) and tool call. The collectors add the stats()
+# of the prompt cache, router and context cache; LLM_client.py registers the
+# MCP session pool's.
+
+registry = Registry()
+
+ask_requests = registry.counter(
+    "llm_ask_requests_total",
+    "Requests by endpoint and outcome (ok, cached, deadline, turn_budget, timeout, error)",
+    ("endpoint", "outcome"),
+)
+ask_latency = registry.histogram(
+    "llm_ask_duration_seconds",
+    "Latency of /ask and /ask/stream requests that weren't served from the prompt cache",
+    ("endpoint",),
+)
+model_latency = registry.histogram(
+    "llm_model_turn_duration_seconds",
+    "Latency of one Gemini turn (one streamed generate_content call)",
+)
+model_tokens = registry.counter(
+    "llm_model_tokens_total",
+    "Gemini tokens by kind (prompt, cached, output)",
+    ("kind",),
+)
+turns = registry.histogram(
+    "llm_model_turns",
+    "Gemini turns needed by one request",
+    buckets=COUNT_BUCKETS,
+)
+tool_calls = registry.counter(
+    "llm_tool_calls_total",
+    "Tool calls made for the model, by tool and outcome",
+    ("tool", "outcome"),
+)
+tool_latency = registry.histogram(
+    "llm_tool_call_duration_seconds",
+    "Latency of tool calls as seen from the LLM client",
+    ("tool",),
+)
+
+
+@registry.collector
+def _prompt_cache():
+    stats = prompt_cache.stats()
+    yield "llm_prompt_cache_hits_total", "counter", "Prompts answered from the prompt cache", [({}, stats["hits"])]
+    yield "llm_prompt_cache_misses_total", "counter", "Prompts that needed the model", [({}, stats["misses"])]
+    yield "llm_prompt_cache_evictions_total", "counter", "Cached answers evicted by mutating tool calls", [({}, stats["evictions"])]
+    yield "llm_prompt_cache_entries", "gauge", "Answers in the prompt cache", [({}, stats["size"])]
+
+
+@registry.collector
+def _routing():
+    stats = router.stats()
+    yield "llm_routing_tokens_saved_total", "counter", "Estimated declaration tokens not sent thanks to tool routing", [
+        ({}, stats["tokens_saved"])
+    ]
+
+
+@registry.collector
+def _context_cache():
+    stats = context_cache.stats()
+    yield "llm_context_cache_lookups_total", "counter", "Context cache lookups by result", [
+        ({"result": "hit"}, stats["hits"]),
+        ({"result": "created"}, stats["created"]),
+        ({"result": "inline"}, stats["inline"]),
+    ]
+    yield "llm_context_cache_failures_total", "counter", "Context caches that couldn't be created", [({}, stats["failures"])]
+    yield "llm_context_caches", "gauge", "Gemini cached contents currently in use", [({}, stats["caches"])]
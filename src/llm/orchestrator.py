@@ -0,0 +1,313 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import AsyncIterator
+from google import genai
+from google.genai import types
+from fastmcp import Client
+from mcp import types as mcp_types
+from . import metrics
+from github_tools.settings import overrides
+
+
+# The Gemini + MCP tool-calling orchestrator behind /ask and /ask/stream.
+#
+# generate_content() with an MCP session only returns once the whole tool
+# chain has run, always offers every tool of the session, and runs the calls
+# of one turn one after another. Here the loop is driven by hand instead: the
+# caller picks the tools, model tokens are yielded as they arrive, the calls
+# Gemini asks for in one turn run concurrently with a timeout each, the number
+# of model turns is capped, and every step is recorded on a timeline.
+#
+# A request deadline bounds everything: no new turn starts after it, and each
+# tool call gets the time that is left (capped by its own timeout). That time
+# is sent to the MCP server as "timeout" in the call's _meta, so tools stop
+# their GitHub pagination early and return partial results instead of working
+# on after the caller has given up.
+#
+# A request ID is sent along in the same _meta, so the tool server's records
+# of the calls can be matched with the request's timeline.
+#
+#   LLM_MAX_TURNS      model turns per request (each may request tool calls)
+#   LLM_TOOL_TIMEOUT   default seconds a tool call may take
+#   LLM_TOOL_TIMEOUTS  per-tool overrides, e.g. "top_contributors=60,close_all_open_issues=120"
+
+MODEL = "gemini-2.5-flash"
+MAX_TURNS = int(os.getenv("LLM_MAX_TURNS", "10"))
+TOOL_TIMEOUT = float(os.getenv("LLM_TOOL_TIMEOUT", "8"))
+TOOL_TIMEOUTS = overrides("LLM_TOOL_TIMEOUTS", float)
+
+# JSON Schema keywords Gemini's function declarations accept
+SCHEMA_FIELDS = set(types.JSONSchema.model_fields)
+
+# share of a tool's time the server may spend before it must stop and answer,
+# leaving the rest for sending back a partial result
+SERVER_BUDGET = 0.9
+
+# timelines of the most recent requests, newest last
+recent_timelines: deque = deque(maxlen=50)
+
+
+class Timeline:
+    """
+    Millisecond offsets of the steps of one request.
+    """
+
+    def __init__(self, prompt: str, request_id: str | None = None):
+        self.started = time.perf_counter()
+        self.entries: list[dict] = []
+        self.summary = {
+            "request_id": request_id,
+            "prompt": prompt[:200],
+            "started_at": time.time(),
+            "entries": self.entries,
+        }
+        recent_timelines.append(self.summary)
+
+    def mark(self, step: str, **fields) -> None:
+        self.entries.append({"t_ms": round((time.perf_counter() - self.started) * 1000, 1), "step": step, **fields})
+
+
+def _supported(schema: dict) -> dict:
+    # the parts of a tool's input schema Gemini accepts, like generate_content()
+    # keeps for the tools of an MCP session
+    schema = {key: value for key, value in schema.items() if key in SCHEMA_FIELDS}
+    if "items" in schema:
+        schema["items"] = _supported(schema["items"])
+    if "any_of" in schema:
+        schema["any_of"] = [_supported(value) for value in schema["any_of"]]
+    if "properties" in schema:
+        schema["properties"] = {name: _supported(value) for name, value in schema["properties"].items()}
+    return schema
+
+
+def gemini_tools(mcp_tools: list) -> list[types.Tool]:
+    """
+    One Gemini tool with a function declaration per MCP tool.
+    """
+    return [
+        types.Tool(function_declarations=[types.FunctionDeclaration(
+            name=tool.name,
+            description=tool.description,
+            parameters=types.Schema.from_json_schema(json_schema=types.JSONSchema(**_supported(tool.inputSchema))),
+        )])
+        for tool in mcp_tools
+    ]
+
+
+async def call_tool(
+    mcp_client: Client, name: str, args: dict, timeout: float, request_id: str | None = None
+) -> dict:
+    """
+    Run one tool call and wrap the result like automatic function calling does.
+
+    The server is told to finish within most of `timeout` (_meta "timeout"), so
+    it can still return what it has before the call is abandoned here.
+    """
+    meta = {"timeout": round(max(timeout, 0) * SERVER_BUDGET, 3)}
+    if request_id:
+        meta["request_id"] = request_id
+    request = mcp_types.ClientRequest(mcp_types.CallToolRequest(
+        method="tools/call",
+        params=mcp_types.CallToolRequestParams(
+            name=name,
+            arguments=args,
+            _meta=meta,
+        ),
+    ))
+    try:
+        result = await asyncio.wait_for(
+            mcp_client.session.send_request(request, mcp_types.CallToolResult), max(timeout, 0)
+        )
+    except asyncio.TimeoutError:
+        return {"error": f"Tool call timed out after {timeout:g}s"}
+    except Exception as e:
+        return {"error": str(e)}
+    content = result.model_dump(mode="json", exclude_none=True)
+    return {"error": content} if result.isError else {"result": content}
+
+
+def _truncated(response: dict) -> bool:
+    # tools mark results they cut short (deadline, response budget) with "truncated"
+    content = response.get("result", {}).get("structuredContent")
+    if not isinstance(content, dict):
+        return False
+    wrapped = content.get("result")
+    return content.get("truncated") is True or (isinstance(wrapped, dict) and wrapped.get("truncated") is True)
+
+
+async def stream_answer(
+    gemini_client: genai.Client,
+    mcp_client: Client,
+    tools: list[types.Tool],
+    prompt: str,
+    model: str = MODEL,
+    cached_content: str | None = None,
+    max_turns: int = MAX_TURNS,
+    deadline: float | None = None,
+    request_id: str | None = None,
+) -> AsyncIterator[dict]:
+    """
+    Answer a prompt, yielding progress events as they happen.
+
+    Args:
+        gemini_client (genai.Client): Client used for the model calls.
+        mcp_client (Client): Connected MCP client used for the tool calls.
+        tools (list[types.Tool]): Function declarations offered to the model.
+        prompt (str): The user's prompt.
+        model (str): Gemini model name.
+        cached_content (str, optional): Name of a context cache holding `tools`; they
+            are sent inline when omitted.
+        max_turns (int): Maximum number of model turns.
+        deadline (float, optional): time.monotonic() value by which the request should end.
+        request_id (str, optional): ID recorded on the timeline and sent with every tool call.
+
+    Yields:
+        dict: {"event": "token", "text"} for model output,
+              {"event": "tool_start", "name", "args"} before a tool call,
+              {"event": "tool_end", "name", "ok", "latency_ms"} after it, and finally
+              {"event": "done", "response", "calls", "failed", "usage", "stopped", "partial", "timeline"}
+              with the full answer, the (name, args) of every tool call, whether any of
+              them failed, the prompt/cached/output token counts summed over all turns,
+              "turn_budget" if the model still wanted tools when the budget ran out,
+              "deadline" if the deadline passed before the next turn (else None),
+              whether the answer is partial (stopped, or built on a tool result
+              marked "truncated"), and the request's timeline.
+    """
+    config = types.GenerateContentConfig(
+        temperature=0,
+        automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True),
+    )
+    if cached_content:
+        config.cached_content = cached_content
+    else:
+        config.tools = tools
+    contents = [types.Content(role="user", parts=[types.Part(text=prompt)])]
+    text, calls, failed, stopped, truncated = [], [], False, None, False
+    usage = {"prompt_tokens": 0, "cached_tokens": 0, "output_tokens": 0}
+    timeline = Timeline(prompt, request_id)
+    turns = 0
+
+    for turn in range(1, max_turns + 1):
+        if deadline is not None and time.monotonic() >= deadline:
+            stopped = "deadline"
+            timeline.mark("deadline_exceeded", turn=turn)
+            break
+        timeline.mark("model_start", turn=turn)
+        turns, started = turn, time.perf_counter()
+        model_parts, function_calls, metadata, chunks = [], [], None, 0
+        async for chunk in await gemini_client.aio.models.generate_content_stream(
+            model=model, contents=contents, config=config
+        ):
+            chunks += 1
+            if chunks == 1:
+                timeline.mark("model_first_chunk", turn=turn)
+            # every chunk repeats the running totals of the turn
+            metadata = chunk.usage_metadata or metadata
+            if not chunk.candidates or not chunk.candidates[0].content:
+                continue
+            for part in chunk.candidates[0].content.parts or []:
+                model_parts.append(part)
+                if part.function_call is not None:
+                    function_calls.append(part.function_call)
+                elif part.text and not part.thought:
+                    text.append(part.text)
+                    yield {"event": "token", "text": part.text}
+        timeline.mark("model_end", turn=turn, function_calls=len(function_calls))
+        metrics.model_latency.observe(time.perf_counter() - started)
+
+        if metadata is not None:
+            turn_usage = {
+                "prompt": metadata.prompt_token_count or 0,
+                "cached": metadata.cached_content_token_count or 0,
+                "output": metadata.candidates_token_count or 0,
+            }
+            for kind, tokens in turn_usage.items():
+                usage[f"{kind}_tokens"] += tokens
+                metrics.model_tokens.inc(tokens, kind=kind)
+
+        if not function_calls:
+            break
+        if turn == max_turns:
+            # the calls would need another turn to be answered
+            stopped = "turn_budget"
+            timeline.mark("turn_budget_exhausted", turn=turn)
+            break
+
+        # independent calls of one turn run concurrently; events are reported
+        # in completion order, responses go back to the model in call order
+        requested = [(call.name, dict(call.args or {})) for call in function_calls]
+        calls.extend(requested)
+
+        async def run(index: int, name: str, args: dict):
+            started = time.perf_counter()
+            timeout = TOOL_TIMEOUTS.get(name, TOOL_TIMEOUT)
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+            response = await call_tool(mcp_client, name, args, timeout, request_id)
+            seconds = time.perf_counter() - started
+            metrics.tool_calls.inc(tool=name, outcome="error" if "error" in response else "ok")
+            metrics.tool_latency.observe(seconds, tool=name)
+            return index, response, round(seconds * 1000, 1)
+
+        for name, args in requested:
+            timeline.mark("tool_start", turn=turn, name=name)
+            yield {"event": "tool_start", "name": name, "args": args}
+        tasks = [asyncio.create_task(run(index, name, args)) for index, (name, args) in enumerate(requested)]
+        responses = [None] * len(tasks)
+        try:
+            for finished in asyncio.as_completed(tasks):
+                index, response, latency_ms = await finished
+                name = requested[index][0]
+                responses[index] = response
+                failed = failed or "error" in response
+                truncated = truncated or _truncated(response)
+                timeline.mark("tool_end", turn=turn, name=name, ok="error" not in response, latency_ms=latency_ms)
+                yield {"event": "tool_end", "name": name, "ok": "error" not in response, "latency_ms": latency_ms}
+        finally:
+            # only does anything when the consumer stopped listening mid-turn
+            for task in tasks:
+                task.cancel()
+
+        contents.append(types.Content(role="model", parts=model_parts))
+        contents.append(types.Content(
+            role="user",
+            parts=[
+                types.Part.from_function_response(name=name, response=response)
+                for (name, _), response in zip(requested, responses)
+            ],
+        ))
+
+    timeline.mark("done")
+    metrics.turns.observe(turns)
+    yield {
+        "event": "done",
+        "response": "".join(text),
+        "calls": calls,
+        "failed": failed,
+        "usage": usage,
+        "stopped": stopped,
+        "partial": stopped is not None or truncated,
+        "timeline": timeline.entries,
+    }
+
+
+async def answer(
+    gemini_client: genai.Client,
+    mcp_client: Client,
+    tools: list[types.Tool],
+    prompt: str,
+    model: str = MODEL,
+    cached_content: str | None = None,
+    deadline: float | None = None,
+    request_id: str | None = None,
+) -> dict:
+    """
+    Run stream_answer() to the end and return its final "done" event.
+    """
+    async for event in stream_answer(
+        gemini_client, mcp_client, tools, prompt, model, cached_content, deadline=deadline, request_id=request_id
+    ):
+        if event["event"] == "done":
+            return event
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Iterable
+
+
+# Answers to repeated prompts ("list my repos", "open PRs in X") are reused
+# instead of asking Gemini and GitHub again. Only runs whose tool calls were
+# all read-only are stored. A run that calls a mutating tool evicts every
+# entry that read the same repository; the TTL covers changes made outside
+# this client. Read-only tools marked idempotentHint=False answer differently
+# from one call to the next (like a background job's status), so runs that
+# call them aren't stored either.
+#
+#   LLM_PROMPT_CACHE_TTL   seconds an answer is reused (0 disables the cache)
+#   LLM_PROMPT_CACHE_SIZE  maximum number of cached answers
+
+TTL = float(os.getenv("LLM_PROMPT_CACHE_TTL", "120"))
+MAX_SIZE = int(os.getenv("LLM_PROMPT_CACHE_SIZE", "512"))
+
+# scope of tool calls that don't name a repository, e.g. list_github_repos
+ACCOUNT = "*"
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Fold case, whitespace and trailing punctuation so trivially different
+    spellings of a prompt share one entry.
+    """
+    return re.sub(r"\s+", " ", prompt).strip().rstrip("?.! ").lower()
+
+
+def repo_scope(args: dict | None) -> str:
+    """
+    Repository a tool call works on, or ACCOUNT when it names none.
+
+    Only the repo name is kept: "owner/name" and a bare "name" (resolved to
+    the authenticated user) must evict each other.
+    """
+    repo_name = (args or {}).get("repo_name")
+    if not repo_name:
+        return ACCOUNT
+    return str(repo_name).rsplit("/", 1)[-1].lower()
+
+
+class PromptCache:
+    """
+    TTL + LRU cache of final answers keyed by normalized prompt, tool scope and tool catalog.
+    """
+
+    def __init__(self, ttl: float = TTL, max_size: int = MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.read_only_tools: set[str] = set()
+        self.volatile_tools: set[str] = set()
+        self.catalog = ""
+        self._entries: OrderedDict[str, tuple[float, set[str], Any]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def set_tools(self, tools: Iterable) -> None:
+        """
+        Record which MCP tools are read-only (readOnlyHint) and which of those
+        answer differently each time (idempotentHint=False) from a list_tools()
+        result. A changed tool catalog starts a fresh cache.
+        """
+        tools = list(tools)
+        self.read_only_tools = {
+            tool.name for tool in tools
+            if tool.annotations is not None and tool.annotations.readOnlyHint
+        }
+        self.volatile_tools = {
+            tool.name for tool in tools
+            if tool.name in self.read_only_tools and tool.annotations.idempotentHint is False
+        }
+        catalog = hashlib.sha256(
+            "\n".join(sorted(
+                f"{tool.name}:{tool.name in self.read_only_tools}:{tool.name in self.volatile_tools}" for tool in tools
+            )).encode()
+        ).hexdigest()
+        if catalog != self.catalog:
+            self.catalog = catalog
+            self._entries.clear()
+
+    def key(self, prompt: str, scope: str = "") -> str:
+        return hashlib.sha256(f"{self.catalog}\n{scope}\n{normalize_prompt(prompt)}".encode()).hexdigest()
+
+    def get(self, prompt: str, scope: str = "") -> Any | None:
+        """
+        Cached answer for a prompt, or None.
+
+        Args:
+            prompt (str): The prompt as sent by the user.
+            scope (str): Anything besides the prompt that selects the offered tools, e.g. a tool category.
+        """
+        if not self.enabled:
+            return None
+        key = self.key(prompt, scope)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+        if entry is not None:
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def record(
+        self,
+        prompt: str,
+        calls: list[tuple[str, dict]],
+        answer: Any,
+        cacheable: bool = True,
+        scope: str = "",
+    ) -> None:
+        """
+        Store the answer of a run if all of its tool calls were read-only, and
+        evict whatever its mutating calls may have changed.
+
+        Args:
+            prompt (str): The prompt as sent by the user.
+            calls (list): (tool name, arguments) of every call made by the run.
+            answer: Value returned for the prompt.
+            cacheable (bool): False to only apply the evictions, e.g. when a tool call failed.
+            scope (str): Same as for get().
+        """
+        mutated = {repo_scope(args) for name, args in calls if name not in self.read_only_tools}
+        if mutated:
+            self.evict(mutated)
+        elif cacheable and self.enabled and not any(name in self.volatile_tools for name, _ in calls):
+            key = self.key(prompt, scope)
+            self._entries[key] = (time.monotonic() + self.ttl, {repo_scope(args) for _, args in calls}, answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, repos: set[str]) -> None:
+        """
+        Drop entries that read any of the given repositories.
+
+        Creating, deleting or changing any repository can change account-wide
+        answers (like the repo list), so those are dropped as well; a mutation
+        without a repository drops everything.
+        """
+        if ACCOUNT in repos:
+            stale = list(self._entries)
+        else:
+            stale = [key for key, (_, scopes, _) in self._entries.items() if scopes & (repos | {ACCOUNT})]
+        for key in stale:
+            del self._entries[key]
+        self.evictions += len(stale)
+
+    def clear(self) -> None:
+        self.evictions += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+        }
+
+
+prompt_cache = PromptCache()
@@ -0,0 +1,125 @@
+import json
+import re
+from google.genai import types
+from github_tools.settings import tokens_for_bytes
+
+
+# Tool routing for the LLM client.
+#
+# Sending the schemas of every mounted server with every prompt costs prompt
+# tokens and model latency. The MCP server publishes which tools belong to
+# which server (the resource below); a request then only carries the tools of
+# the category the user picked, or of the categories a keyword classifier
+# finds in the prompt. When nothing matches, all tools are sent as before.
+# Counting and ranking questions ("how many open issues", "which repo has the
+# most stars") always include the analysis tools, which hold the counts, next
+# to the categories the prompt names.
+
+CATEGORIES_RESOURCE = "resource://tool-categories"
+
+# keyword patterns of the local classifier, one per mounted server
+KEYWORDS = {
+    "repos": re.compile(
+        r"\brepos\b|\brepositories\b|\b(create|delete|remove|new|make|list)\b[\w\s'\"./-]{0,40}\brepo(sitory)?\b"
+    ),
+    "issues": re.compile(r"\bissues?\b|\bbugs?\b|\btickets?\b"),
+    "pull_requests": re.compile(r"\bpull requests?\b|\bprs?\b|\bmerged?\b|\breview comments?\b"),
+    "branches": re.compile(r"\bbranch(es)?\b"),
+    "analysis": re.compile(
+        r"\bcontributors?\b|\bmetrics?\b|\bstats?\b|\bstatistics\b|\bstars?\b|\bforks?\b|\bwatchers\b"
+        r"|\bactivity\b|\banaly[sz]\w*|\bcommits?\b|\bsummar\w*"
+    ),
+    "jobs": re.compile(r"\bjobs?\b|\bbackground\b|\bprogress\b|\bstill running\b"),
+}
+
+# counting or ranking words: answered by get_repo_key_metrics, compare_repos_key_metrics, ...
+RANKING = re.compile(
+    r"\bhow (many|much)\b|\bnumber of\b|\bcount(s|ing)?\b|\bmost\b|\bleast\b|\bfewest\b|\btop\b"
+    r"|\brank\w*|\bcompar\w*|\bbusiest\b|\bbiggest\b|\blargest\b|\bpopular\b"
+)
+
+
+def classify(prompt: str) -> list[str]:
+    """
+    Categories whose keywords appear in the prompt, in KEYWORDS order; a
+    counting or ranking question also gets "analysis".
+    """
+    text = prompt.lower()
+    ranking = RANKING.search(text) is not None
+    return [
+        category for category, pattern in KEYWORDS.items()
+        if pattern.search(text) or (ranking and category == "analysis")
+    ]
+
+
+def estimate_tokens(tool: types.Tool) -> int:
+    return tokens_for_bytes(len(json.dumps(tool.model_dump(mode="json", exclude_none=True))))
+
+
+class ToolRouter:
+    """
+    Picks the function declarations to send with a prompt.
+    """
+
+    def __init__(self):
+        self.tools: dict[str, types.Tool] = {}
+        self.tokens: dict[str, int] = {}
+        self.categories: dict[str, list[str]] = {}
+        self.requests = 0
+        self.tokens_saved = 0
+
+    def set_tools(self, tools: list[types.Tool], categories: dict[str, list[str]]) -> None:
+        """
+        Args:
+            tools (list[types.Tool]): One declaration per MCP tool.
+            categories (dict): Tool names per category; empty disables routing.
+        """
+        self.tools = {tool.function_declarations[0].name: tool for tool in tools}
+        self.tokens = {name: estimate_tokens(tool) for name, tool in self.tools.items()}
+        self.categories = categories
+
+    def select(self, prompt: str, category: str | None = None) -> tuple[list[types.Tool], dict]:
+        """
+        Declarations for a prompt plus a report of the routing decision.
+
+        Args:
+            prompt (str): The user's prompt.
+            category (str, optional): Category chosen by the user; classified from the prompt when omitted.
+
+        Returns:
+            tuple: (declarations, {"categories", "classified", "tools", "tool_tokens", "tokens_saved"})
+
+        Raises:
+            ValueError: If the category is unknown.
+        """
+        if category is not None and category not in self.categories:
+            raise ValueError(f"Unknown tool category '{category}'; expected one of {sorted(self.categories)}")
+
+        chosen = [category] if category is not None else classify(prompt)
+        chosen = [name for name in chosen if name in self.categories]
+        if chosen:
+            names = {tool for name in chosen for tool in self.categories[name]} & set(self.tools)
+        else:
+            names = set(self.tools)
+
+        total = sum(self.tokens.values())
+        tool_tokens = sum(self.tokens[name] for name in names)
+        self.requests += 1
+        self.tokens_saved += total - tool_tokens
+        return [self.tools[name] for name in sorted(names)], {
+            "categories": chosen or sorted(self.categories),
+            "classified": category is None,
+            "tools": len(names),
+            "tool_tokens": tool_tokens,
+            "tokens_saved": total - tool_tokens,
+        }
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "tokens_saved": self.tokens_saved,
+            "categories": {name: len(tools) for name, tools in self.categories.items()},
+        }
+
+
+router = ToolRouter()
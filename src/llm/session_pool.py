@@ -0,0 +1,129 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from fastmcp import Client
+
+
+# Pool of MCP client sessions for the LLM client.
+#
+# Each request leases its own session for the duration of its tool calls, so
+# concurrent requests don't queue behind one connection. Sessions that have
+# been idle for a while, or whose last lease ended in an error, are pinged
+# before they are handed out and reconnected if the ping fails; a dropped
+# server therefore only costs the requests that were in flight.
+#
+#   MCP_SERVER_URL            MCP endpoint of the tool server
+#   LLM_MCP_POOL_SIZE         number of MCP sessions
+#   LLM_MCP_HEALTH_INTERVAL   idle seconds after which a session is pinged before use
+
+SERVER_URL = os.getenv("MCP_SERVER_URL", "http://localhost:9000/mcp/")
+POOL_SIZE = int(os.getenv("LLM_MCP_POOL_SIZE", "4"))
+HEALTH_INTERVAL = float(os.getenv("LLM_MCP_HEALTH_INTERVAL", "30"))
+PING_TIMEOUT = 5.0
+
+
+class _Slot:
+    def __init__(self):
+        self.client: Client | None = None
+        self.checked = 0.0
+        self.suspect = False
+
+
+class MCPSessionPool:
+    """
+    Fixed-size pool of connected MCP clients, leased one per request.
+    """
+
+    def __init__(self, transport=SERVER_URL, size: int = POOL_SIZE, health_interval: float = HEALTH_INTERVAL):
+        self.template = Client(transport)
+        self.size = max(1, size)
+        self.health_interval = health_interval
+        self.connects = 0
+        self.failed_checks = 0
+        self.leases = 0
+        self.in_use = 0
+        self.wait_seconds = 0.0
+        self._slots: list[_Slot] = []
+        self._idle: asyncio.Queue | None = None
+
+    async def start(self) -> None:
+        """
+        Create the slots and connect them. A session that can't connect yet is
+        retried when it is first leased, so the pool may start before the server.
+        """
+        self._slots = [_Slot() for _ in range(self.size)]
+        self._idle = asyncio.Queue()
+        for slot in self._slots:
+            self._idle.put_nowait(slot)
+        await asyncio.gather(*(self._connect(slot) for slot in self._slots), return_exceptions=True)
+
+    async def close(self) -> None:
+        await asyncio.gather(*(self._disconnect(slot) for slot in self._slots), return_exceptions=True)
+
+    async def _connect(self, slot: _Slot) -> None:
+        await self._disconnect(slot)
+        client = self.template.new()
+        await client.__aenter__()
+        slot.client = client
+        slot.checked = time.monotonic()
+        slot.suspect = False
+        self.connects += 1
+
+    async def _disconnect(self, slot: _Slot) -> None:
+        client, slot.client = slot.client, None
+        if client is not None:
+            try:
+                await client.close()
+            except Exception:
+                pass
+
+    async def _ensure_healthy(self, slot: _Slot) -> None:
+        if slot.client is None or not slot.client.is_connected():
+            await self._connect(slot)
+            return
+        if slot.suspect or time.monotonic() - slot.checked > self.health_interval:
+            try:
+                await asyncio.wait_for(slot.client.ping(), PING_TIMEOUT)
+                slot.checked = time.monotonic()
+                slot.suspect = False
+            except Exception:
+                self.failed_checks += 1
+                await self._connect(slot)
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[Client]:
+        """
+        Borrow a healthy, connected client for the duration of the block.
+        """
+        if self._idle is None:
+            raise RuntimeError("MCP session pool is not started")
+
+        started = time.monotonic()
+        slot = await self._idle.get()
+        self.wait_seconds += time.monotonic() - started
+        self.in_use += 1
+        try:
+            await self._ensure_healthy(slot)
+            self.leases += 1
+            yield slot.client
+            slot.checked = time.monotonic()
+        except BaseException:
+            # the error may or may not be the session's fault; check it before reuse
+            slot.suspect = True
+            raise
+        finally:
+            self.in_use -= 1
+            self._idle.put_nowait(slot)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "in_use": self.in_use,
+            "connected": sum(1 for slot in self._slots if slot.client is not None and slot.client.is_connected()),
+            "leases": self.leases,
+            "connects": self.connects,
+            "failed_health_checks": self.failed_checks,
+            "wait_seconds": round(self.wait_seconds, 3),
+        }
@@ -1,5 +1,7 @@
 import asyncio
 from fastmcp import FastMCP, Client
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
 
 # Importing all the MCP servers
 from github_tools.repo_management import mcp_management
@@ -7,6 +9,10 @@ from github_tools.issue_tracking import mcp_issue_tracking
 from github_tools.pull_request import mcp_pull_request
 from github_tools.branch_management import mcp_branch
 from github_tools.github_analysis import mcp_analysis
+from github_tools.job_management import mcp_jobs
+from github_tools.instrumentation import ToolMetrics, recent_calls
+from github_tools.metrics import CONTENT_TYPE, registry
+from github_tools.webhooks import receive
 
 
 # Creating the main MCP server
@@ -16,6 +22,7 @@ main_mcp = FastMCP("github-mcp-server",
               2- tracking issues
               3- managing branches
               4- performing analytics
+              5- following background jobs
               """)
 
 # Mounting each sub-server with a prefix
@@ -24,6 +31,47 @@ main_mcp.mount(mcp_issue_tracking)
 main_mcp.mount(mcp_pull_request)
 main_mcp.mount(mcp_branch)
 main_mcp.mount(mcp_analysis)
+main_mcp.mount(mcp_jobs)
+
+# Latency, GitHub request counts and response sizes of every tool call
+main_mcp.add_middleware(ToolMetrics())
+
+# Which mounted server each tool comes from, so clients can offer a model
+# only the tools relevant to a prompt
+TOOL_CATEGORIES = {
+    "repos": mcp_management,
+    "issues": mcp_issue_tracking,
+    "pull_requests": mcp_pull_request,
+    "branches": mcp_branch,
+    "analysis": mcp_analysis,
+    "jobs": mcp_jobs,
+}
+
+@main_mcp.resource("resource://tool-categories", mime_type="application/json")
+async def tool_categories() -> dict:
+    """Names of the tools of each category (mounted server)."""
+    return {category: sorted(await server.get_tools()) for category, server in TOOL_CATEGORIES.items()}
+
+@main_mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> PlainTextResponse:
+    """Prometheus metrics of the tool server."""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+@main_mcp.custom_route("/debug/tool-calls", methods=["GET"])
+async def tool_calls(request: Request) -> JSONResponse:
+    """Most recent tool calls (newest first), optionally only those of one request_id."""
+    request_id = request.query_params.get("request_id")
+    limit = int(request.query_params.get("limit", "20"))
+    calls = [call for call in reversed(recent_calls) if request_id is None or call["request_id"] == request_id]
+    return JSONResponse(calls[:limit])
+
+@main_mcp.custom_route("/webhooks/github", methods=["POST"])
+async def github_webhook(request: Request) -> JSONResponse:
+    """GitHub webhook deliveries, applied to the in-process caches and the activity index."""
+    body = await request.body()
+    # the activity index is SQLite, so apply off the event loop
+    status, result = await asyncio.to_thread(receive, request.headers, body)
+    return JSONResponse(result, status_code=status)
 
 #Optional: to test function to verify mounted tools
 async def list_all_tools():
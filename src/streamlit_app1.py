@@ -1,14 +1,21 @@
+import json
 import streamlit as st
 import requests
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional, Tuple
 
 st.set_page_config(page_title="GitHub AI Assistant", layout="centered")
 
 FASTAPI_URL = "http://localhost:8000"
 ASK_ENDPOINT = f"{FASTAPI_URL}/ask"
+STREAM_ENDPOINT = f"{FASTAPI_URL}/ask/stream"
+JOBS_ENDPOINT = f"{FASTAPI_URL}/jobs"
+# seconds the app waits for an answer; the server is told to finish a little earlier
+ASK_TIMEOUT = 15
+STREAM_TIMEOUT = 120
 
 TOOL_GUIDE = {
     "Repository Management": {
+        "category": "repos",
         "description": "Manage your GitHub repositories.",
         "requirements": [
             "Action (create/delete/list)",
@@ -16,23 +23,26 @@ TOOL_GUIDE = {
         ]
     },
     "Issue Tracking": {
+        "category": "issues",
         "description": "Work with GitHub issues.",
         "requirements": [
             "Action (create/get/close/close all)",
             "Repository name",
-            "Issue title/body/number depending on the action"
+            "Issue title/body/number (or a list or range of numbers for getting several) depending on the action"
         ]
     },
     "Pull Request Management": {
+        "category": "pull_requests",
         "description": "Handle pull requests.",
         "requirements": [
             "Action (create/get/list/recently updated prs/list comments on pr/close)",
             "Repository name",
             "Base and head branches (for creating PRs)",
-            "PR number (for closing or getting details)"
+            "PR number (for closing or getting details; a list or range of numbers for details of several)"
         ]
     },
     "Branch Management": {
+        "category": "branches",
         "description": "Work with branches in a repository.",
         "requirements": [
             "Action (list/get default)",
@@ -40,21 +50,31 @@ TOOL_GUIDE = {
         ]
     },
     "GitHub Analysis": {
+        "category": "analysis",
         "description": "Analyze repository performance and activity.",
         "requirements": [
-            "Repository name",
+            "Repository name (or none, to compare all your repositories)",
             "Timeframe (for top contributors)",
             "Metrics of interest (commits, issues, PRs)"
         ]
+    },
+    "Background Jobs": {
+        "category": "jobs",
+        "description": "Follow long-running tasks (closing all issues/PRs, contributor stats over long timeframes) started in the background.",
+        "requirements": [
+            "Job ID (returned when the task was started)",
+            "Whether you want its status or its result"
+        ]
     }
 }
 
-def send_message_to_api(prompt: str) -> Dict[str, Any]:
+def send_message_to_api(prompt: str, category: Optional[str] = None) -> Dict[str, Any]:
     try:
         response = requests.post(
             ASK_ENDPOINT,
-            json={"prompt": prompt},
-            timeout=15
+            json={"prompt": prompt, "category": category},
+            headers={"X-Request-Timeout": str(ASK_TIMEOUT - 1)},
+            timeout=ASK_TIMEOUT
         )
         response.raise_for_status()
         return response.json()
@@ -69,6 +89,101 @@ def send_message_to_api(prompt: str) -> Dict[str, Any]:
     except Exception as e:
         return {"error": f"⚠️ Unexpected error: {str(e)}"}
 
+def stream_message_from_api(prompt: str, category: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Yield (event, data) pairs from the server-sent events of /ask/stream.
+    Connection problems are reported as a final "error" event.
+    """
+    try:
+        # connect quickly, but allow long gaps while a slow tool runs
+        with requests.post(
+            STREAM_ENDPOINT,
+            json={"prompt": prompt, "category": category},
+            headers={"X-Request-Timeout": str(STREAM_TIMEOUT - 1)},
+            stream=True,
+            timeout=(5, STREAM_TIMEOUT),
+        ) as response:
+            response.raise_for_status()
+            event = "message"
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    yield event, json.loads(line[len("data:"):])
+                    event = "message"
+    except requests.exceptions.Timeout:
+        yield "error", {"detail": "⏱️ Request timed out. Please try again."}
+    except requests.exceptions.ConnectionError:
+        yield "error", {"detail": "🔌 Could not connect to the server."}
+    except requests.exceptions.HTTPError as e:
+        yield "error", {"detail": f"❌ HTTP error: {e.response.text}"}
+    except Exception as e:
+        yield "error", {"detail": f"⚠️ Unexpected error: {str(e)}"}
+
+def fetch_job(job_id: str) -> Dict[str, Any]:
+    try:
+        response = requests.get(f"{JOBS_ENDPOINT}/{job_id}/result", timeout=10)
+        if response.status_code == 404:
+            return {"error": f"🔍 {response.json().get('detail', 'Unknown job')}"}
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.ConnectionError:
+        return {"error": "🔌 Could not connect to the server."}
+    except Exception as e:
+        return {"error": f"⚠️ Unexpected error: {str(e)}"}
+
+def render_job(job_id: str) -> None:
+    job = fetch_job(job_id.strip())
+    if "error" in job:
+        st.error(job["error"])
+        return
+    progress = job["progress"]
+    if job["status"] in ("queued", "running"):
+        st.info(f"⏳ `{job['tool']}` is {job['status']} ({job['elapsed_seconds']:.0f}s)")
+        if progress["total"]:
+            st.progress(min(progress["done"] / progress["total"], 1.0), text=progress["message"])
+        else:
+            st.caption(f"{progress['done']} items processed. {progress['message'] or ''}")
+    elif job["status"] == "succeeded":
+        st.success(f"✅ `{job['tool']}` finished in {job['elapsed_seconds']:.0f}s")
+        st.json(job["result"])
+    else:
+        st.error(f"❌ `{job['tool']}` {job['status']}: {job['error']}")
+
+def routing_caption(routing: Dict[str, Any]) -> str:
+    return (
+        f"🧭 Offered {routing['tools']} tools ({', '.join(routing['categories'])}), "
+        f"~{routing['tokens_saved']:,} prompt tokens saved"
+    )
+
+def render_stream(prompt: str, category: Optional[str] = None) -> None:
+    status = st.status("Thinking...", expanded=False)
+    answer = st.empty()
+    text = ""
+    for event, data in stream_message_from_api(prompt, category):
+        if event == "routing":
+            status.write(routing_caption(data))
+        elif event == "token":
+            text += data["text"]
+            answer.markdown(text)
+        elif event == "tool_start":
+            status.update(label=f"🔧 Running `{data['name']}`...")
+            status.write(f"🔧 `{data['name']}` started")
+        elif event == "tool_end":
+            icon = "✅" if data["ok"] else "❌"
+            status.write(f"{icon} `{data['name']}` finished in {data['latency_ms']:.0f} ms")
+        elif event == "done":
+            label = "✅ Response (cached)" if data.get("cached") else "✅ Response"
+            if data.get("stopped") == "deadline":
+                label = "⏱️ Partial response (out of time)"
+            elif data.get("partial"):
+                label = "⚠️ Partial response (some results were cut short)"
+            status.update(label=label, state="complete")
+            answer.markdown(data["response"] or text)
+        elif event == "error":
+            status.update(label="Failed", state="error")
+            st.error(data["detail"])
+
 def main():
     st.markdown("<h1 style='text-align: center;'>🚀 GitHub AI Assistant</h1>", unsafe_allow_html=True)
     st.markdown("<p style='text-align: center;'>Choose a tool and get prompt suggestions tailored for it</p>", unsafe_allow_html=True)
@@ -88,18 +203,35 @@ def main():
     st.subheader("💬 Your Prompt")
     user_input = st.text_area("Write your command:", height=150, placeholder="e.g., Create a new repo called 'test-ai-repo'")
 
+    stream = st.toggle("Stream the response", value=True)
+    # the guide above is informational; the LLM client picks the tools from the
+    # prompt unless the user asks to limit them to the selected category
+    limit_tools = st.checkbox(f"Only offer the model the tools of \"{selected_tool}\"", value=False)
+    category = TOOL_GUIDE.get(selected_tool, {}).get("category") if limit_tools else None
+
     if st.button("🚀 Run"):
         if not user_input.strip():
             st.warning("Please enter a prompt.")
+        elif stream:
+            render_stream(user_input, category)
         else:
             with st.spinner("Thinking..."):
-                result = send_message_to_api(user_input)
+                result = send_message_to_api(user_input, category)
 
             if "error" in result:
                 st.error(result["error"])
             else:
                 st.success("✅ Response:")
                 st.write(result["response"])
+                if result.get("routing"):
+                    st.caption(routing_caption(result["routing"]))
+
+    st.markdown("---")
+    st.subheader("⏳ Background Jobs")
+    # polled straight from the tool server, without asking the model
+    job_id = st.text_input("Job ID:", placeholder="e.g., 3f2a9c1d7b4e")
+    if st.button("🔄 Check job") and job_id.strip():
+        render_job(job_id)
 
 if __name__ == "__main__":
     main()
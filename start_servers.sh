@@ -1,8 +1,12 @@
 #!/bin/bash
 
-echo "Starting main.py server..."
-python src/main.py &
-MAIN_PID=$!
+# LLM_MCP_TRANSPORT=memory runs the tool server inside the LLM client process,
+# so main.py isn't started separately.
+if [ "${LLM_MCP_TRANSPORT:-http}" = "http" ]; then
+    echo "Starting main.py server..."
+    python src/main.py &
+    MAIN_PID=$!
+fi
 
 echo "Starting LLM_client with uvicorn..."
 uvicorn src.LLM_client:app --host 0.0.0.0 --port 8000 &
@@ -13,7 +17,7 @@ streamlit run src/streamlit_app1.py &
 STREAMLIT_PID=$!
 
 echo "All servers started:"
-echo "main.py PID: $MAIN_PID"
+[ -n "$MAIN_PID" ] && echo "main.py PID: $MAIN_PID"
 echo "uvicorn PID: $UVICORN_PID"
 echo "streamlit PID: $STREAMLIT_PID"
 
@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# read at import by the github_tools modules: keep the tests' caches away from ~/.cache
+os.environ.setdefault("GITHUB_MCP_CACHE_DIR", tempfile.mkdtemp(prefix="github-mcp-tests-"))
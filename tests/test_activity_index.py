@@ -0,0 +1,88 @@
+import sqlite3
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from github_tools import activity_index as activity_index_module
+from github_tools.activity_index import ActivityIndex
+
+
+def commit(sha: str, author: str, day: int):
+    date = datetime(2025, 1, day, tzinfo=timezone.utc)
+    return SimpleNamespace(
+        sha=sha, author=SimpleNamespace(login=author), commit=SimpleNamespace(committer=SimpleNamespace(date=date))
+    )
+
+
+class FakeRepo:
+    """
+    A repository whose default branch gets commits over time; like GitHub,
+    get_commits(since=...) filters by committer date.
+    """
+
+    full_name = "owner/repo"
+
+    def __init__(self):
+        self.commits = []
+        self.calls = []
+
+    def get_commits(self, since):
+        self.calls.append("commits")
+        return [c for c in self.commits if c.commit.committer.date >= since]
+
+    def get_issues(self, **kwargs):
+        self.calls.append("issues")
+        return []
+
+
+def test_backdated_commit_landing_after_a_sync_is_indexed(tmp_path, monkeypatch):
+    monkeypatch.setattr(activity_index_module, "SYNC_INTERVAL", 0)
+    index = ActivityIndex(str(tmp_path / "activity_index.sqlite3"))
+    repo = FakeRepo()
+    start, end = datetime(2025, 1, 1, tzinfo=timezone.utc), datetime(2025, 1, 31, tzinfo=timezone.utc)
+
+    repo.commits = [commit("a", "alice", 10), commit("b", "bob", 20)]
+    assert index.sync(repo, start)
+
+    # a branch merged later brings a commit dated before the cursor (Jan 20)
+    repo.commits.append(commit("c", "carol", 15))
+    assert index.sync(repo, start)
+
+    assert index.summary("owner/repo", start, end)["commits"] == 3
+    assert index.contributors("owner/repo", start, end)["carol"]["commits"] == 1
+
+
+def test_webhooks_keep_only_their_own_stream_fresh(tmp_path, monkeypatch):
+    monkeypatch.setattr(activity_index_module, "SYNC_INTERVAL", 0)
+    index = ActivityIndex(str(tmp_path / "activity_index.sqlite3"))
+    repo = FakeRepo()
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    assert index.sync(repo, start)
+
+    # a push delivery keeps commits fresh, issues/PRs are still polled
+    index.apply_commits("owner/repo", [("a", "alice", datetime(2025, 1, 10, tzinfo=timezone.utc))])
+    repo.calls.clear()
+    assert index.sync(repo, start)
+    assert repo.calls == ["issues"]
+
+    # and an issues delivery the other way round
+    index.drop_repo("owner/repo")
+    assert index.sync(repo, start)
+    index.apply_item("owner/repo", 1, "issue", "bob", "open", start, start)
+    repo.calls.clear()
+    assert index.sync(repo, start)
+    assert repo.calls == ["commits"]
+
+
+def test_index_with_a_single_synced_at_is_migrated(tmp_path):
+    path = str(tmp_path / "activity_index.sqlite3")
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE sync_state (repo TEXT PRIMARY KEY, covered_from TEXT NOT NULL, "
+        "commits_cursor TEXT NOT NULL, items_cursor TEXT NOT NULL, synced_at REAL NOT NULL)"
+    )
+    db.execute("INSERT INTO sync_state VALUES ('owner/repo', 'a', 'b', 'c', 1.5)")
+    db.commit()
+    db.close()
+
+    index = ActivityIndex(path)
+    assert index._state("owner/repo") == ("a", "b", "c", 1.5, 0.0)
@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+
+import pytest
+from github.GithubException import GithubException, RateLimitExceededException
+
+from github_tools import bulk
+
+
+class Action:
+    """
+    Fails with the given errors, in order, then succeeds.
+    """
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self, item):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+
+
+@pytest.fixture(autouse=True)
+def no_waiting(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(bulk, "pacer", bulk.WritePacer(0))
+    monkeypatch.setattr(bulk.time, "sleep", sleeps.append)
+    return sleeps
+
+
+def test_client_errors_are_not_retried():
+    action = Action(GithubException(422, {"message": "Validation Failed"}))
+
+    with pytest.raises(GithubException):
+        bulk._apply(object(), action)
+    assert action.calls == 1
+
+
+def test_server_errors_are_retried_with_backoff(no_waiting):
+    action = Action(GithubException(502), GithubException(503))
+
+    bulk._apply(object(), action)
+
+    assert action.calls == 3
+    assert no_waiting == [1, 2]
+
+
+def test_secondary_rate_limit_waits_for_retry_after():
+    action = Action(GithubException(403, {"message": "secondary rate limit"}, {"Retry-After": "7"}))
+
+    bulk._apply(object(), action)
+
+    assert action.calls == 2
+    assert bulk.pacer.interval > 0
+
+
+def test_rate_limit_classification():
+    assert bulk._retry_after(GithubException(429, None, {"retry-after": "3"})) == 3.0
+    assert bulk._retry_after(RateLimitExceededException(403, None, {})) == bulk.DEFAULT_RETRY_AFTER
+    assert bulk._retry_after(GithubException(403, None, {})) is None
+    assert bulk._retry_after(GithubException(404, None, None)) is None
+
+
+def test_gives_up_after_max_attempts():
+    action = Action(*[GithubException(500)] * bulk.MAX_ATTEMPTS)
+
+    with pytest.raises(GithubException):
+        bulk._apply(object(), action)
+    assert action.calls == bulk.MAX_ATTEMPTS
+
+
+def test_summary_counts():
+    items = [SimpleNamespace(number=n, pr=n % 5 == 0) for n in range(1, 21)]
+    closed = []
+
+    def close(item):
+        if item.number == 7:
+            raise GithubException(404, {"message": "Not Found"})
+        closed.append(item.number)
+
+    summary = bulk.run_bulk(items, close, skip=lambda item: item.pr, outcome="closed")
+
+    assert summary["closed"] == 15
+    assert summary["skipped"] == 4
+    assert [entry["id"] for entry in summary["failed"]] == [7]
+    assert sorted(closed) == [n for n in range(1, 21) if n % 5 and n != 7]
+    assert "truncated" not in summary
+
+
+def test_dry_run_mutates_nothing():
+    items = [SimpleNamespace(number=n) for n in range(1, 4)]
+    action = Action()
+
+    summary = bulk.run_bulk(items, action, skip=lambda item: item.number == 2, dry_run=True, outcome="closed")
+
+    assert summary["would_be_closed"] == 2 and summary["skipped"] == 1
+    assert action.calls == 0
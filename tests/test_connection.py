@@ -0,0 +1,113 @@
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from github_tools import connection
+from github_tools.connection import PooledHTTPSConnection
+from github_tools.http_cache import HttpCache
+
+TOKEN = {"Authorization": "token one", "Accept": "application/vnd.github+json"}
+
+
+def response(status: int, headers: dict, body: str = "") -> requests.Response:
+    r = requests.Response()
+    r.status_code = status
+    r.headers = CaseInsensitiveDict(headers)
+    r._content = body.encode()
+    r.encoding = "utf-8"
+    return r
+
+
+class FakeSession:
+    """
+    Answers GETs from a queue of responses and records the headers sent.
+    """
+
+    def __init__(self, *responses: requests.Response):
+        self.responses = list(responses)
+        self.sent = []
+
+    def get(self, url, headers, **kwargs):
+        self.sent.append(dict(headers))
+        return self.responses.pop(0)
+
+    post = get
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = HttpCache(str(tmp_path / "http_cache.sqlite3"))
+    monkeypatch.setattr(connection, "http_cache", cache)
+    return cache
+
+
+def fetch(session: FakeSession, verb: str = "GET", url: str = "/repos/o/r", headers: dict = TOKEN):
+    conn = PooledHTTPSConnection("api.github.com")
+    conn.session = session
+    conn.request(verb, url, None, dict(headers))
+    return conn.getresponse()
+
+
+def test_not_modified_is_served_from_the_stored_etag(cache):
+    session = FakeSession(
+        response(200, {"ETag": '"v1"', "X-RateLimit-Remaining": "4999", "X-RateLimit-Limit": "5000"}, '{"id": 1}'),
+        response(304, {"ETag": '"v1"', "X-RateLimit-Remaining": "4998", "X-RateLimit-Limit": "5000"}),
+    )
+
+    first = fetch(session)
+    second = fetch(session)
+
+    assert "If-None-Match" not in session.sent[0]
+    assert session.sent[1]["If-None-Match"] == '"v1"'
+    assert (first.status, first.read()) == (200, '{"id": 1}')
+    # PyGithub sees the stored 200, with the 304's rate-limit headers
+    assert (second.status, second.read()) == (200, '{"id": 1}')
+    assert second.headers["x-ratelimit-remaining"] == "4998"
+    assert (cache.hits, cache.misses, cache.stores) == (1, 1, 1)
+    assert cache.bytes_saved == len('{"id": 1}')
+
+
+def test_last_modified_is_replayed_without_an_etag(cache):
+    modified = "Sat, 02 Nov 2024 09:00:00 GMT"
+    session = FakeSession(response(200, {"Last-Modified": modified}, "[]"), response(304, {}))
+
+    fetch(session)
+    assert fetch(session).read() == "[]"
+    assert session.sent[1]["If-Modified-Since"] == modified
+
+
+def test_changed_response_replaces_the_stored_one(cache):
+    session = FakeSession(
+        response(200, {"ETag": '"v1"'}, "old"),
+        response(200, {"ETag": '"v2"'}, "new"),
+        response(304, {}),
+    )
+
+    fetch(session)
+    assert fetch(session).read() == "new"
+    assert fetch(session).read() == "new"
+    assert session.sent[2]["If-None-Match"] == '"v2"'
+
+
+def test_responses_are_stored_per_token(cache):
+    session = FakeSession(response(200, {"ETag": '"v1"'}, "one"), response(200, {"ETag": '"v1"'}, "two"))
+
+    fetch(session)
+    fetch(session, headers={**TOKEN, "Authorization": "token two"})
+
+    assert "If-None-Match" not in session.sent[1]
+
+
+def test_only_validated_gets_are_cached(cache):
+    session = FakeSession(
+        response(200, {}, "no validators"),
+        response(201, {"ETag": '"v1"'}, "created"),
+        response(200, {}, "again"),
+    )
+
+    fetch(session)
+    fetch(session, verb="POST")
+    assert fetch(session).read() == "again"
+
+    assert all("If-None-Match" not in sent for sent in session.sent)
+    assert cache.stats()["entries"] == 0
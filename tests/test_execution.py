@@ -0,0 +1,36 @@
+import asyncio
+import threading
+import time
+
+from github_tools.execution import offloaded
+from github_tools.jobs import FINISHED, SUCCEEDED, jobs
+
+running, peak = [0], [0]
+lock = threading.Lock()
+
+
+@offloaded(limit=1)
+def exclusive_tool(repo_name: str, background: bool = False) -> dict:
+    with lock:
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+    time.sleep(0.2)
+    with lock:
+        running[0] -= 1
+    return {"repo_name": repo_name}
+
+
+def test_background_jobs_respect_the_tool_limit():
+    async def start_and_wait():
+        started = [await exclusive_tool(repo_name="owner/repo", background=True) for _ in range(2)]
+        # a direct call takes the same slot as the jobs
+        direct = await exclusive_tool(repo_name="owner/repo")
+        while not all(jobs.get(job["job_id"]).status in FINISHED for job in started):
+            await asyncio.sleep(0.05)
+        return started, direct
+
+    started, direct = asyncio.run(start_and_wait())
+
+    assert direct == {"repo_name": "owner/repo"}
+    assert [jobs.get(job["job_id"]).status for job in started] == [SUCCEEDED, SUCCEEDED]
+    assert peak[0] == 1
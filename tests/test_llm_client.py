@@ -0,0 +1,91 @@
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import Response
+
+import src.LLM_client as llm_client
+from src.llm.prompt_cache import prompt_cache
+
+
+def run_result(**overrides) -> dict:
+    result = {
+        "response": "alice: 12 commits",
+        "calls": [("top_contributors", {"repo_name": "owner/repo"})],
+        "failed": False,
+        "usage": {},
+        "stopped": None,
+        "partial": False,
+        "timeline": [],
+    }
+    result.update(overrides)
+    return result
+
+
+@pytest.fixture
+def ask(monkeypatch):
+    """
+    Calls /ask with the model run replaced by a canned result.
+    """
+    async def route(payload):
+        return [], {}, None
+
+    @asynccontextmanager
+    async def lease():
+        yield None
+
+    monkeypatch.setattr(llm_client, "route", route)
+    monkeypatch.setattr(llm_client.mcp_pool, "lease", lease)
+    monkeypatch.setattr(llm_client, "gemini_client", object())
+    monkeypatch.setattr(prompt_cache, "read_only_tools", {"top_contributors"})
+    monkeypatch.setattr(prompt_cache, "volatile_tools", set())
+    prompt_cache.clear()
+
+    def call(prompt: str, result: dict) -> dict:
+        async def answer(*args, **kwargs):
+            return result
+
+        monkeypatch.setattr(llm_client, "answer", answer)
+        return asyncio.run(llm_client.ask(llm_client.PromptPayload(prompt=prompt), Response(), None, None))
+
+    yield call
+    prompt_cache.clear()
+
+
+def test_complete_answer_is_cached(ask):
+    ask("top contributors of owner/repo", run_result())
+
+    assert prompt_cache.get("top contributors of owner/repo") == "alice: 12 commits"
+
+
+def test_deadline_stopped_run_is_not_cached(ask):
+    response = ask("top contributors of owner/repo", run_result(stopped="deadline", partial=True))
+
+    assert response["partial"] is True
+    assert prompt_cache.get("top contributors of owner/repo") is None
+
+
+def test_run_on_truncated_tool_result_is_not_cached(ask):
+    ask("top contributors of owner/repo", run_result(partial=True))
+
+    assert prompt_cache.get("top contributors of owner/repo") is None
+
+
+def test_truncated_tool_results_are_detected():
+    from src.llm.orchestrator import _truncated
+
+    assert _truncated({"result": {"structuredContent": {"counts": {}, "truncated": True}}})
+    assert _truncated({"result": {"structuredContent": {"result": {"truncated": True}}}})
+    assert not _truncated({"result": {"structuredContent": {"items": []}}})
+    assert not _truncated({"error": "Tool call timed out after 1s"})
+
+
+def test_memory_transport_loads_the_tools_once(monkeypatch):
+    monkeypatch.setattr(llm_client, "MCP_TRANSPORT", "memory")
+
+    server = llm_client.tool_server()
+
+    assert server is sys.modules["main"].main_mcp
+    assert llm_client.metrics.Registry is sys.modules["github_tools.metrics"].Registry
+    assert not [name for name in sys.modules if name.startswith("src.github_tools")]
@@ -0,0 +1,67 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from github_tools import bulk, issue_tracking, pull_request
+
+
+class FakeItem(SimpleNamespace):
+    def edit(self, state):
+        self.state = state
+
+
+class FakeRepo:
+    full_name = "owner/repo"
+
+    def __init__(self):
+        self.issues = [FakeItem(number=n, title=f"#{n}", state="open", html_url=f"https://github.com/owner/repo/issues/{n}") for n in (1, 2)]
+
+    def create_issue(self, **kwargs):
+        return FakeItem(number=3, title=kwargs["title"])
+
+    def get_issue(self, number):
+        return self.issues[number - 1]
+
+    def get_issues(self, state):
+        return [issue for issue in self.issues if issue.state == state]
+
+    def create_pull(self, **kwargs):
+        return FakeItem(number=4, title=kwargs["title"], state="open", html_url="https://github.com/owner/repo/pull/4")
+
+    def get_pulls(self, state):
+        return []
+
+
+@pytest.fixture
+def invalidated(monkeypatch):
+    names = []
+    repo = FakeRepo()
+    monkeypatch.setattr(bulk, "pacer", bulk.WritePacer(0))
+    for module in (issue_tracking, pull_request):
+        monkeypatch.setattr(module, "get_repo", lambda repo_name: repo)
+        monkeypatch.setattr(module, "invalidate_repo", names.append)
+    return names
+
+
+def call(tool, **kwargs):
+    return asyncio.run(tool.fn(**kwargs))
+
+
+@pytest.mark.parametrize("tool, kwargs", [
+    (issue_tracking.create_issue, {"repo_name": "owner/repo", "issue_title": "bug"}),
+    (issue_tracking.close_issue, {"repo_name": "owner/repo", "issue_number": 1}),
+    (issue_tracking.close_all_open_issues, {"repo_name": "owner/repo"}),
+    (pull_request.create_pull_request, {"repo_name": "owner/repo", "base_branch": "main", "head_branch": "fix", "pr_title": "fix"}),
+    (pull_request.close_all_pull_request, {"repo_name": "owner/repo"}),
+])
+def test_mutations_drop_the_cached_repo(invalidated, tool, kwargs):
+    call(tool, **kwargs)
+
+    assert invalidated == ["owner/repo"]
+
+
+def test_dry_run_keeps_the_cached_repo(invalidated):
+    call(issue_tracking.close_all_open_issues, repo_name="owner/repo", dry_run=True)
+
+    assert invalidated == []
@@ -0,0 +1,33 @@
+from google.genai import types
+from mcp import types as mcp_types
+
+from src.llm.orchestrator import gemini_tools
+
+
+def test_gemini_tools_keep_what_gemini_supports():
+    tool = mcp_types.Tool(
+        name="close_issue",
+        description="Close an issue.",
+        inputSchema={
+            "type": "object",
+            "additionalProperties": False,
+            "properties": {
+                "repo_name": {"type": "string", "title": "Repo Name"},
+                "number": {"type": "integer", "minimum": 1},
+                "labels": {"type": "array", "items": {"type": "string", "$comment": "dropped"}},
+            },
+            "required": ["repo_name", "number"],
+        },
+    )
+
+    [converted] = gemini_tools([tool])
+
+    [declaration] = converted.function_declarations
+    assert (declaration.name, declaration.description) == ("close_issue", "Close an issue.")
+    parameters = declaration.parameters
+    assert parameters.type == types.Type.OBJECT
+    assert parameters.required == ["repo_name", "number"]
+    assert parameters.properties["number"].minimum == 1
+    assert parameters.properties["labels"].items.type == types.Type.STRING
+    # the MCP tool itself is left as it was
+    assert tool.inputSchema["additionalProperties"] is False
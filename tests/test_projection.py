@@ -0,0 +1,75 @@
+from github_tools import pagination, projection
+
+
+class FakeRequester:
+    """
+    Serves a listing of `total` numbered items in GitHub's page/per_page style.
+    """
+
+    def __init__(self, total: int, body_size: int):
+        self.items = [{"number": n, "body": "x" * body_size} for n in range(1, total + 1)]
+
+    def requestJsonAndCheck(self, verb, url, parameters):
+        page, per_page = parameters["page"], parameters["per_page"]
+        data = self.items[(page - 1) * per_page : page * per_page]
+        link = '<next>; rel="next"' if page * per_page < len(self.items) else ""
+        return {"link": link}, data
+
+
+class FakeGithub:
+    def __init__(self, requester):
+        self.requester = requester
+
+
+def test_paging_through_trimmed_pages_returns_every_item_once(monkeypatch):
+    # 100 items of ~800 bytes don't fit one 20 KB response, so every page is trimmed
+    requester = FakeRequester(total=250, body_size=800)
+    monkeypatch.setattr(pagination, "github", lambda: FakeGithub(requester))
+    monkeypatch.setattr(projection, "RESPONSE_BUDGET", 20000)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        result = projection.fit("list_items", pagination.paginate("/items", dict, limit=100, cursor=cursor))
+        seen.extend(item["number"] for item in result["items"])
+        pages += 1
+        cursor = result["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages > 3
+    assert seen == list(range(1, 251))
+
+
+def test_trimmed_page_keeps_at_least_one_item(monkeypatch):
+    requester = FakeRequester(total=3, body_size=800)
+    monkeypatch.setattr(pagination, "github", lambda: FakeGithub(requester))
+    monkeypatch.setattr(projection, "RESPONSE_BUDGET", 100)
+
+    result = projection.fit("list_items", pagination.paginate("/items", dict, limit=3))
+
+    assert [item["number"] for item in result["items"]] == [1]
+    assert pagination.decode_cursor(result["next_cursor"])[:2] == (1, 1)
+
+
+def test_trimmed_batch_names_the_omitted_numbers(monkeypatch):
+    monkeypatch.setattr(projection, "RESPONSE_BUDGET", 20000)
+    batch = {"items": [{"number": n, "body": "x" * 800} for n in range(101, 141)], "errors": []}
+
+    result = projection.fit("get_pull_requests_details", batch)
+
+    kept = [item["number"] for item in result["items"]]
+    assert len(kept) < 40
+    assert kept + result["omitted_numbers"] == list(range(101, 141))
+
+
+def test_trimmed_counts_keep_the_biggest(monkeypatch):
+    # top_contributors' mapping comes alphabetically from the activity index
+    contributors = {f"user{n:03}": {"commits": n, "pull_requests": 0, "issues": 0} for n in range(300)}
+    monkeypatch.setattr(projection, "RESPONSE_BUDGET", 2000)
+
+    result = projection.fit("top_contributors", contributors)
+
+    kept = [login for login in result if login.startswith("user")]
+    assert 0 < len(kept) < 300
+    assert kept == [f"user{n:03}" for n in range(299, 299 - len(kept), -1)]
+    assert result["truncated"] is True and result["omitted_items"] == 300 - len(kept)
@@ -0,0 +1,108 @@
+import contextvars
+import time
+
+import pytest
+
+from github_tools.deadline import DeadlineExceeded, deadline
+from github_tools.rate_limit import ANALYTICS, BULK, BURST, INTERACTIVE, RateLimitGovernor, priority, resource_for
+
+
+def headers(limit: int, remaining: int, reset_in: float = 3600) -> dict:
+    return {
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(time.time() + reset_in),
+    }
+
+
+def delay(governor: RateLimitGovernor, level: str, resource: str = "core") -> float:
+    return governor._delay(governor.budgets[resource], level)
+
+
+def acquire(governor: RateLimitGovernor, level: str, timeout: float | None = None) -> None:
+    # in a copy of the context, like a worker thread of a tool call
+    def run():
+        priority.set(level)
+        if timeout is not None:
+            deadline.set(time.monotonic() + timeout)
+        governor.acquire()
+
+    contextvars.copy_context().run(run)
+
+
+def test_resource_for():
+    assert resource_for("/repos/o/r/issues?page=2") == "core"
+    assert resource_for("/search/issues?q=is:open") == "search"
+    assert resource_for("/graphql") == "graphql"
+
+
+def test_unknown_budget_never_waits():
+    governor = RateLimitGovernor()
+    governor.update("core", 200, {})
+    assert delay(governor, BULK) == 0
+
+
+def test_reserve_is_kept_for_interactive_tools():
+    governor = RateLimitGovernor()
+    # a 20% reserve of 5000 is 1000
+    governor.update("core", 200, headers(5000, 1000, reset_in=600))
+
+    for level in (ANALYTICS, BULK):
+        assert delay(governor, level) == pytest.approx(600, abs=2)
+    assert delay(governor, INTERACTIVE) == 0
+    assert governor.budgets["core"].remaining == 999
+
+
+def test_interactive_tools_may_spend_the_whole_budget():
+    governor = RateLimitGovernor()
+    governor.update("core", 200, headers(5000, 1))
+
+    assert delay(governor, INTERACTIVE) == 0
+    assert delay(governor, INTERACTIVE) == pytest.approx(3600, abs=2)
+
+
+def test_background_tools_are_paced_after_the_burst():
+    governor = RateLimitGovernor()
+    governor.update("core", 200, headers(5000, 4600, reset_in=3600))
+
+    delays = [delay(governor, BULK) for _ in range(int(BURST) + 1)]
+
+    assert delays[:-1] == [0] * int(BURST)
+    # 3600 requests above the reserve spread over an hour: about one a second
+    assert delays[-1] == pytest.approx(1, rel=0.1)
+
+
+def test_retry_after_blocks_every_priority():
+    governor = RateLimitGovernor()
+    governor.update("core", 403, {"Retry-After": "30", **headers(5000, 4000)})
+
+    assert delay(governor, INTERACTIVE) == pytest.approx(30, abs=1)
+    assert delay(governor, BULK) == pytest.approx(30, abs=1)
+    assert governor.snapshot()["secondary_blocked_seconds"] == pytest.approx(30, abs=1)
+
+
+def test_retry_after_is_ignored_on_success():
+    governor = RateLimitGovernor()
+    governor.update("core", 200, {"Retry-After": "30", **headers(5000, 4000)})
+
+    assert delay(governor, INTERACTIVE) == 0
+
+
+def test_wait_longer_than_the_deadline_fails_right_away():
+    governor = RateLimitGovernor()
+    governor.update("core", 429, {"Retry-After": "60"})
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        acquire(governor, INTERACTIVE, timeout=1)
+    assert time.monotonic() - started < 1
+
+
+def test_waits_are_counted_per_priority():
+    governor = RateLimitGovernor()
+    governor.update("core", 429, {"Retry-After": "0.2"})
+
+    acquire(governor, ANALYTICS)
+
+    assert governor.waits == {INTERACTIVE: 0, ANALYTICS: 1, BULK: 0}
+    assert governor.wait_seconds[ANALYTICS] >= 0.15
@@ -0,0 +1,76 @@
+import pytest
+from google.genai import types
+
+from src.llm.routing import ToolRouter, classify
+
+CATEGORIES = {
+    "repos": ["create_github_repo", "delete_github_repo", "list_github_repos"],
+    "issues": ["create_issue", "close_issue", "get_issue_from_repo"],
+    "pull_requests": ["create_pull_request", "list_open_pull_requests"],
+    "branches": ["list_branches"],
+    "analysis": ["get_repo_key_metrics", "compare_repos_key_metrics", "top_contributors"],
+    "jobs": ["get_job_status"],
+}
+
+
+@pytest.fixture
+def router():
+    router = ToolRouter()
+    tools = [
+        types.Tool(function_declarations=[types.FunctionDeclaration(name=name, description=name)])
+        for names in CATEGORIES.values()
+        for name in names
+    ]
+    router.set_tools(tools, CATEGORIES)
+    return router
+
+
+def names(tools) -> set[str]:
+    return {tool.function_declarations[0].name for tool in tools}
+
+
+@pytest.mark.parametrize("prompt, expected", [
+    ("Create a new repo called demo", ["repos"]),
+    ("Close issue 12 in owner/repo", ["issues"]),
+    ("Show the branches of owner/repo", ["branches"]),
+    ("Who are the top contributors of owner/repo?", ["analysis"]),
+    ("Which of my repos have the most open issues?", ["repos", "issues", "analysis"]),
+    ("How many open issues does owner/repo have?", ["issues", "analysis"]),
+    ("Compare the stars of my repositories", ["repos", "analysis"]),
+    ("Is my background job still running?", ["jobs"]),
+    ("Hello there", []),
+])
+def test_classify(prompt, expected):
+    assert classify(prompt) == expected
+
+
+def test_ranking_question_keeps_the_comparison_tool(router):
+    tools, routing = router.select("Which of my repos have the most open issues?")
+
+    assert "compare_repos_key_metrics" in names(tools)
+    assert routing["classified"] is True
+
+
+def test_count_question_keeps_the_metrics_tool(router):
+    tools, _ = router.select("How many open issues does owner/repo have?")
+
+    assert {"get_repo_key_metrics", "get_issue_from_repo"} <= names(tools)
+
+
+def test_unclassified_prompt_gets_every_tool(router):
+    tools, routing = router.select("Hello there")
+
+    assert len(tools) == sum(len(tools) for tools in CATEGORIES.values())
+    assert routing["tokens_saved"] == 0
+
+
+def test_explicit_category_limits_the_tools(router):
+    tools, routing = router.select("anything", "branches")
+
+    assert names(tools) == {"list_branches"}
+    assert routing["classified"] is False
+
+
+def test_unknown_category_is_rejected(router):
+    with pytest.raises(ValueError):
+        router.select("anything", "wikis")
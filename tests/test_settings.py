@@ -0,0 +1,12 @@
+from github_tools.settings import overrides, tokens_for_bytes
+
+
+def test_overrides_parse_name_value_pairs(monkeypatch):
+    monkeypatch.setenv("GITHUB_TEST_OVERRIDES", "body=2000, description = 300,broken,")
+
+    assert overrides("GITHUB_TEST_OVERRIDES", int) == {"body": 2000, "description": 300}
+    assert overrides("GITHUB_TEST_OVERRIDES_UNSET", float) == {}
+
+
+def test_tokens_for_bytes():
+    assert tokens_for_bytes(4000) == 1000
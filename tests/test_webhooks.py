@@ -0,0 +1,109 @@
+import glob
+import json
+import os
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+import pytest
+from requests.structures import CaseInsensitiveDict
+
+from github_tools import webhooks
+from github_tools.activity_index import ActivityIndex
+from github_tools.webhooks import DeliveryLog, receive, sign
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks", "webhook_fixtures")
+SECRET = "test-secret"
+REPO = "octo-org/hello-world"
+EVERYTHING = (datetime.min.replace(tzinfo=timezone.utc), datetime.max.replace(tzinfo=timezone.utc))
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    index = ActivityIndex(str(tmp_path / "activity_index.sqlite3"))
+    monkeypatch.setattr(webhooks, "SECRET", SECRET)
+    monkeypatch.setattr(webhooks, "activity_index", index)
+    monkeypatch.setattr(webhooks, "deliveries", DeliveryLog())
+    return index
+
+
+@pytest.fixture
+def invalidated(monkeypatch):
+    names = []
+    monkeypatch.setattr(webhooks, "invalidate_repo", names.append)
+    return names
+
+
+def fixtures() -> list[dict]:
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.json"))):
+        with open(path) as f:
+            fixtures.append(json.load(f))
+    return fixtures
+
+
+def deliver(fixture: dict, secret: str = SECRET, form: bool = False) -> tuple[int, dict]:
+    payload = json.dumps(fixture["payload"])
+    body = urlencode({"payload": payload}).encode() if form else payload.encode()
+    headers = CaseInsensitiveDict({
+        "Content-Type": "application/x-www-form-urlencoded" if form else "application/json",
+        "X-GitHub-Event": fixture["event"],
+        "X-GitHub-Delivery": fixture["delivery"],
+        "X-Hub-Signature-256": sign(body, secret),
+    })
+    return receive(headers, body)
+
+
+def test_recorded_deliveries_update_the_activity_index(index, invalidated):
+    answers = [deliver(fixture) for fixture in fixtures()]
+
+    assert all(status == 200 and body["outcome"] == "applied" for status, body in answers)
+    assert index.summary(REPO, *EVERYTHING) == {
+        "commits": 2,
+        "commit_authors": 2,
+        "pull_requests_opened": 1,
+        "pull_requests_closed": 1,
+        "pull_requests_merged": 1,
+        "issues_opened": 1,
+        "issues_closed": 1,
+        "active_contributors": 2,
+    }
+    # issues, pull_request, push and repository deliveries drop the cached repo
+    assert invalidated == [REPO] * 6
+
+
+def test_bad_signature_is_rejected(index, invalidated):
+    issue_opened = fixtures()[1]
+
+    assert deliver(issue_opened, secret="wrong")[0] == 401
+    status, _ = receive(CaseInsensitiveDict({"X-GitHub-Event": "issues"}), json.dumps(issue_opened["payload"]).encode())
+    assert status == 401
+
+    assert index.summary(REPO, *EVERYTHING)["issues_opened"] == 0
+    assert invalidated == []
+
+
+def test_every_delivery_is_rejected_without_a_secret(index, monkeypatch):
+    monkeypatch.setattr(webhooks, "SECRET", "")
+
+    assert deliver(fixtures()[1], secret="")[0] == 503
+
+
+def test_redelivery_is_applied_once(index, invalidated):
+    push = next(fixture for fixture in fixtures() if fixture["event"] == "push")
+
+    assert deliver(push)[1]["outcome"] == "applied"
+    assert deliver(push)[1]["outcome"] == "duplicate"
+    assert index.pushed_commits == 2
+
+
+def test_form_encoded_delivery(index, invalidated):
+    assert deliver(fixtures()[1], form=True) == (200, {"event": "issues", "outcome": "applied"})
+    assert index.summary(REPO, *EVERYTHING)["issues_opened"] == 1
+
+
+def test_malformed_payload_is_a_client_error(index, invalidated):
+    fixture = {"event": "issues", "delivery": "broken", "payload": {"repository": {"full_name": REPO}}}
+
+    status, body = deliver(fixture)
+    assert status == 400
+    assert "Malformed issues payload" in body["error"]